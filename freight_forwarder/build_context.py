@@ -0,0 +1,258 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals
+import hashlib
+import os
+import re
+import stat
+import tarfile
+import tempfile
+
+import six
+
+from .utils import logger
+
+DOCKER_IGNORE_FILE = '.dockerignore'
+CHUNK_SIZE         = 64 * 1024
+
+
+class BuildContext(object):
+    """ Packages a directory into a tar archive to be used as a docker build context.
+
+    Files matching a pattern in the directory's ``.dockerignore`` are left out, ``!`` patterns re-include files and the
+    last matching pattern wins, the same as the docker cli.  The archive is streamed to a temporary file one file at a
+    time and a sha256 digest of every file's path, mode and content is computed as it is written.
+
+    :param path: A :string:, path to the directory that will be sent to the docker daemon.
+    :param docker_file: A :string:, path to the Dockerfile. defaults to ``Dockerfile`` inside of path.
+    """
+    def __init__(self, path, docker_file=None):
+        if not isinstance(path, six.string_types) or not os.path.isdir(path):
+            raise TypeError(logger.error("build context path must be an existing directory. {0} was passed.".format(path)))
+
+        self.path        = os.path.abspath(path)
+        self.docker_file = os.path.relpath(os.path.abspath(docker_file or os.path.join(self.path, 'Dockerfile')), self.path)
+
+        if self.docker_file.startswith(os.pardir):
+            raise ValueError(
+                logger.error("Dockerfile: {0} must be inside of the build context: {1}".format(docker_file, self.path))
+            )
+
+        self.docker_file = self.docker_file.replace(os.sep, '/')
+        self.patterns    = self._load_patterns()
+        self.digest      = None
+        self.size        = None
+        self.file_count  = None
+
+    @classmethod
+    def from_docker_file(cls, docker_file):
+        """ Returns the build context used for a service's build definition. When docker_file is a file the current
+        working directory is the context otherwise docker_file is the context directory.
+
+        :param docker_file: A :string:, path to a Dockerfile or a directory containing one.
+        :rtype: A :BuildContext:
+        """
+        if os.path.isfile(docker_file):
+            return cls(os.getcwd(), docker_file)
+
+        return cls(docker_file)
+
+    def excluded(self, relative_path):
+        """ Returns True when relative_path is excluded by the .dockerignore patterns.
+
+        :param relative_path: A :string:, '/' separated path relative to the build context.
+        :rtype: A :bool:
+        """
+        # the docker daemon requires both of these so the docker cli always sends them.
+        if relative_path in (self.docker_file, DOCKER_IGNORE_FILE):
+            return False
+
+        excluded = False
+        for negated, regex in self.patterns:
+            if excluded == negated and self._matches(regex, relative_path):
+                excluded = not negated
+
+        return excluded
+
+    def files(self):
+        """ Yields the '/' separated relative path of every directory and file in the build context, sorted and
+        with excluded paths removed.
+        """
+        has_exceptions = any(negated for negated, regex in self.patterns)
+
+        for root, dirs, files in os.walk(self.path):
+            relative_root = os.path.relpath(root, self.path).replace(os.sep, '/')
+            relative_root = '' if relative_root == '.' else relative_root + '/'
+
+            dirs.sort()
+            for name in list(dirs):
+                relative_path = relative_root + name
+                if self.excluded(relative_path):
+                    # an exception pattern could re-include something inside of this directory.
+                    if not has_exceptions:
+                        dirs.remove(name)
+                    continue
+
+                yield relative_path
+
+            for name in sorted(files):
+                relative_path = relative_root + name
+                if not self.excluded(relative_path):
+                    yield relative_path
+
+    def archive(self):
+        """ Writes the build context to a temporary tar file and returns it rewound to the beginning.  The caller is
+        responsible for closing the file, it is removed from disk on close.
+
+        :rtype: A file object.
+        """
+        digest     = hashlib.sha256()
+        file_count = 0
+        context    = tempfile.TemporaryFile()
+
+        try:
+            with tarfile.open(fileobj=context, mode='w|') as tar:
+                for relative_path in self.files():
+                    tar_info       = tar.gettarinfo(os.path.join(self.path, relative_path), arcname=relative_path)
+                    tar_info.uid   = tar_info.gid = 0
+                    tar_info.uname = tar_info.gname = ''
+
+                    self._update_digest(digest, relative_path, tar_info.mode, tar_info.linkname)
+
+                    if tar_info.isfile():
+                        with open(os.path.join(self.path, relative_path), 'rb') as f:
+                            tar.addfile(tar_info, _DigestReader(f, digest))
+                        file_count += 1
+                    else:
+                        tar.addfile(tar_info)
+
+            self.size       = context.tell()
+            self.digest     = digest.hexdigest()
+            self.file_count = file_count
+            context.seek(0)
+        except Exception:
+            context.close()
+            raise
+
+        return context
+
+    def checksum(self):
+        """ Computes the same digest as :meth:`archive` without writing the archive.
+
+        :rtype: A :string:, sha256 hex digest.
+        """
+        digest = hashlib.sha256()
+
+        for relative_path in self.files():
+            path = os.path.join(self.path, relative_path)
+            mode = os.lstat(path).st_mode
+
+            self._update_digest(
+                digest,
+                relative_path,
+                stat.S_IMODE(mode),
+                os.readlink(path) if stat.S_ISLNK(mode) else ''
+            )
+
+            if stat.S_ISREG(mode):
+                with open(path, 'rb') as f:
+                    reader = _DigestReader(f, digest)
+                    while reader.read(CHUNK_SIZE):
+                        pass
+
+        self.digest = digest.hexdigest()
+
+        return self.digest
+
+    ##
+    # private methods
+    ##
+    def _load_patterns(self):
+        patterns      = []
+        docker_ignore = os.path.join(self.path, DOCKER_IGNORE_FILE)
+
+        if not os.path.isfile(docker_ignore):
+            return patterns
+
+        with open(docker_ignore, 'r') as f:
+            for line in f:
+                pattern = line.strip()
+                if not pattern or pattern.startswith('#'):
+                    continue
+
+                negated = pattern.startswith('!')
+                if negated:
+                    pattern = pattern[1:].strip()
+
+                pattern = os.path.normpath(pattern).replace(os.sep, '/').lstrip('/')
+                if pattern in ('', '.'):
+                    continue
+
+                patterns.append((negated, self._compile(pattern)))
+
+        return patterns
+
+    @staticmethod
+    def _update_digest(digest, relative_path, mode, link_name):
+        digest.update("{0}\0{1:o}\0{2}\0".format(relative_path, stat.S_IMODE(mode), link_name).encode('utf-8'))
+
+    @staticmethod
+    def _compile(pattern):
+        """ Converts a .dockerignore pattern to a regex. ``*`` and ``?`` don't cross directories while ``**`` does.
+        """
+        regex = ''
+        index = 0
+        while index < len(pattern):
+            char = pattern[index]
+            if pattern.startswith('**', index):
+                index += 2
+                # "**/" also matches zero directories.
+                if pattern.startswith('/', index):
+                    index += 1
+                    regex += '(?:.*/)?'
+                else:
+                    regex += '.*'
+                continue
+            elif char == '*':
+                regex += '[^/]*'
+            elif char == '?':
+                regex += '[^/]'
+            elif char == '[':
+                end = pattern.find(']', index + 1)
+                if end == -1:
+                    regex += re.escape(char)
+                else:
+                    char_class = pattern[index + 1:end].replace('\\', '\\\\')
+                    if char_class.startswith('!'):
+                        char_class = '^' + char_class[1:]
+
+                    regex += '[{0}]'.format(char_class)
+                    index = end
+            else:
+                regex += re.escape(char)
+            index += 1
+
+        return re.compile(r'\A{0}\Z'.format(regex))
+
+    @staticmethod
+    def _matches(regex, relative_path):
+        # a pattern that matches a directory also matches everything inside of it.
+        parts = relative_path.split('/')
+        for index in range(1, len(parts) + 1):
+            if regex.match('/'.join(parts[:index])):
+                return True
+
+        return False
+
+
+class _DigestReader(object):
+    """ Wraps a file object updating digest with everything that is read.
+    """
+    def __init__(self, file_obj, digest):
+        self._file_obj = file_obj
+        self._digest   = digest
+
+    def read(self, size=-1):
+        data = self._file_obj.read(size)
+        self._digest.update(data)
+
+        return data
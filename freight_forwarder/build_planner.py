@@ -0,0 +1,275 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals
+import io
+import os
+import re
+
+import docker
+
+from .build_context import BuildContext
+from .utils         import logger
+
+
+def parse_docker_file(path):
+    """ Returns a Dockerfile's instructions as normalized strings, ``"INSTRUCTION arguments"``. Comments are removed,
+    line continuations are joined, instructions are upper cased and whitespace is collapsed so instructions can be
+    compared between Dockerfiles.
+
+    :param path: A :string:, path to a Dockerfile.
+    :rtype: A :list: of :string:
+    """
+    instructions = []
+    current      = ''
+
+    with io.open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not current and (not line or line.startswith('#')):
+                continue
+
+            # comments can appear in the middle of a continued instruction.
+            if line.startswith('#'):
+                continue
+
+            if line.endswith('\\'):
+                current += line[:-1] + ' '
+                continue
+
+            current += line
+            if current.strip():
+                instructions.append(_normalize_instruction(current))
+            current = ''
+
+    if current.strip():
+        instructions.append(_normalize_instruction(current))
+
+    return instructions
+
+
+def base_images(instructions):
+    """ Returns the images pulled by a Dockerfile's FROM instructions.  ``scratch``, earlier build stages and images
+    using build arguments are skipped.
+
+    :param instructions: A :list: of instructions returned by :func:`parse_docker_file`.
+    :rtype: A :list: of :string:
+    """
+    images = []
+    stages = set()
+
+    for instruction in instructions:
+        if not instruction.startswith('FROM '):
+            continue
+
+        parts = instruction.split()
+        image = parts[1]
+
+        if image != 'scratch' and image.lower() not in stages and '$' not in image and image not in images:
+            images.append(image)
+
+        if len(parts) > 3 and parts[2].upper() == 'AS':
+            stages.add(parts[3].lower())
+
+    return images
+
+
+def docker_file_path(docker_file):
+    """ Returns the path to the Dockerfile for a service's build definition, which can be a file or a directory.
+    """
+    build_context = BuildContext.from_docker_file(docker_file)
+
+    return os.path.join(build_context.path, build_context.docker_file)
+
+
+class BuildGroup(object):
+    """ Services that are built from the same base image.  The representative is built first so the followers can
+    reuse its image layers.
+
+    :param from_image: A :string:, the base image of the group.
+    :param representative: A :Service: that is built first.
+    :param followers: A :dict: of :Service: to the number of instructions, after FROM, shared with the representative.
+    """
+    def __init__(self, from_image, representative, followers=None):
+        self.from_image     = from_image
+        self.representative = representative
+        self.followers      = followers or {}
+
+
+class BuildPlan(object):
+    """ Orders service builds to get the most out of the docker layer cache.
+
+    Services are grouped by their ``FROM`` image.  Within a group the service that shares the longest instruction
+    prefix with the others is the representative, services that share instructions with it follow it, and the
+    remaining services form groups of their own.  Representatives are built before their followers, and services
+    built ``FROM`` another service's image are built after that service.
+
+    :param services: An iterable of :Service: objects with a docker_file.
+    """
+    def __init__(self, services):
+        services          = sorted(services, key=lambda service: service.alias)
+        built             = dict(("{0}/{1}".format(service.repository, service.namespace), service) for service in services)
+        self.instructions = {}
+        self.parents      = {}
+        by_from_image     = {}
+
+        for service in services:
+            try:
+                instructions = parse_docker_file(docker_file_path(service.docker_file))
+            except (IOError, OSError, TypeError, ValueError) as e:
+                logger.warning("Unable to parse the Dockerfile for {0}: {1}".format(service.alias, e))
+                instructions = []
+
+            self.instructions[service.alias] = instructions
+            self.parents[service.alias]      = []
+            for image in base_images(instructions):
+                parent = built.get(docker.utils.parse_repository_tag(image)[0])
+                if parent is not None and parent is not service and parent not in self.parents[service.alias]:
+                    self.parents[service.alias].append(parent)
+
+            from_image = self._from_image(instructions)
+            by_from_image.setdefault(from_image, []).append(service)
+
+        self.groups = []
+        for from_image in sorted(by_from_image, key=lambda value: value or ''):
+            self.groups.extend(self._group(from_image, by_from_image[from_image]))
+
+    @property
+    def representatives(self):
+        return [group.representative for group in self.groups]
+
+    @property
+    def followers(self):
+        return [follower for group in self.groups for follower in sorted(group.followers, key=lambda s: s.alias)]
+
+    @property
+    def waves(self):
+        """ Returns the services as a :list: of build waves, each a :list: of services that can be built at the same
+        time.  A service is in a later wave than the services it is built FROM and, for followers, their representative.
+        """
+        requirements = {}
+        for group in self.groups:
+            requirements[group.representative] = self.parents[group.representative.alias]
+            for follower in group.followers:
+                requirements[follower] = self.parents[follower.alias] + [group.representative]
+
+        depths = {}
+
+        def depth(service, visiting):
+            if service in depths:
+                return depths[service]
+
+            if service in visiting:
+                logger.warning("{0} is built FROM an image that is built FROM it.".format(service.alias))
+                return 0
+
+            visiting.add(service)
+            depths[service] = max([depth(requirement, visiting) + 1 for requirement in requirements[service]] or [0])
+            visiting.discard(service)
+
+            return depths[service]
+
+        waves = []
+        for service in self.representatives + self.followers:
+            index = depth(service, set())
+            while len(waves) <= index:
+                waves.append([])
+
+            waves[index].append(service)
+
+        return waves
+
+    def shared_instructions(self, service):
+        """ Returns the number of instructions after FROM service shares with the service built before it.
+        """
+        for group in self.groups:
+            if service in group.followers:
+                return group.followers[service]
+
+        return 0
+
+    def report(self, use_cache=True):
+        """ Returns a :list: of lines describing the plan and the expected cache hits.
+
+        :param use_cache: A :bool:, False when the builds don't use the layer cache so nothing is expected from it.
+        """
+        lines = []
+        for group in self.groups:
+            lines.append("{0} (FROM {1}){2}".format(
+                group.representative.alias,
+                group.from_image or 'unknown',
+                self._after(group.representative)
+            ))
+
+            for follower in sorted(group.followers, key=lambda service: service.alias):
+                lines.append("  then {0}: {1} of {2} instructions {3}".format(
+                    follower.alias,
+                    group.followers[follower],
+                    max(len(self.instructions[follower.alias]) - 1, 0),
+                    'expected from cache' if use_cache else 'shared, the layer cache is disabled'
+                ))
+
+        return lines
+
+    ##
+    # private methods
+    ##
+    def _group(self, from_image, services):
+        groups = []
+        while services:
+            if from_image is None:
+                # unparsable Dockerfiles can't share anything.
+                groups.extend(BuildGroup(from_image, service) for service in services)
+                break
+
+            representative = max(
+                services,
+                key=lambda candidate: sum(self._common_prefix(candidate, other) for other in services)
+            )
+            group     = BuildGroup(from_image, representative)
+            remaining = []
+
+            for service in services:
+                if service is representative:
+                    continue
+
+                shared = self._common_prefix(representative, service) - 1
+                if shared > 0:
+                    group.followers[service] = shared
+                else:
+                    remaining.append(service)
+
+            groups.append(group)
+            services = remaining
+
+        return groups
+
+    def _after(self, service):
+        parents = self.parents[service.alias]
+        if not parents:
+            return ''
+
+        return ", after {0}".format(', '.join(parent.alias for parent in parents))
+
+    def _common_prefix(self, service, other):
+        count = 0
+        for instruction, other_instruction in zip(self.instructions[service.alias], self.instructions[other.alias]):
+            if instruction != other_instruction:
+                break
+            count += 1
+
+        return count
+
+    @staticmethod
+    def _from_image(instructions):
+        for instruction in instructions:
+            if instruction.startswith('FROM '):
+                return instruction.split()[1]
+
+        return None
+
+
+def _normalize_instruction(instruction):
+    parts = instruction.strip().split(None, 1)
+    if len(parts) == 1:
+        return parts[0].upper()
+
+    return "{0} {1}".format(parts[0].upper(), re.sub(r'\s+', ' ', parts[1]))
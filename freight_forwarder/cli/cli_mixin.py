@@ -2,6 +2,7 @@
 from __future__ import unicode_literals
 import argparse
 
+from freight_forwarder.const import DANGLING_SWEEP_INTERVAL
 from freight_forwarder.utils import normalize_value
 
 
@@ -40,6 +41,25 @@ class CliMixin(object):
             help="What service would you like do export / deploy?  defaults to 'all'."
         )
 
+    def _add_sweep_arguments(self):
+        """Add the dangling image clean up arguments, only used by commands that clean up their hosts.
+        """
+        self._parser.add_argument(
+            '--sweep-interval',
+            type=int,
+            default=DANGLING_SWEEP_INTERVAL,
+            help='Minimum number of seconds between dangling image clean ups on a host. defaults to {0}.'.format(
+                DANGLING_SWEEP_INTERVAL
+            )
+        )
+
+        self._parser.add_argument(
+            '--background-sweep',
+            action='store_true',
+            default=False,
+            help='Clean up dangling images in a background process after the command has finished.'
+        )
+
 
 class NormalizeValue(argparse.Action):
     """
@@ -12,15 +12,23 @@ from .cli_mixin              import CliMixin
 class DeployCommand(CliMixin):
     """ The deploy command pulls an image from a Docker registry, stops the previous running containers, creates and starts
     new containers, and cleans up the old containers and images on a docker host. If the new container fails to start,
-    the previous container is restarted and the most recently created containers and image are removed.
+    the previous container is restarted and the most recently created containers and image are removed. Images are
+    pulled onto every host before any containers are replaced. The old containers and images are removed in the
+    background while the next host is deployed.
 
     :options:
       - ``-h, --help``      (info) - Show the help message
       - ``--data-center``   (**required**) - The data center to deploy. example: sea1, sea3, or us-east-1
       - ``--environment``   (**required**) - The environment to deploy. example: development, test, or production
       - ``--service``       (**required**) - The Service that will be built and exported.
+      - ``--sweep-interval``    (optional) - Minimum seconds between dangling image clean ups on a host. defaults to 3600.
+      - ``--background-sweep``  (optional) - Clean up dangling images in a background process.
       - ``--tag``           (optional) - The tag of a specific image to pull from a registry. example: sea3-development-latest
       - ``-e, --env``       (optional) - list of environment variables to create on the container will override existing. example: MYSQL_HOST=172.17.0.4
+      - ``--no-prefetch``   (optional) - Don't pull images onto every host before containers are replaced.
+      - ``--staged``        (optional) - Create the new containers on every host first, then swap them in one host after another.
+        Services with dependents are deployed host by host.
+      - ``--background-cleanup`` (optional) - Remove the replaced containers and images in a background process.
 
     :return: exit_code
     :rtype: integer
@@ -35,6 +43,7 @@ class DeployCommand(CliMixin):
         # Set up deploy parser and pass deploy function to defaults.
         self._parser = sub_parser.add_parser('deploy')
         CliMixin.__init__(self)
+        self._add_sweep_arguments()
         self._build_arguments()
         self._parser.set_defaults(func=self.deploy)
 
@@ -60,6 +69,30 @@ class DeployCommand(CliMixin):
             help='environment variables to create in the container at run time.'
         )
 
+        self._parser.add_argument(
+            '--no-prefetch',
+            required=False,
+            action='store_true',
+            default=False,
+            help="Don't pull the images onto every host before any containers are replaced."
+        )
+
+        self._parser.add_argument(
+            '--staged',
+            required=False,
+            action='store_true',
+            default=False,
+            help="Create the new containers on every host before stopping any of the previous containers."
+        )
+
+        self._parser.add_argument(
+            '--background-cleanup',
+            required=False,
+            action='store_true',
+            default=False,
+            help="Remove the replaced containers and images in a background process after the deploy has finished."
+        )
+
     def deploy(self, args, **extra_args):
         """Deploy a docker container to a specific container ship (host)
 
@@ -70,7 +103,11 @@ class DeployCommand(CliMixin):
             raise TypeError(logger.error("args should of an instance of argparse.Namespace"))
 
         # create new freight forwarder
-        freight_forwarder = FreightForwarder()
+        freight_forwarder = FreightForwarder(
+            sweep_interval=args.sweep_interval,
+            background_sweep=args.background_sweep,
+            background_cleanup=args.background_cleanup
+        )
 
         # create commercial invoice this is the contact given to freight forwarder to dispatch containers and images
         commercial_invoice = freight_forwarder.commercial_invoice(
@@ -81,7 +118,13 @@ class DeployCommand(CliMixin):
         )
 
         # deploy containers.
-        bill_of_lading = freight_forwarder.deploy_containers(commercial_invoice, args.tag, args.env)
+        bill_of_lading = freight_forwarder.deploy_containers(
+            commercial_invoice,
+            args.tag,
+            args.env,
+            prefetch=not args.no_prefetch,
+            staged=args.staged
+        )
 
         # pretty lame... Need to work on return values through to app to make them consistent.
         exit_code = 0 if bill_of_lading else 1
@@ -0,0 +1,87 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals
+import argparse
+
+from freight_forwarder       import FreightForwarder
+from freight_forwarder.const import DOCKER_MAX_CONCURRENCY
+from freight_forwarder.utils import logger
+from .cli_mixin              import CliMixin
+
+
+class ExecCommand(CliMixin):
+    """ The exec command runs the same command inside every running container of a service on every docker host of the
+    deploy environment at the same time.  Output is prefixed with the host and container it came from.  The command
+    follows ``--``, example: ``freight-forwarder exec --data-center sea1 --environment test --service app -- nginx -s reload``
+
+    :options:
+      - ``-h, --help``      (info) - Show the help message
+      - ``--data-center``   (**required**) - The data center to run the command in. example: sea1, sea3, or us-east-1
+      - ``--environment``   (**required**) - The environment to run the command in. example: development, test, or production
+      - ``--service``       (**required**) - The Service whose containers will run the command.
+      - ``--max-concurrency``   (optional) - Maximum number of commands running on a host at the same time. defaults to 8.
+
+    :return: exit_code, the highest exit code of the command, 1 when it couldn't be run in a container.
+    :rtype: integer
+    """
+
+    def __init__(self, sub_parser):
+        logger.setup_logging('cli')
+        if not isinstance(sub_parser, argparse._SubParsersAction):
+            raise TypeError(logger.error("parser should of an instance of argparse._SubParsersAction"))
+
+        # Set up exec parser and pass exec function to defaults.
+        self._parser = sub_parser.add_parser('exec')
+        CliMixin.__init__(self)
+        self._build_arguments()
+        self._parser.set_defaults(func=self.execute)
+
+    def _build_arguments(self):
+        """
+        build arguments for command.
+        """
+        self._parser.add_argument(
+            '--max-concurrency',
+            required=False,
+            type=int,
+            default=DOCKER_MAX_CONCURRENCY,
+            help='Maximum number of commands running on a host at the same time. defaults to {0}.'.format(
+                DOCKER_MAX_CONCURRENCY
+            )
+        )
+
+        self._parser.add_argument(
+            'cmd',
+            nargs=argparse.REMAINDER,
+            help='The command to run in every container, after --.'
+        )
+
+    def execute(self, args, **extra_args):
+        """Run a command in a service's containers on every container ship (host) of a deploy environment.
+
+        :param args:
+        :type args:
+        """
+        if not isinstance(args, argparse.Namespace):
+            raise TypeError(logger.error("args should of an instance of argparse.Namespace"))
+
+        cmd = args.cmd[1:] if args.cmd and args.cmd[0] == '--' else args.cmd
+        if not cmd:
+            self._parser.error("a command to run is required, example: -- nginx -s reload")
+
+        # create new freight forwarder
+        freight_forwarder = FreightForwarder()
+
+        # commands are run in the containers of the deploy action's hosts and services.
+        commercial_invoice = freight_forwarder.commercial_invoice(
+            'deploy',
+            args.data_center,
+            args.environment,
+            args.service
+        )
+
+        exit_codes = freight_forwarder.exec_containers(commercial_invoice, cmd, args.max_concurrency)
+
+        exit_code = max([1 if code is None else code for code in exit_codes.values()] or [1])
+
+        if exit_code != 0:
+            exit(exit_code)
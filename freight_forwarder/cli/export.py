@@ -8,6 +8,7 @@ import six.moves
 import six
 
 from freight_forwarder       import FreightForwarder
+from freight_forwarder.const import BUILD_CONCURRENCY
 from freight_forwarder.utils import logger
 from .cli_mixin              import CliMixin
 
@@ -44,12 +45,18 @@ class ExportCommand(CliMixin):
       - ``--data-center``  (**required**) - The data center to deploy. example: us-east-02, dal3, or us-east-01.
       - ``--environment``  (**required**) - The environment to deploy. example: development, test, or production.
       - ``--service``      (**required**) - The Service that will be built and exported.
+      - ``--sweep-interval``     (optional) - Minimum seconds between dangling image clean ups on a host. defaults to 3600.
+      - ``--background-sweep``   (optional) - Clean up dangling images in a background process.
       - ``--clean``              (optional) - Clean up anything that was created during current command execution.
       - ``--configs``            (optional) - Inject configuration files. Requires CIA integration.
       - ``--tag``                (optional) - Metadata to tag Docker images with.
       - ``--no-tagging-scheme``  (optional) - Turn off freight forwarders tagging scheme.
       - ``--test``               (optional) - Build and run test Dockerfile for validation before pushing image.
       - ``--use-cache``          (optional) - Allows use of cache when building images defaults to false.
+      - ``--force-build``        (optional) - Build images even when the build context hasn't changed.
+      - ``--build-concurrency``  (optional) - Maximum number of images built at the same time. defaults to 4.
+      - ``--cache-from-registry`` (optional) - Seed the build cache with the last image exported to the destination registry.
+        Requires a docker daemon with api version 1.25 or later, otherwise nothing is pulled.
       - ``--no-validation``      (optional) - The image will be built, NOT started and pushed to the registry.
       - ``-y``                   (optional) - Disables the interactive confirmation with ``--no-validation``.
 
@@ -65,6 +72,7 @@ class ExportCommand(CliMixin):
         # Set up export parser and pass Export class to function call.
         self._parser = sub_parser.add_parser('export')
         CliMixin.__init__(self)
+        self._add_sweep_arguments()
         self._build_arguments()
         self._parser.set_defaults(func=self._export)
 
@@ -112,6 +120,31 @@ class ExportCommand(CliMixin):
             help='Allow build to use cached image layers.'
         )
 
+        self._parser.add_argument(
+            '--force-build',
+            required=False,
+            action='store_true',
+            default=False,
+            help="Build images even when an image built from the same build context already exists."
+        )
+
+        self._parser.add_argument(
+            '--build-concurrency',
+            required=False,
+            type=int,
+            default=BUILD_CONCURRENCY,
+            help='Maximum number of images built at the same time. defaults to {0}.'.format(BUILD_CONCURRENCY)
+        )
+
+        self._parser.add_argument(
+            '--cache-from-registry',
+            required=False,
+            action='store_true',
+            default=False,
+            help="Pull the last exported image from the destination registry and use it as the build cache. "
+                 "Requires a docker daemon with api version 1.25 or later."
+        )
+
         self._parser.add_argument(
             '--no-tagging-scheme',
             required=False,
@@ -162,7 +195,7 @@ class ExportCommand(CliMixin):
                     raise ValueError("Incorrect type defined. Required value: yes")
 
         # create new freight forwarder to create a commercial_invoice and export goods.
-        freight_forwarder = FreightForwarder()
+        freight_forwarder = FreightForwarder(sweep_interval=args.sweep_interval, background_sweep=args.background_sweep)
 
         # create commercial invoice this is the contact given to freight forwarder dispatch containers and images
         commercial_invoice = freight_forwarder.commercial_invoice(
@@ -181,6 +214,9 @@ class ExportCommand(CliMixin):
             tags=args.tag,
             test=args.test,
             use_cache=args.use_cache,
+            force_build=args.force_build,
+            build_concurrency=args.build_concurrency,
+            cache_from_registry=args.cache_from_registry,
             validate=not args.no_validation
         )
 
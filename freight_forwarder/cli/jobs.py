@@ -0,0 +1,119 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals
+import argparse
+
+import yaml
+
+from freight_forwarder               import FreightForwarder
+from freight_forwarder.const         import JOB_CAPACITY
+from freight_forwarder.long_shoremen import Job
+from freight_forwarder.utils         import logger
+from .cli_mixin                      import CliMixin
+
+
+class JobsCommand(CliMixin):
+    """ The jobs command runs batch jobs, one-off containers, across the docker hosts of a deploy environment.  Jobs
+    are read from a yaml file holding a list of jobs, each with a ``name``, an ``image`` and optionally a ``command``,
+    ``env`` and ``retries``.  Jobs are spread over the hosts, failed jobs are retried and every job's exit code and
+    duration are reported once all of them have finished.
+
+    :options:
+      - ``-h, --help``      (info) - Show the help message
+      - ``--data-center``   (**required**) - The data center to run jobs in. example: sea1, sea3, or us-east-1
+      - ``--environment``   (**required**) - The environment to run jobs in. example: development, test, or production
+      - ``--service``       (**required**) - The Service the jobs belong to, job containers are named after it.
+      - ``--jobs-file``     (**required**) - Path to the yaml file listing the jobs.
+      - ``--capacity``          (optional) - Maximum number of jobs running on a host at the same time. defaults to 2.
+      - ``--sweep-interval``    (optional) - Minimum seconds between dangling image clean ups on a host. defaults to 3600.
+      - ``--background-sweep``  (optional) - Clean up dangling images in a background process.
+
+    :return: exit_code, 0 when every job succeeded.
+    :rtype: integer
+    """
+
+    def __init__(self, sub_parser):
+        logger.setup_logging('cli')
+        if not isinstance(sub_parser, argparse._SubParsersAction):
+            raise TypeError(logger.error("parser should of an instance of argparse._SubParsersAction"))
+
+        # Set up jobs parser and pass jobs function to defaults.
+        self._parser = sub_parser.add_parser('jobs')
+        CliMixin.__init__(self)
+        self._add_sweep_arguments()
+        self._build_arguments()
+        self._parser.set_defaults(func=self.jobs)
+
+    def _build_arguments(self):
+        """
+        build arguments for command.
+        """
+        self._parser.add_argument(
+            '--jobs-file',
+            required=True,
+            type=str,
+            help='Path to a yaml file listing the jobs to run.'
+        )
+
+        self._parser.add_argument(
+            '--capacity',
+            required=False,
+            type=int,
+            default=JOB_CAPACITY,
+            help='Maximum number of jobs running on a host at the same time. defaults to {0}.'.format(JOB_CAPACITY)
+        )
+
+    def jobs(self, args, **extra_args):
+        """Run batch jobs across the container ships (hosts) of a deploy environment.
+
+        :param args:
+        :type args:
+        """
+        if not isinstance(args, argparse.Namespace):
+            raise TypeError(logger.error("args should of an instance of argparse.Namespace"))
+
+        jobs = load_jobs(args.jobs_file)
+
+        # create new freight forwarder
+        freight_forwarder = FreightForwarder(sweep_interval=args.sweep_interval, background_sweep=args.background_sweep)
+
+        # jobs are run on the hosts of the deploy action.
+        commercial_invoice = freight_forwarder.commercial_invoice(
+            'deploy',
+            args.data_center,
+            args.environment,
+            args.service
+        )
+
+        jobs = freight_forwarder.run_jobs(commercial_invoice, jobs, args.capacity)
+        for job in jobs:
+            logger.info("job: {0} host: {1} attempts: {2} exit code: {3} duration: {4:.2f}s".format(
+                job.name,
+                job.attempts[-1].host if job.attempts else None,
+                len(job.attempts),
+                job.exit_code,
+                job.duration
+            ))
+
+        exit_code = 0 if all(job.succeeded for job in jobs) else 1
+
+        if exit_code != 0:
+            exit(exit_code)
+
+
+def load_jobs(path):
+    """ Reads a list of :Job: from a yaml file.
+    """
+    with open(path) as jobs_file:
+        definitions = yaml.safe_load(jobs_file)
+
+    if not isinstance(definitions, list):
+        raise TypeError(logger.error("{0} must hold a list of jobs.".format(path)))
+
+    jobs = []
+    for definition in definitions:
+        if not isinstance(definition, dict):
+            raise TypeError(logger.error("each job in {0} must be a mapping. {1} was found.".format(path, definition)))
+
+        jobs.append(Job(**definition))
+
+    return jobs
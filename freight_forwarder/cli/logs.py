@@ -0,0 +1,101 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals
+import argparse
+import re
+import sys
+import time
+
+from freight_forwarder       import FreightForwarder
+from freight_forwarder.utils import logger
+from .cli_mixin              import CliMixin
+
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+class LogsCommand(CliMixin):
+    """ The logs command reads the logs of a service's containers on every docker host of the deploy environment at the
+    same time and prints them as one stream ordered by timestamp.  Each line is prefixed with the host and container it
+    came from.
+
+    :options:
+      - ``-h, --help``      (info) - Show the help message
+      - ``--data-center``   (**required**) - The data center to read logs from. example: sea1, sea3, or us-east-1
+      - ``--environment``   (**required**) - The environment to read logs from. example: development, test, or production
+      - ``--service``       (**required**) - The Service whose container logs will be read.
+      - ``--since``         (optional) - Only show lines written in the last duration. example: 90s, 15m, 2h, or 1d
+      - ``--tail``          (optional) - Number of lines to read from the end of each container's logs. defaults to all.
+
+    :return: exit_code
+    :rtype: integer
+    """
+
+    def __init__(self, sub_parser):
+        logger.setup_logging('cli')
+        if not isinstance(sub_parser, argparse._SubParsersAction):
+            raise TypeError(logger.error("parser should of an instance of argparse._SubParsersAction"))
+
+        # Set up logs parser and pass logs function to defaults.
+        self._parser = sub_parser.add_parser('logs')
+        CliMixin.__init__(self)
+        self._build_arguments()
+        self._parser.set_defaults(func=self.logs)
+
+    def _build_arguments(self):
+        """
+        build arguments for command.
+        """
+        self._parser.add_argument(
+            '--since',
+            required=False,
+            type=duration,
+            default=None,
+            help='Only show lines written in the last duration. example: 90s, 15m, 2h, or 1d'
+        )
+
+        self._parser.add_argument(
+            '--tail',
+            required=False,
+            type=int,
+            default=None,
+            help="Number of lines to read from the end of each container's logs. defaults to all."
+        )
+
+    def logs(self, args, **extra_args):
+        """Print the logs of a service's containers on every container ship (host) ordered by timestamp.
+
+        :param args:
+        :type args:
+        """
+        if not isinstance(args, argparse.Namespace):
+            raise TypeError(logger.error("args should of an instance of argparse.Namespace"))
+
+        # create new freight forwarder
+        freight_forwarder = FreightForwarder()
+
+        # logs are read from the hosts and services of the deploy action.
+        commercial_invoice = freight_forwarder.commercial_invoice(
+            'deploy',
+            args.data_center,
+            args.environment,
+            args.service
+        )
+
+        since = int(time.time()) - args.since if args.since is not None else None
+        tail  = args.tail if args.tail is not None else 'all'
+
+        try:
+            for line in freight_forwarder.logs(commercial_invoice, since=since, tail=tail):
+                sys.stdout.write("{0} [{1}] {2}\n".format(line.timestamp or '-', line.source, line.message))
+                sys.stdout.flush()
+        except KeyboardInterrupt:
+            pass
+
+
+def duration(value):
+    """ Converts a duration, a number optionally followed by s, m, h or d, into seconds.
+    """
+    match = re.match(r'\A(\d+)([smhd]?)\Z', value.strip())
+    if not match:
+        raise argparse.ArgumentTypeError("{0} isn't a valid duration. example: 90s, 15m, 2h, or 1d".format(value))
+
+    return int(match.group(1)) * DURATION_UNITS[match.group(2) or 's']
@@ -0,0 +1,76 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals
+import argparse
+
+import six
+
+from freight_forwarder       import FreightForwarder
+from freight_forwarder.utils import logger
+from .cli_mixin              import CliMixin
+
+
+class PrefetchCommand(CliMixin):
+    """ The prefetch command pulls the images of a service, its dependencies and dependents onto every docker host of
+    the deploy environment at the same time without touching any containers.  Running it ahead of a deploy means the
+    deploy only has to replace containers.
+
+    :options:
+      - ``-h, --help``      (info) - Show the help message
+      - ``--data-center``   (**required**) - The data center to prefetch. example: sea1, sea3, or us-east-1
+      - ``--environment``   (**required**) - The environment to prefetch. example: development, test, or production
+      - ``--service``       (**required**) - The Service whose images will be pulled.
+      - ``--tag``           (optional) - The tag of a specific image to pull from a registry. example: sea3-development-latest
+
+    :return: exit_code
+    :rtype: integer
+    """
+
+    def __init__(self, sub_parser):
+        logger.setup_logging('cli')
+        if not isinstance(sub_parser, argparse._SubParsersAction):
+            raise TypeError(logger.error("parser should of an instance of argparse._SubParsersAction"))
+
+        # Set up prefetch parser and pass prefetch function to defaults.
+        self._parser = sub_parser.add_parser('prefetch')
+        CliMixin.__init__(self)
+        self._build_arguments()
+        self._parser.set_defaults(func=self.prefetch)
+
+    def _build_arguments(self):
+        """
+        build arguments for command.
+        """
+        self._parser.add_argument(
+            '-t', '--tag',
+            required=False,
+            type=six.text_type,
+            default=None,
+            help='This tag will override image tag provided in the configuration file.'
+        )
+
+    def prefetch(self, args, **extra_args):
+        """Pull a service's images onto every container ship (host) of a deploy environment.
+
+        :param args:
+        :type args:
+        """
+        if not isinstance(args, argparse.Namespace):
+            raise TypeError(logger.error("args should of an instance of argparse.Namespace"))
+
+        # create new freight forwarder
+        freight_forwarder = FreightForwarder()
+
+        # images are pulled for the hosts and services of the deploy action.
+        commercial_invoice = freight_forwarder.commercial_invoice(
+            'deploy',
+            args.data_center,
+            args.environment,
+            args.service
+        )
+
+        bill_of_lading = freight_forwarder.prefetch(commercial_invoice, args.tag)
+
+        exit_code = 0 if bill_of_lading else 1
+
+        if exit_code != 0:
+            exit(exit_code)
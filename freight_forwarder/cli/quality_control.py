@@ -3,6 +3,7 @@ from __future__ import unicode_literals
 import argparse
 
 from freight_forwarder       import FreightForwarder
+from freight_forwarder.const import BUILD_CONCURRENCY
 from freight_forwarder.utils import logger
 from .cli_mixin              import CliMixin
 
@@ -17,12 +18,22 @@ class QualityControlCommand(CliMixin):
       - ``--data-center``  (**required**) - The data center to deploy. example: sea1, sea3, or us-east-1.
       - ``--environment``  (**required**) - The environment to deploy. example: development, test, or production.
       - ``--service``      (**required**) - The service that will be used for testing.
+      - ``--sweep-interval``    (optional) - Minimum seconds between dangling image clean ups on a host. defaults to 3600.
+      - ``--background-sweep``  (optional) - Clean up dangling images in a background process.
       - ``--attach``       (optional) - Attach to the service containers output.
       - ``--clean``        (optional) - Remove all images and containers after run.
       - ``-e, --env``      (optional) - list of environment variables to create on the container will override existing. example: MYSQL_HOST=172.17.0.4
       - ``--configs``      (optional) - Inject configuration files. Requires CIA integration.
       - ``--test``         (optional) - Run test Dockerfile must be provided in the configuration file.
       - ``--use-cache``    (optional) - Allows use of cache when building images defaults to false.
+      - ``--force-build``  (optional) - Build images even when the build context hasn't changed.
+      - ``--build-concurrency``  (optional) - Maximum number of images built at the same time. defaults to 4.
+      - ``--cache-from-registry`` (optional) - Seed the build cache with the last image exported to the destination registry.
+        Requires a docker daemon with api version 1.25 or later, otherwise nothing is pulled.
+      - ``--stats-interval`` (optional) - Sample cpu, memory, blkio and network usage of the service containers every so many seconds.
+      - ``--no-benchmark``   (optional) - Don't run the service's benchmark.
+      - ``--benchmark-baseline`` (optional) - Path to the benchmark baseline. defaults to one per service in ~/.freight_forwarder/data/benchmarks.
+      - ``--update-baseline``    (optional) - Record the benchmark results as the baseline instead of comparing them.
 
     :return: exit_code
     :rtype: integer
@@ -37,6 +48,7 @@ class QualityControlCommand(CliMixin):
         # Set up export parser and pass Export class to function call.
         self._parser = sub_parser.add_parser('quality-control')
         CliMixin.__init__(self)
+        self._add_sweep_arguments()
         self._build_arguments()
         self._parser.set_defaults(func=self._quality_control)
 
@@ -93,6 +105,63 @@ class QualityControlCommand(CliMixin):
             help='Allow build to use cached image layers.'
         )
 
+        self._parser.add_argument(
+            '--force-build',
+            required=False,
+            action='store_true',
+            default=False,
+            help="Build images even when an image built from the same build context already exists."
+        )
+
+        self._parser.add_argument(
+            '--build-concurrency',
+            required=False,
+            type=int,
+            default=BUILD_CONCURRENCY,
+            help='Maximum number of images built at the same time. defaults to {0}.'.format(BUILD_CONCURRENCY)
+        )
+
+        self._parser.add_argument(
+            '--cache-from-registry',
+            required=False,
+            action='store_true',
+            default=False,
+            help="Pull the last exported image from the destination registry and use it as the build cache. "
+                 "Requires a docker daemon with api version 1.25 or later."
+        )
+
+        self._parser.add_argument(
+            '--stats-interval',
+            required=False,
+            type=float,
+            default=None,
+            help='Sample the resource usage of the service containers every so many seconds and report percentiles.'
+        )
+
+        self._parser.add_argument(
+            '--no-benchmark',
+            required=False,
+            action='store_true',
+            default=False,
+            help="Don't run the service's benchmark."
+        )
+
+        self._parser.add_argument(
+            '--benchmark-baseline',
+            required=False,
+            type=str,
+            default=None,
+            help='Path to the benchmark baseline, a json object of metric to number.'
+        )
+
+        self._parser.add_argument(
+            '--update-baseline',
+            required=False,
+            action='store_true',
+            default=False,
+            help='Record the benchmark results as the baseline instead of comparing them.'
+        )
+
     def _quality_control(self, args, **extra_args):
         """
         Export is the entry point for exporting docker images.
@@ -102,7 +171,7 @@ class QualityControlCommand(CliMixin):
 
         # create new freight forwarder object
         # config_override=manifest_override
-        freight_forwarder = FreightForwarder()
+        freight_forwarder = FreightForwarder(sweep_interval=args.sweep_interval, background_sweep=args.background_sweep)
 
         # create commercial invoice this is the contact given to freight forwarder dispatch containers and images
         commercial_invoice = freight_forwarder.commercial_invoice(
@@ -120,6 +189,13 @@ class QualityControlCommand(CliMixin):
             test=args.test,
             configs=args.configs,
             use_cache=args.use_cache,
+            force_build=args.force_build,
+            build_concurrency=args.build_concurrency,
+            cache_from_registry=args.cache_from_registry,
+            stats_interval=args.stats_interval,
+            benchmark=not args.no_benchmark,
+            baseline=args.benchmark_baseline,
+            update_baseline=args.update_baseline,
             env=args.env
         )
 
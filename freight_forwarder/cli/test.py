@@ -18,7 +18,10 @@ class TestCommand(CliMixin):
       - ``--data-center``  (**required**) - The data center to deploy. example: sea1, sea3, or us-east-1
       - ``--environment``  (**required**) - The environment to deploy. example: development, test, or production
       - ``--service``      (**required**) - The service that will be used for testing.
+      - ``--sweep-interval``    (optional) - Minimum seconds between dangling image clean ups on a host. defaults to 3600.
+      - ``--background-sweep``  (optional) - Clean up dangling images in a background process.
       - ``--configs``      (optional) - Inject configuration files. Requires CIA integration.
+      - ``--stats-interval`` (optional) - Sample cpu, memory, blkio and network usage of the test containers every so many seconds.
 
     :return: exit_code
     :rtype: integer
@@ -30,6 +33,7 @@ class TestCommand(CliMixin):
         # Set up export parser and pass Export class to function call.
         self._parser = sub_parser.add_parser('test')
         CliMixin.__init__(self)
+        self._add_sweep_arguments()
         self._build_arguments()
         self._parser.set_defaults(func=self._test)
 
@@ -52,6 +56,14 @@ class TestCommand(CliMixin):
             help="Would you like to inject configuration files?"
         )
 
+        self._parser.add_argument(
+            '--stats-interval',
+            required=False,
+            type=float,
+            default=None,
+            help='Sample the resource usage of the test containers every so many seconds and report percentiles.'
+        )
+
     def _test(self, args, **extra_args):
         """
         Export is the entry point for exporting docker images.
@@ -61,7 +73,7 @@ class TestCommand(CliMixin):
 
         # create new freight forwarder object
         # config_override=manifest_override
-        freight_forwarder = FreightForwarder()
+        freight_forwarder = FreightForwarder(sweep_interval=args.sweep_interval, background_sweep=args.background_sweep)
 
         # create commercial invoice this is the contact given to freight forwarder dispatch containers and images
         commercial_invoice = freight_forwarder.commercial_invoice(
@@ -72,7 +84,7 @@ class TestCommand(CliMixin):
         )
 
         # run test container.
-        bill_of_lading = freight_forwarder.test(commercial_invoice, args.configs)
+        bill_of_lading = freight_forwarder.test(commercial_invoice, args.configs, stats_interval=args.stats_interval)
 
         # pretty lame... Need to work on return values through to app to make them consistent.
         exit_code = 0 if bill_of_lading else 1
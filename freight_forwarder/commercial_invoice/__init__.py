@@ -2,6 +2,7 @@
 # flake8: noqa
 from __future__ import unicode_literals, absolute_import
 
+from .benchmark            import Benchmark, load_baseline, write_baseline
 from .commercial_invoice   import CommercialInvoice
 from .service              import Service
 
@@ -0,0 +1,153 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals, absolute_import
+import json
+import os
+from collections import namedtuple
+
+import six
+
+from freight_forwarder.utils import logger
+
+DEFAULT_TOLERANCE = 10
+
+Regression = namedtuple('Regression', ['metric', 'baseline', 'result', 'tolerance'])
+
+
+class Benchmark(object):
+    """ A service's benchmark, a container run against the service's freshly started containers that prints its
+    metrics as a json object of metric name to number, on the last line of output that holds one.
+
+    The benchmark container is linked to every container of the service by container name and their names are passed
+    in the ``BENCHMARK_TARGETS`` environment variable, comma separated.
+
+    :param image: A :string:, the image the benchmark is run from. "repository:tag" or "repository@digest".
+    :param dockerfile: A :string:, path to a Dockerfile the benchmark image is built from instead of image.
+    :param command: A :list: or :string:, overrides the benchmark image's command.
+    :param env: A :dict: or :list: of "KEY=VALUE" environment variables.
+    :param tolerance: A number, percent a metric may be worse than its baseline. defaults to 10.
+    :param tolerances: A :dict: of metric to tolerance, overrides tolerance for those metrics.
+    :param higher_is_better: A :list: of metrics that regress when they go down, every other metric regresses when
+        it goes up.
+    """
+    def __init__(self, image=None, dockerfile=None, command=None, env=None, tolerance=DEFAULT_TOLERANCE,
+                 tolerances=None, higher_is_better=None):
+        if bool(image) == bool(dockerfile):
+            raise TypeError(logger.error("benchmark requires either an image or a dockerfile."))
+
+        if image is not None and not isinstance(image, six.string_types):
+            raise TypeError(logger.error("benchmark image must be a string. {0} was passed.".format(image)))
+
+        if dockerfile is not None:
+            if not isinstance(dockerfile, six.string_types):
+                raise TypeError(logger.error("benchmark dockerfile must be a string. {0} was passed.".format(dockerfile)))
+
+            if not os.path.exists(dockerfile):
+                raise OSError(logger.error("benchmark dockerfile path doesn't exist: {0}".format(dockerfile)))
+
+            dockerfile = os.path.abspath(dockerfile)
+
+        if command is not None and not isinstance(command, (list, six.string_types)):
+            raise TypeError(logger.error("benchmark command must be a list or a string."))
+
+        if env is not None and not isinstance(env, (dict, list)):
+            raise TypeError(logger.error("benchmark env must be a dict or a list."))
+
+        tolerances = tolerances or {}
+        if not isinstance(tolerances, dict):
+            raise TypeError(logger.error("benchmark tolerances must be a dict of metric to percent."))
+
+        for value in [tolerance] + list(tolerances.values()):
+            if not _is_number(value) or value < 0:
+                raise TypeError(logger.error("benchmark tolerances must be numbers of 0 or more. {0} was passed.".format(value)))
+
+        higher_is_better = higher_is_better or []
+        if not isinstance(higher_is_better, list):
+            raise TypeError(logger.error("benchmark higher_is_better must be a list of metrics."))
+
+        self.image            = image
+        self.dockerfile       = dockerfile
+        self.command          = command
+        self.env              = env
+        self.tolerance        = tolerance
+        self.tolerances       = tolerances
+        self.higher_is_better = higher_is_better
+
+    def compare(self, results, baseline):
+        """ Compares benchmark results with a baseline.  Metrics missing from the baseline are new and never regress,
+        metrics of the baseline missing from the results always do.
+
+        :param results: A :dict: of metric to number.
+        :param baseline: A :dict: of metric to number.
+        :rtype: A :list: of :Regression:, sorted by metric.
+        """
+        regressions = []
+        for metric, expected in sorted(six.iteritems(baseline)):
+            tolerance = self.tolerances.get(metric, self.tolerance)
+            result    = results.get(metric)
+            if result is None:
+                regressions.append(Regression(metric, expected, None, tolerance))
+                continue
+
+            margin = abs(expected) * tolerance / 100.0
+            if metric in self.higher_is_better:
+                regressed = result < expected - margin
+            else:
+                regressed = result > expected + margin
+
+            if regressed:
+                regressions.append(Regression(metric, expected, result, tolerance))
+
+        return regressions
+
+
+def parse_metrics(lines):
+    """ The metrics printed by a benchmark, the last line of output holding a json object of metric name to number.
+    Values that aren't numbers are dropped.
+
+    :param lines: An iterable of :string:, the benchmark's output.
+    :rtype: A :dict: of metric to number.
+    """
+    for line in reversed(list(lines)):
+        line = line.strip()
+        if not line.startswith('{'):
+            continue
+
+        try:
+            data = json.loads(line)
+        except ValueError:
+            continue
+
+        metrics = dict((key, value) for key, value in six.iteritems(data) if _is_number(value)) if isinstance(data, dict) else {}
+        if metrics:
+            return metrics
+
+    raise ValueError(logger.error("benchmark didn't print its metrics as a json object."))
+
+
+def load_baseline(path):
+    """ Reads a baseline written by :func:`write_baseline`, None when path doesn't exist.
+    """
+    if not os.path.isfile(path):
+        return None
+
+    with open(path) as baseline_file:
+        data = json.load(baseline_file)
+
+    metrics = data.get('metrics') if isinstance(data, dict) and 'metrics' in data else data
+    if not isinstance(metrics, dict):
+        raise ValueError(logger.error("baseline {0} must hold a json object of metric to number.".format(path)))
+
+    return metrics
+
+
+def write_baseline(path, metrics):
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    with open(path, 'w') as baseline_file:
+        json.dump({'metrics': metrics}, baseline_file, indent=2, sort_keys=True)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
@@ -1,16 +1,20 @@
 # -*- coding: utf-8; -*-
 from __future__ import unicode_literals, absolute_import
 import os
+import subprocess
 import time
 import six
 
-from ..container.config      import Config as ContainerConfig
-from ..container.host_config import HostConfig
-from ..registry              import Registry
-from .service                import Service
-from .injector               import Injector
-from ..container_ship        import ContainerShip
-from ..utils                 import logger
+from ..container.config          import Config as ContainerConfig
+from ..container.host_config     import HostConfig
+from ..container.readiness_probe import ReadinessProbe
+from ..registry                  import Registry, V2
+from .service                    import Service
+from .retention_policy           import RetentionPolicy
+from .benchmark                  import Benchmark
+from .injector                   import Injector
+from ..container_ship            import ContainerShip
+from ..utils                     import logger
 from ..const import (
     PROJECT_LABEL,
     TEAM_LABEL,
@@ -50,6 +54,8 @@ class CommercialInvoice(object):
         self._tags              = self._build_tags(tags) if tags else []
         self._services          = services
         self._transport_service = transport_service
+        self._git_sha           = None
+        self._source_digests    = {}
 
     @property
     def injector(self):
@@ -66,6 +72,19 @@ class CommercialInvoice(object):
     def transport_service(self):
         return self.services.get(self._transport_service)
 
+    @property
+    def git_sha(self):
+        """ The commit sha of the working directory's git repository or 'unknown' when git isn't available.
+        """
+        if self._git_sha is None:
+            try:
+                with open(os.devnull, 'w') as devnull:
+                    self._git_sha = subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=devnull).decode('utf-8').strip()
+            except (OSError, subprocess.CalledProcessError):
+                self._git_sha = 'unknown'
+
+        return self._git_sha
+
     @property
     def transport_method(self):
         return self._transport_method
@@ -113,6 +132,52 @@ class CommercialInvoice(object):
     def registries(self):
         return self._registries
 
+    ##
+    # Public Methods
+    ##
+    def resolve_digest(self, service):
+        """ Resolves service's source tag to a content digest through the registry API.  Digests are only resolved
+        once per invoice so every host deploys the same image even if the tag moves during the rollout.
+
+        :param service: A :Service: pulled from a source registry.
+        :return string: "sha256:..." or None when the tag can't be resolved.
+        """
+        registry = service.source_registry
+        if not isinstance(registry, V2) or not service.source_tag:
+            return None
+
+        repository = "{0}/{1}".format(service.repository, service.namespace)
+        key        = (registry.location, repository, service.source_tag)
+
+        if key not in self._source_digests:
+            try:
+                digest = registry.manifest_digest(repository, service.source_tag)
+            except Exception as e:
+                logger.warning("Unable to resolve {0}:{1} to a digest, hosts will pull the tag: {2}".format(
+                    repository, service.source_tag, e
+                ))
+                digest = None
+
+            if digest:
+                logger.info("Pinned {0}:{1} to {2}.".format(repository, service.source_tag, digest))
+
+            self._source_digests[key] = digest
+
+        return self._source_digests[key]
+
+    def pin_source_digests(self, service):
+        """ Sets source_digest on service and the services it depends on.
+
+        :param service: A :Service:
+        """
+        services = [service]
+        while services:
+            current = services.pop()
+            if current.source_registry and current.source_digest is None:
+                current.source_digest = self.resolve_digest(current)
+
+            services.extend(current.dependencies.values())
+
     ##
     # Private Methods
     ##
@@ -120,12 +185,15 @@ class CommercialInvoice(object):
         labels = {
             PROJECT_LABEL: self.project,
             TEAM_LABEL: self.team,
-            VERSION_LABEL: "place_holder",
-            GIT_LABEL: "place_holder",
+            GIT_LABEL: self.git_sha,
             TYPE_LABEL: name,
             TIMESTAMP_LABEL: "{0}".format(int(time.time()))
         }
 
+        # the version of built services is their build context digest, ContainerShip labels it when it builds them.
+        if not service.get('build'):
+            labels[VERSION_LABEL] = service.get('image', 'unknown')
+
         current_labels = service.get('labels')
 
         if current_labels:
@@ -258,7 +326,8 @@ class CommercialInvoice(object):
             host_data.get('address'),
             services=host_data.get('services'),
             ssl_cert_path=host_data.get('ssl_cert_path'),
-            verify=host_data.get('verify')
+            verify=host_data.get('verify'),
+            log_buffer=host_data.get('log_buffer')
         )
 
     def _configure_service_dependencies(self, services):
@@ -335,7 +404,12 @@ class CommercialInvoice(object):
             docker_file=docker_file,
             test_docker_file=service.get('test'),
             source_registry=source_registry,
-            destination_registry=destination_registry
+            destination_registry=destination_registry,
+            retention_policy=RetentionPolicy(**service.get('retention', {})),
+            rollout=service.get('rollout', 'recreate'),
+            readiness_probe=ReadinessProbe(**service['readiness']) if service.get('readiness') else None,
+            replicas=service.get('replicas', 1),
+            benchmark=Benchmark(**service['benchmark']) if service.get('benchmark') else None
         )
 
     def _create_services(self, service_data):
@@ -346,5 +420,46 @@ class CommercialInvoice(object):
                 services[service.alias] = self._create_service(service.alias, service)
 
         self._configure_service_dependencies(services)
+        self._validate_replica_ports(services)
 
         return services
+
+    @staticmethod
+    def _validate_replica_ports(services):
+        """ Replicas offset fixed host ports by their index, a service publishing 8080 with 3 replicas binds 8080, 8081
+        and 8082.  Make sure the offset ports are valid and aren't bound by another service.
+        """
+        bindings = []
+        for service in six.itervalues(services):
+            port_bindings = service.host_config.port_bindings if service.host_config else None
+            for port_protocol, host_bindings in six.iteritems(port_bindings or {}):
+                protocol = port_protocol.split('/')[-1]
+                for host_binding in host_bindings or []:
+                    host_port = six.text_type(host_binding.get('host_port') or '')
+                    if not host_port.isdigit():
+                        continue
+
+                    for replica in range(service.replicas):
+                        port = int(host_port) + replica
+                        if port > 65535:
+                            raise ValueError(logger.error(
+                                "{0} publishes {1} with {2} replicas, host ports past 65535 can't be bound.".format(
+                                    service.alias, host_port, service.replicas
+                                )
+                            ))
+
+                        bindings.append((service.alias, replica, host_binding.get('host_ip') or '', protocol, port))
+
+        for index, (alias, replica, host_ip, protocol, port) in enumerate(bindings):
+            for other_alias, other_replica, other_host_ip, other_protocol, other_port in bindings[index + 1:]:
+                if alias == other_alias or not (replica or other_replica):
+                    continue
+
+                if (protocol, port) != (other_protocol, other_port):
+                    continue
+
+                if host_ip in ('', '0.0.0.0') or other_host_ip in ('', '0.0.0.0') or host_ip == other_host_ip:
+                    raise ValueError(logger.error(
+                        "{0} and {1} both bind host port {2}/{3}, replicas offset fixed host ports by their index. "
+                        "Move one of the services to a free port range.".format(alias, other_alias, port, protocol)
+                    ))
@@ -0,0 +1,120 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals, absolute_import
+from datetime import datetime, timedelta
+from fnmatch  import fnmatch
+
+import six
+
+from freight_forwarder.utils import logger
+
+DEFAULT_KEEP = 2
+
+
+class RetentionPolicy(object):
+    """ Decides which of a service's images (cargo) have expired on a container ship.
+
+    An image is retained when any of the following is true:
+      - it is one of the ``keep`` most recently created images.
+      - it is newer than ``max_age`` hours.
+      - one of its repo tags matches a pattern in ``keep_tags``.
+      - it is used by a running or previous container.
+
+    :param keep: An :int:, number of the most recent images to keep. defaults to 2.
+    :param max_age: An :int:, images created within this many hours are kept. defaults to None.
+    :param keep_tags: A :list: of fnmatch style patterns. Images with a matching repo tag are kept.
+    """
+    def __init__(self, keep=DEFAULT_KEEP, max_age=None, keep_tags=None):
+        self.keep      = keep
+        self.max_age   = max_age
+        self.keep_tags = keep_tags
+
+    @property
+    def keep(self):
+        return self._keep
+
+    @keep.setter
+    def keep(self, value):
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            raise TypeError(logger.error("retention keep must be a non-negative int. {0} was passed.".format(value)))
+
+        self._keep = value
+
+    @property
+    def max_age(self):
+        return self._max_age
+
+    @max_age.setter
+    def max_age(self, value):
+        if value is None:
+            self._max_age = None
+        elif not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            raise TypeError(logger.error("retention max_age must be a non-negative int. {0} was passed.".format(value)))
+        else:
+            self._max_age = timedelta(hours=value)
+
+    @property
+    def keep_tags(self):
+        return self._keep_tags
+
+    @keep_tags.setter
+    def keep_tags(self, value):
+        if value is None:
+            value = []
+
+        if not isinstance(value, list):
+            raise TypeError(logger.error("retention keep_tags must be a list. {0} was passed.".format(value)))
+
+        for pattern in value:
+            if not isinstance(pattern, six.string_types):
+                raise TypeError(logger.error("retention keep_tags must be a list of strings."))
+
+        self._keep_tags = value
+
+    def expired(self, cargoes, in_use=None):
+        """ Returns a list of expired cargo.  The cargo is sorted once by creation date, newest first, and every
+        image is evaluated a single time.
+
+        :param cargoes: An iterable of :Image: objects.
+        :param in_use: An iterable of image ids referenced by containers.
+        :rtype: A :list: of :Image: objects that should be removed.
+        """
+        in_use  = set(in_use) if in_use else set()
+        now     = datetime.utcnow()
+        expired = []
+
+        for index, cargo in enumerate(sorted(cargoes, key=lambda cargo: cargo.created_at, reverse=True)):
+            if index < self.keep:
+                continue
+
+            if cargo.id in in_use:
+                continue
+
+            if self.max_age is not None and now - cargo.created_at < self.max_age:
+                continue
+
+            if self._tag_retained(cargo):
+                continue
+
+            expired.append(cargo)
+
+        return expired
+
+    ##
+    # private methods
+    ##
+    def _tag_retained(self, cargo):
+        if not self.keep_tags:
+            return False
+
+        repo_tags = set(getattr(cargo, 'repo_tags', ()) or ())
+        repo_tags.add(cargo.identifier)
+
+        for repo_tag in repo_tags:
+            # patterns are matched against the full repo tag as well as just the tag.
+            tag = repo_tag.rsplit(':', 1)[-1]
+
+            for pattern in self.keep_tags:
+                if fnmatch(repo_tag, pattern) or fnmatch(tag, pattern):
+                    return True
+
+        return False
@@ -3,17 +3,24 @@ from __future__ import unicode_literals, absolute_import
 import six
 import os
 
-from freight_forwarder.image                 import Image
-from freight_forwarder.registry              import Registry, V1, V2
-from freight_forwarder.container.host_config import HostConfig
-from freight_forwarder.container.config      import Config as ContainerConfig
-from freight_forwarder.utils                 import logger
-from .container_dict                         import ContainerDict
+from freight_forwarder.image                     import Image
+from freight_forwarder.registry                  import Registry, V1, V2
+from freight_forwarder.container.host_config     import HostConfig
+from freight_forwarder.container.config          import Config as ContainerConfig
+from freight_forwarder.container.readiness_probe import ReadinessProbe
+from freight_forwarder.utils                     import logger
+from .benchmark                                  import Benchmark
+from .container_dict                             import ContainerDict
+from .retention_policy                           import RetentionPolicy
+
+ROLLOUT_STRATEGIES = ('recreate', 'surge')
 
 
 class Service(object):
     def __init__(self, repository, namespace, name, alias, container_config=None, docker_file=None, host_config=None,
-                 source_registry=None, destination_registry=None, source_tag=None, test_docker_file=None):
+                 source_registry=None, destination_registry=None, source_tag=None, test_docker_file=None,
+                 retention_policy=None, context_digest=None, rollout='recreate', readiness_probe=None,
+                 replicas=1, benchmark=None):
         """
          EXPLAIN ME!
         """
@@ -54,6 +61,7 @@ class Service(object):
 
         self.docker_file      = docker_file
         self.test_docker_file = test_docker_file
+        self.context_digest   = context_digest
 
         # Source registry will be the default registry is source registry is None and there isn't a Dockerfile
         if source_registry is None and not self.docker_file:
@@ -69,6 +77,11 @@ class Service(object):
 
         self.container_config = container_config
         self.host_config      = host_config
+        self.retention_policy = retention_policy
+        self.rollout          = rollout
+        self.readiness_probe  = readiness_probe
+        self.replicas         = replicas
+        self.benchmark        = benchmark
 
     ##
     # properties
@@ -77,6 +90,19 @@ class Service(object):
     def alias(self):
         return self._alias
 
+    @property
+    def benchmark(self):
+        """ The :Benchmark: run against this service's containers during quality control, None when it has none.
+        """
+        return self._benchmark
+
+    @benchmark.setter
+    def benchmark(self, value):
+        if value is not None and not isinstance(value, Benchmark):
+            raise TypeError("benchmark must be an instance of Benchmark.")
+
+        self._benchmark = value
+
     @property
     def cargo(self):
         return self._cargo
@@ -88,6 +114,25 @@ class Service(object):
 
         self._cargo = value
 
+    @property
+    def context_digest(self):
+        """ The content digest of this service's build context, set when the service is built.
+        """
+        return self._context_digest
+
+    @context_digest.setter
+    def context_digest(self, value):
+        if value is not None and not isinstance(value, six.string_types):
+            raise TypeError("context_digest must be a string or None.")
+
+        self._context_digest = value
+
+    @property
+    def context_tag(self):
+        """ The image tag used to identify images built from this service's build context.
+        """
+        return "ctx-{0}".format(self.context_digest[:12]) if self.context_digest else None
+
     @property
     def containers(self):
         return self._containers
@@ -170,6 +215,61 @@ class Service(object):
     def repository(self):
         return self._repository
 
+    @property
+    def readiness_probe(self):
+        """ The :ReadinessProbe: that decides when this service's containers are ready, None when they are only
+        checked for a failed exit code.
+        """
+        return self._readiness_probe
+
+    @readiness_probe.setter
+    def readiness_probe(self, value):
+        if value is not None and not isinstance(value, ReadinessProbe):
+            raise TypeError("readiness_probe must be an instance of ReadinessProbe.")
+
+        self._readiness_probe = value
+
+    @property
+    def replicas(self):
+        """ The number of containers run for this service on each host.
+        """
+        return self._replicas
+
+    @replicas.setter
+    def replicas(self, value):
+        if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+            raise TypeError(logger.error("replicas must be an int greater than 0. {0} was passed.".format(value)))
+
+        self._replicas = value
+
+    @property
+    def retention_policy(self):
+        return self._retention_policy
+
+    @retention_policy.setter
+    def retention_policy(self, value):
+        if value is None:
+            self._retention_policy = RetentionPolicy()
+        else:
+            if isinstance(value, RetentionPolicy):
+                self._retention_policy = value
+            else:
+                raise TypeError("retention_policy must be and instance of RetentionPolicy.")
+
+    @property
+    def rollout(self):
+        """ How running containers are replaced.  ``recreate`` stops them before the new containers are started,
+        ``surge`` starts the new containers first and stops the previous ones once the new ones are healthy.
+        """
+        return self._rollout
+
+    @rollout.setter
+    def rollout(self, value):
+        if value not in ROLLOUT_STRATEGIES:
+            raise ValueError(logger.error("rollout must be one of {0}. {1} was passed.".format(ROLLOUT_STRATEGIES, value)))
+
+        self._rollout = value
+
     @property
     def source_registry(self):
         return self._source_registry
@@ -195,6 +295,22 @@ class Service(object):
 
         self._source_tag = value
 
+        # a digest pinned for the previous tag no longer applies.
+        self._source_digest = None
+
+    @property
+    def source_digest(self):
+        """ The content digest source_tag was resolved to. When set the image is pulled by digest.
+        """
+        return self._source_digest
+
+    @source_digest.setter
+    def source_digest(self, value):
+        if value is not None and not isinstance(value, six.string_types):
+            raise TypeError(logger.error("source_digest must be a string or None."))
+
+        self._source_digest = value
+
     ##
     # public methods
     ##
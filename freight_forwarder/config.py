@@ -166,6 +166,61 @@ ROOT_SCHEME = {
                     'type': bool
                 }
             },
+            'benchmark': {
+                'is': {
+                    'type': dict
+                },
+                'image': {
+                    'is': {
+                        'type': six.string_types
+                    }
+                },
+                'dockerfile': {
+                    'is': {
+                        'type': six.string_types
+                    }
+                },
+                'command': {
+                    'is': {
+                        'type': (six.string_types, list)
+                    }
+                },
+                'env': {
+                    'is': {
+                        'type': (dict, list)
+                    },
+                    '*': {
+                        'is': {
+                            'type': six.string_types
+                        }
+                    }
+                },
+                'tolerance': {
+                    'is': {
+                        'type': (int, float)
+                    }
+                },
+                'tolerances': {
+                    'is': {
+                        'type': dict
+                    },
+                    '*': {
+                        'is': {
+                            'type': (int, float)
+                        }
+                    }
+                },
+                'higher_is_better': {
+                    'is': {
+                        'type': list,
+                        'items': {
+                            'is': {
+                                'type': six.string_types
+                            }
+                        }
+                    }
+                }
+            },
             'build': {
                 'is': {
                     'type': six.string_types
@@ -631,11 +686,94 @@ ROOT_SCHEME = {
                     'type': bool
                 }
             },
+            'readiness': {
+                'is': {
+                    'type': dict,
+                    'required': ['type']
+                },
+                'type': {
+                    'is': {
+                        'one_of': ('http', 'tcp', 'exec', 'healthcheck'),
+                        'type': six.string_types
+                    }
+                },
+                'port': {
+                    'is': {
+                        'type': int
+                    }
+                },
+                'path': {
+                    'is': {
+                        'type': six.string_types
+                    }
+                },
+                'command': {
+                    'is': {
+                        'type': (six.string_types, list)
+                    }
+                },
+                'interval': {
+                    'is': {
+                        'type': (int, float)
+                    }
+                },
+                'timeout': {
+                    'is': {
+                        'type': (int, float)
+                    }
+                },
+                'success_threshold': {
+                    'is': {
+                        'type': int
+                    }
+                },
+                'max_wait': {
+                    'is': {
+                        'type': (int, float)
+                    }
+                }
+            },
+            'replicas': {
+                'is': {
+                    'type': int
+                }
+            },
             'restart': {
                 'is': {
                     'type': dict
                 }
             },
+            'retention': {
+                'is': {
+                    'type': dict
+                },
+                'keep': {
+                    'is': {
+                        'type': int
+                    }
+                },
+                'max_age': {
+                    'is': {
+                        'type': int
+                    }
+                },
+                'keep_tags': {
+                    'is': {
+                        'type': list,
+                        'items': {
+                            'is': {
+                                'type': six.string_types
+                            }
+                        }
+                    }
+                }
+            },
+            'rollout': {
+                'is': {
+                    'one_of': ('recreate', 'surge'),
+                    'type': six.string_types
+                }
+            },
             'security_opt': {
                 'is': {
                     'type': list
@@ -823,6 +961,21 @@ ROOT_SCHEME = {
                 'is': {
                     'type': bool
                 }
+            },
+            'log_buffer': {
+                'is': {
+                    'type': dict
+                },
+                'max_bytes': {
+                    'is': {
+                        'type': int
+                    }
+                },
+                'max_lines': {
+                    'is': {
+                        'type': int
+                    }
+                }
             }
 
         }
@@ -842,6 +995,11 @@ VALIDATORS = (
     'min',
 )
 
+# the keys of dicts stored under these keys are case sensitive and aren't normalized.
+PRESERVED_KEYS = (
+    'env',
+)
+
 RESERVED_SCHEME_KEYS = (
     'is',
     'ref',
@@ -1015,7 +1173,7 @@ class Config(object):
                 elif file_extension == '.json':
                     try:
                         config_data = json.loads(config_file.read())
-                        self._data  = normalize_keys(config_data)
+                        self._data  = normalize_keys(config_data, preserve=PRESERVED_KEYS)
                     except Exception:
                         raise SyntaxError("There is a syntax error in your freight-forwarder config.")
                 else:
@@ -1044,7 +1202,7 @@ class Config(object):
                 return data
 
             def construct_yaml_float(self, node):
-                obj, = SafeConstructor.construct_yaml_float(self, node)
+                obj  = SafeConstructor.construct_yaml_float(self, node)
                 data = ConfigFloat(
                     obj,
                     node.start_mark,
@@ -1098,7 +1256,7 @@ class Config(object):
             if data is None:
                 raise AttributeError('The configuration file needs to have data in it.')
 
-            self._data = normalize_keys(data, snake_case=False)
+            self._data = normalize_keys(data, snake_case=False, preserve=PRESERVED_KEYS)
         except YAMLError as e:
             if hasattr(e, 'problem_mark'):
                 mark = e.problem_mark
@@ -7,6 +7,32 @@ VERSION = "1.0.3-dev"
 DOCKER_DEFAULT_TIMEOUT = 120
 DOCKER_API_VERSION     = '1.20'
 
+# first docker api version whose builds accept cache sources.
+CACHE_FROM_API_VERSION = '1.25'
+
+# maximum number of concurrent requests made to a single docker daemon.
+DOCKER_MAX_CONCURRENCY = 8
+
+# attempts made to create a container when another client takes its name first.
+CONTAINER_NAME_RETRIES = 5
+
+# maximum number of batch jobs run on a single docker host at the same time.
+JOB_CAPACITY = 2
+
+# maximum number of images built on a single docker daemon at the same time.
+BUILD_CONCURRENCY = 4
+
+# minimum number of seconds between dangling image sweeps of a single docker host.
+DANGLING_SWEEP_INTERVAL = 3600
+
+# output kept in memory for each container whose logs are collected, the oldest lines are dropped first.
+LOG_BUFFER_BYTES = 1024 * 1024
+LOG_BUFFER_LINES = 10000
+
+# seconds between resource usage samples of a container and values kept per metric and service.
+STATS_INTERVAL    = 5
+STATS_MAX_SAMPLES = 10000
+
 # docker labels
 PROJECT_LABEL   = 'com.freight-forwarder.project'
 TEAM_LABEL      = 'com.freight-forwarder.team'
@@ -1,4 +1,7 @@
 # -*- coding: utf-8; -*-
 # flake8: noqa
 __author__ = 'alexander'
-from .container import Container
+from .container       import Container
+from .log_collector   import LogCollector
+from .readiness_probe import ReadinessProbe
+from .stats_collector import StatsCollector
@@ -1,24 +1,26 @@
 # -*- coding: utf-8; -*-
 from __future__      import unicode_literals
 from datetime        import datetime
-from multiprocessing import Process, Queue
 import time
-import sys
 import six
-import signal
 import dateutil.parser
 import docker
 from docker.errors import APIError
 
+from ..const import LOG_BUFFER_LINES
 from ..utils import parse_stream, normalize_keys, capitalize_keys, logger
 from .config import Config as ContainerConfig
 from .host_config import HostConfig
+from .log_buffer import iter_lines
+from .log_collector import LogCollector
+from .readiness_probe import ReadinessProbe
 
 
 class Container(object):
     """ This is a domain object that represents a docker container.
     """
-    def __init__(self, client, name=None, image=None, id=None, container_config={}, host_config={}):
+    def __init__(self, client, name=None, image=None, id=None, container_config={}, host_config={},
+                 readiness_probe=None):
         if not isinstance(container_config, dict):
             raise TypeError('host_config needs to be of type dict.')
 
@@ -28,26 +30,23 @@ class Container(object):
         if not isinstance(client, docker.Client):
             raise TypeError("client needs to be of type docker.Client, not: {0}".format(client))
 
+        if readiness_probe is not None and not isinstance(readiness_probe, ReadinessProbe):
+            raise TypeError("readiness_probe needs to be of type ReadinessProbe, not: {0}".format(readiness_probe))
+
         if not id and (not name or not image):
             raise AttributeError("Must provide name and image or id when instantiating the Container class.")
 
-        self.client            = client
-        self._transcribe       = False
-        self._transcribe_queue = None
-        self._transcribe_proc  = None
-        self.config            = ContainerConfig(container_config)
-        self.host_config       = HostConfig(host_config)
+        self.client          = client
+        self._transcribe     = False
+        self.config          = ContainerConfig(container_config)
+        self.host_config     = HostConfig(host_config)
+        self.readiness_probe = readiness_probe
 
         if id:
             self._find_by_id(id)
         else:
             self._create_container(name, image)
 
-    def __del__(self):
-        if hasattr(self, '_transcribe_proc'):
-            if self._transcribe_proc:
-                self._transcribe_proc.terminate()
-
     @property
     def config(self):
         """
@@ -81,6 +80,13 @@ class Container(object):
 
         self._host_config = host_config
 
+    @property
+    def log_collector(self):
+        """
+        The :LogCollector: shared by every container using this container's client.
+        """
+        return LogCollector.for_client(self.client)
+
     def attach(self, stdout=True, stderr=True, stream=True, logs=False):
         """
         Keeping this simple until we need to extend later.
@@ -114,6 +120,9 @@ class Container(object):
         if self.state()["running"]:
             self.stop()
 
+        if self._transcribe:
+            self.log_collector.release(self)
+
         logger.info('is being deleted.', extra={'formatter': 'container', 'container': self.name})
         try:
             response = self.client.remove_container(self.id, remove_volumes, links, force)
@@ -131,15 +140,52 @@ class Container(object):
         # TODO: build object and return self converted.
         return self.client.inspect_container(self.id)
 
-    def output(self):
-        output = self.client.logs(self.id, stdout=True, stderr=True, stream=False, timestamps=False, tail='all')
+    def output(self, since=None, tail='all', stream=False, timestamps=False, follow=False):
+        """
+        The container's stdout and stderr.  since and tail are applied by the docker daemon.
+
+        :param since: An :int: unix timestamp or a :datetime:, only output written after it is returned.
+        :param tail: An :int: or 'all', number of lines from the end of the output.
+        :param stream: When True a generator of :bytes: chunks is returned.
+        :param timestamps: When True each line is prefixed with the time it was written.
+        :param follow: When True a stream only ends once the container exits.
+        """
+        output = self.client.logs(
+            self.id, stdout=True, stderr=True, stream=stream, timestamps=timestamps, tail=tail, since=since, follow=follow
+        )
 
         return output
 
-    def start(self, attach=False):
+    def execute(self, cmd, output=None):
+        """
+        Run cmd inside the running container with docker exec, streaming its stdout and stderr a line at a time.
+
+        :param cmd: A :list: or :string:, the command to run.
+        :param output: A file like object with a write method. defaults to logging each line.
+        :returns: An :int:, the command's exit code.
+        """
+        exec_id = normalize_keys(self.client.exec_create(self.id, cmd, stdout=True, stderr=True))['id']
+
+        for line in iter_lines(self.client.exec_start(exec_id, stream=True)):
+            if output is None:
+                logger.info(line, extra={'formatter': 'container', 'container': self.name})
+            else:
+                output.write(line + '\n')
+
+        return normalize_keys(self.client.exec_inspect(exec_id)).get('exit_code')
+
+    def stats(self):
+        """
+        A single sample of the container's cpu, memory, blkio and network usage from the docker stats api.
+        """
+        return self.client.stats(self.id, stream=False)
+
+    def start(self, attach=False, wait=True):
         """
         Start a container.  If the container is running it will return itself.
 
+        :param wait: when False return as soon as the container is started instead of waiting for it to be ready,
+                     call verify to check on the container later.
         returns a running Container.
         """
         if self.state()['running']:
@@ -170,28 +216,41 @@ class Container(object):
                 self.attach()
                 exit_code = self.wait()
 
+            elif not wait:
+                return True
+
             else:
-                exit_code = self._wait_for_exit_code()
+                return self.verify()
 
             return True if exit_code == 0 else False
 
-    def start_transcribing(self):
+    def verify(self, timer=10):
+        """
+        Wait for a started container to be ready.  The container's readiness probe is used when it has one, then the
+        image's HEALTHCHECK, otherwise wait up to timer seconds for the container to fail.
+
+        returns True when the container is ready, still running or exited cleanly.
         """
+        readiness_probe = self.readiness_probe
+        if readiness_probe is None and self.state().get('health'):
+            readiness_probe = ReadinessProbe('healthcheck')
+
+        if readiness_probe is not None:
+            return readiness_probe.wait(self)
+
+        exit_code = self._wait_for_exit_code(timer)
 
-        :return:
+        return exit_code is None or exit_code == 0
+
+    def start_transcribing(self):
+        """
+        Buffer the container's output through the log collector shared by every container using this client.
+        Used for log drivers that docker can't read logs back from.
         """
         if not self._transcribe:
             self._transcribe = True
 
-        if self._transcribe_queue is None:
-            self._transcribe_queue = Queue()
-
-        if self._transcribe_proc is None:
-            # add for debugging
-            # print "Starting to record container output for {0}.".format(self.name)
-            self._transcribe_proc = Process(target=self._start_recording, args=(self._transcribe_queue,))
-            self._transcribe_proc.daemon = True
-            self._transcribe_proc.start()
+        self.log_collector.collect(self)
 
     def state(self):
         """
@@ -235,29 +294,29 @@ class Container(object):
 
         return response
 
-    def dump_logs(self):
-        """dump entirety of the container logs to stdout
+    def dump_logs(self, output=None, tail=LOG_BUFFER_LINES):
+        """
+        Stream the container's logs, a line at a time, to output or to the logger.  Collected output is drained from
+        the container's log buffer, otherwise the last tail lines are streamed from docker.
 
-            :returns None
+        :param output: A file like object with a write method. defaults to logging each line as an error.
+        :param tail: An :int: or 'all', lines read from docker when the output wasn't collected.
+        :returns None
         """
-        msg = "log dump: \n"
         if self._transcribe:
-            if self._transcribe_queue:
-                while not self._transcribe_queue.empty():
-                    logs = self._transcribe_queue.get()
-
-                    if isinstance(logs, six.binary_type):
-                        logs = logs.decode(encoding='UTF-8', errors="ignore")
-
-                    msg = '{0} {1}'.format(msg, logs)
+            chunks = self.log_collector.drain(self)
         else:
-            logs = self.client.logs(self.id, stdout=True, stderr=True, stream=False, timestamps=False, tail='all')
-            if isinstance(logs, six.binary_type):
-                logs = logs.decode(encoding='UTF-8', errors="ignore")
-
-            msg = '{0}{1}'.format(msg, logs)
+            # streaming implies follow in docker-py, a container that is still running would never end the dump.
+            chunks = self.client.logs(
+                self.id, stdout=True, stderr=True, stream=True, timestamps=False, tail=tail, follow=False
+            )
 
-        logger.error(msg)
+        logger.error('log dump:', extra={'formatter': 'container', 'container': self.name})
+        for line in iter_lines(chunks):
+            if output is None:
+                logger.error(line, extra={'formatter': 'container', 'container': self.name})
+            else:
+                output.write(line + '\n')
 
     ###
     # Static methods
@@ -425,38 +484,6 @@ class Container(object):
         if self._transcribe:
             self.start_transcribing()
 
-    def _handler(self, signum=None, frame=None):
-        # add for debugging
-        # print 'Transcriber is being terminated with signum: {1}.\n'.format(self.name, signum)
-        sys.exit(0)
-
-    def _start_recording(self, queue):
-        """
-        """
-        for sig in [signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGQUIT]:
-            signal.signal(sig, self._handler)
-
-        client = None
-        try:
-            if isinstance(self.client.verify, bool):
-                tls_config = docker.tls.TLSConfig(
-                    client_cert=self.client.cert,
-                    verify=self.client.verify
-                )
-            else:
-                tls_config = docker.tls.TLSConfig(
-                    client_cert=self.client.cert,
-                    ca_cert=self.client.verify
-                )
-
-            client = docker.Client(self.client.base_url, tls=tls_config, timeout=self.client.timeout, version=self.client.api_version)
-
-            for line in client.attach(self.id, True, True, True, False):
-                queue.put(line)
-        finally:
-            if isinstance(client, docker.Client):
-                client.close()
-
     def _wait_for_exit_code(self, timer=10):
         """
         """
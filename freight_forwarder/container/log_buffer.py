@@ -0,0 +1,137 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals
+import codecs
+import threading
+from collections import deque
+
+import six
+
+from ..const import LOG_BUFFER_BYTES, LOG_BUFFER_LINES
+
+
+class LogBuffer(object):
+    """ A fixed size ring buffer of output lines.
+
+    Once more than ``max_bytes`` or ``max_lines`` are buffered the oldest lines are dropped, so memory stays flat no
+    matter how much a container writes.  A line that doesn't end before ``max_bytes`` is split, keeping its tail.
+
+    :param max_bytes: An :int:, maximum number of bytes buffered. defaults to LOG_BUFFER_BYTES.
+    :param max_lines: An :int:, maximum number of lines buffered. defaults to LOG_BUFFER_LINES.
+    """
+    def __init__(self, max_bytes=LOG_BUFFER_BYTES, max_lines=LOG_BUFFER_LINES):
+        for name, value in (('max_bytes', max_bytes), ('max_lines', max_lines)):
+            if not isinstance(value, six.integer_types) or isinstance(value, bool) or value < 1:
+                raise TypeError("{0} must be a positive int. {1} was passed.".format(name, value))
+
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self.size      = 0
+        self.dropped   = 0
+        self._lines    = deque()
+        self._partial  = b''
+        self._lock     = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._lines) + (1 if self._partial else 0)
+
+    def append(self, data):
+        """ Buffer data, dropping the oldest lines when the buffer is full.
+
+        :param data: :bytes: of output.
+        """
+        with self._lock:
+            lines         = (self._partial + data).split(b'\n')
+            self._partial = lines.pop()
+
+            for line in lines:
+                self._push(line + b'\n')
+
+            if len(self._partial) >= self.max_bytes:
+                self._push(self._partial)
+                self._partial = b''
+
+            self._evict()
+
+    def drain(self):
+        """ Remove and return everything buffered, oldest first.
+
+        :rtype: A :list: of :bytes: lines.
+        """
+        with self._lock:
+            lines = list(self._lines)
+            if self._partial:
+                lines.append(self._partial)
+
+            self._lines.clear()
+            self._partial = b''
+            self.size     = 0
+
+        return lines
+
+    ##
+    # private methods
+    ##
+    def _push(self, line):
+        if len(line) > self.max_bytes:
+            line = line[-self.max_bytes:]
+
+        self._lines.append(line)
+        self.size += len(line)
+
+    def _evict(self):
+        while self._lines and (self.size + len(self._partial) > self.max_bytes or len(self._lines) > self.max_lines):
+            self.size    -= len(self._lines.popleft())
+            self.dropped += 1
+
+
+class CapturedOutput(object):
+    """ A file like object that writes output through to stream and keeps its last lines in a :LogBuffer:, so the
+    output of a one-off container can be inspected once it exits without holding on to all of it.
+
+    :param stream: file like object the output is written to.
+    :param max_lines: An :int:, maximum number of lines kept. defaults to LOG_BUFFER_LINES.
+    :param max_bytes: An :int:, maximum number of bytes kept. defaults to LOG_BUFFER_BYTES.
+    """
+    def __init__(self, stream, max_lines=LOG_BUFFER_LINES, max_bytes=LOG_BUFFER_BYTES):
+        self.lines   = []
+        self._stream = stream
+        self._buffer = LogBuffer(max_bytes=max_bytes, max_lines=max_lines)
+
+    def write(self, data):
+        self._stream.write(data)
+        self._buffer.append(data.encode('utf-8') if isinstance(data, six.text_type) else data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        """ Close stream and decode the kept lines into lines.
+        """
+        self._stream.close()
+        lines      = self._buffer.drain()[-self._buffer.max_lines:]
+        self.lines = [line.decode('utf-8', 'replace').rstrip('\r\n') for line in lines]
+
+
+def iter_lines(chunks):
+    """ Yields decoded lines from an iterable of :bytes: chunks, holding on to no more than one partial line.
+
+    :param chunks: An iterable of :bytes: or :string:.
+    :rtype: A generator of :string:
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    partial = ''
+
+    for chunk in chunks:
+        if isinstance(chunk, six.binary_type):
+            chunk = decoder.decode(chunk)
+
+        lines   = (partial + chunk).split('\n')
+        partial = lines.pop()
+
+        for line in lines:
+            yield line
+
+    partial += decoder.decode(b'', final=True)
+    if partial:
+        yield partial
@@ -0,0 +1,275 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals
+import atexit
+import errno
+import os
+import select
+import struct
+import threading
+
+from ..const     import LOG_BUFFER_BYTES, LOG_BUFFER_LINES
+from ..utils     import logger
+from .log_buffer import LogBuffer
+
+READ_SIZE = 4096
+
+
+class LogCollector(object):
+    """ Collects the output of every container attached through a docker client on a single thread.
+
+    Attach sockets are multiplexed with ``select`` and each container's output is kept in a :LogBuffer:, the oldest
+    lines are dropped once the buffer is full.  Use :meth:`for_client` so every container sharing a docker client
+    shares a collector, a ContainerShip owns the collector of its client session and closes it.
+
+    :param client: A :docker.Client:.
+    :param max_bytes: An :int:, bytes buffered for each container. defaults to LOG_BUFFER_BYTES.
+    :param max_lines: An :int:, lines buffered for each container. defaults to LOG_BUFFER_LINES.
+    """
+    _collectors      = {}
+    _collectors_lock = threading.Lock()
+
+    def __init__(self, client, max_bytes=LOG_BUFFER_BYTES, max_lines=LOG_BUFFER_LINES):
+        self.client    = client
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self._streams  = {}
+        self._buffers  = {}
+        self._lock     = threading.Lock()
+        self._thread   = None
+        self._closed   = False
+        self._wake_r, self._wake_w = os.pipe()
+
+    @classmethod
+    def for_client(cls, client, **kwargs):
+        """ Returns the collector shared by every container using client, creating it when needed.
+
+        :param client: A :docker.Client:.
+        :param kwargs: max_bytes and max_lines, only used when the collector is created.
+        :rtype: A :LogCollector:
+        """
+        with cls._collectors_lock:
+            collector = cls._collectors.get(client)
+            if collector is None or collector.closed:
+                collector = cls._collectors[client] = cls(client, **kwargs)
+
+            return collector
+
+    @classmethod
+    def close_all(cls):
+        with cls._collectors_lock:
+            collectors = list(cls._collectors.values())
+
+        for collector in collectors:
+            collector.close()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def collect(self, container, max_bytes=None, max_lines=None):
+        """ Attach to container and start buffering its output.  Collecting a container that is still attached is a
+        no-op, a container whose socket was closed is attached again and keeps its buffer.
+
+        :param container: A started :Container:.
+        :param max_bytes: An :int:, overrides the collector's max_bytes for this container.
+        :param max_lines: An :int:, overrides the collector's max_lines for this container.
+        :rtype: A :LogBuffer:
+        """
+        if self._closed:
+            raise RuntimeError(logger.error("log collector for {0} is closed.".format(self.client.base_url)))
+
+        with self._lock:
+            for stream in self._streams.values():
+                if stream.container_id == container.id:
+                    return stream.buffer
+
+            buffer = self._buffers.get(container.id)
+
+        if buffer is None:
+            buffer = LogBuffer(max_bytes or self.max_bytes, max_lines or self.max_lines)
+
+        sock = self.client.attach_socket(container.id)
+        with self._lock:
+            buffer = self._buffers.setdefault(container.id, buffer)
+            stream = self._streams[sock] = _Stream(container.id, buffer, multiplexed=not container.config.tty)
+
+        self._wake()
+        self._start()
+
+        return stream.buffer
+
+    def drain(self, container):
+        """ Remove and return everything buffered for container.  Output is kept after the container's socket is
+        closed, until the container is released.
+
+        :param container: A :Container:.
+        :rtype: A :list: of :bytes: lines.
+        """
+        buffer = self._buffer(container)
+
+        return buffer.drain() if buffer is not None else []
+
+    def release(self, container):
+        """ Stop collecting container's output and drop its buffer.
+
+        :param container: A :Container:.
+        """
+        with self._lock:
+            socks = [sock for sock, stream in self._streams.items() if stream.container_id == container.id]
+            for sock in socks:
+                del self._streams[sock]
+
+            self._buffers.pop(container.id, None)
+
+        for sock in socks:
+            self._close_socket(sock)
+
+        if socks:
+            self._wake()
+
+    def close(self):
+        """ Stop the collector thread and close every attach socket.
+        """
+        if self._closed:
+            return
+
+        self._closed = True
+        self._wake()
+
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(5)
+
+        with self._lock:
+            socks = list(self._streams)
+            self._streams.clear()
+            self._buffers.clear()
+
+        for sock in socks:
+            self._close_socket(sock)
+
+        for fd in (self._wake_r, self._wake_w):
+            os.close(fd)
+
+        with self._collectors_lock:
+            if self._collectors.get(self.client) is self:
+                del self._collectors[self.client]
+
+    ##
+    # private methods
+    ##
+    def _buffer(self, container):
+        with self._lock:
+            return self._buffers.get(container.id)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='log-collector')
+                self._thread.daemon = True
+                self._thread.start()
+
+    def _wake(self):
+        try:
+            os.write(self._wake_w, b'\0')
+        except OSError:
+            pass
+
+    def _run(self):
+        while not self._closed:
+            with self._lock:
+                socks = list(self._streams)
+
+            try:
+                readable, _, _ = select.select(socks + [self._wake_r], [], [])
+            except (OSError, IOError, ValueError, select.error):
+                # a socket was released while selecting, drop anything that is no longer open.
+                self._prune()
+                continue
+
+            for sock in readable:
+                if sock == self._wake_r:
+                    os.read(self._wake_r, READ_SIZE)
+                else:
+                    self._read(sock)
+
+    def _read(self, sock):
+        with self._lock:
+            stream = self._streams.get(sock)
+
+        if stream is None:
+            return
+
+        try:
+            data = sock.recv(READ_SIZE) if hasattr(sock, 'recv') else os.read(sock.fileno(), READ_SIZE)
+
+            # ssl sockets can hold decrypted data select doesn't know about.
+            while data and hasattr(sock, 'pending') and sock.pending():
+                stream.feed(data)
+                data = sock.recv(READ_SIZE)
+        except (OSError, IOError, ValueError) as e:
+            if getattr(e, 'errno', None) in (errno.EINTR, errno.EAGAIN):
+                return
+            data = b''
+
+        if not data:
+            # the container stopped or the connection was closed, its buffer is kept until it is released.
+            with self._lock:
+                self._streams.pop(sock, None)
+            self._close_socket(sock)
+            return
+
+        stream.feed(data)
+
+    def _prune(self):
+        with self._lock:
+            for sock in list(self._streams):
+                try:
+                    closed = sock.fileno() < 0
+                except (OSError, IOError, ValueError):
+                    closed = True
+
+                if closed:
+                    del self._streams[sock]
+
+    @staticmethod
+    def _close_socket(sock):
+        try:
+            sock.close()
+        except (OSError, IOError):
+            pass
+
+
+class _Stream(object):
+    """ The output of one attached container.  Multiplexed streams are split on docker's 8 byte frame headers, frame
+    payloads are handed to the buffer as they arrive so a large frame is never held in memory.
+    """
+    def __init__(self, container_id, buffer, multiplexed=True):
+        self.container_id = container_id
+        self.multiplexed  = multiplexed
+        self.buffer       = buffer
+        self._header      = b''
+        self._remaining   = 0
+
+    def feed(self, data):
+        data = bytes(data)
+        if not self.multiplexed:
+            self.buffer.append(data)
+            return
+
+        while data:
+            if self._remaining:
+                payload, data    = data[:self._remaining], data[self._remaining:]
+                self._remaining -= len(payload)
+                self.buffer.append(payload)
+                continue
+
+            needed       = 8 - len(self._header)
+            self._header = self._header + data[:needed]
+            data         = data[needed:]
+
+            if len(self._header) == 8:
+                self._remaining = struct.unpack('>BxxxL', self._header)[1]
+                self._header    = b''
+
+
+atexit.register(LogCollector.close_all)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals
+import socket
+import time
+
+import requests
+import six
+from six.moves.urllib.parse import urlparse
+
+from ..utils import logger, normalize_keys
+
+PROBE_TYPES = ('http', 'tcp', 'exec', 'healthcheck')
+
+# seconds between checks of whether an exec probe's command has finished.
+EXEC_POLL_INTERVAL = 0.1
+
+
+class ReadinessProbe(object):
+    """ Decides when a started container is ready to serve.
+
+    The probe runs every ``interval`` seconds until it has passed ``success_threshold`` times in a row.  The wait fails
+    as soon as the container exits or after ``max_wait`` seconds.
+
+      - ``http`` GETs ``path`` on ``port``, any 2xx or 3xx response passes.
+      - ``tcp`` passes once a connection to ``port`` is accepted.
+      - ``exec`` runs ``command`` inside of the container, a zero exit code passes.
+      - ``healthcheck`` passes once docker reports the image's HEALTHCHECK as healthy.
+
+    Ports are reached through the port published on the docker host, or the container's ip address when the port
+    isn't published.
+
+    :param type: A :string:, one of http, tcp, exec or healthcheck.
+    :param port: An :int:, container port used by http and tcp probes.
+    :param path: A :string:, path requested by http probes. defaults to /.
+    :param command: A :string: or :list:, command run by exec probes.
+    :param interval: A :number:, seconds between probes. defaults to 1.
+    :param timeout: A :number:, seconds before a single probe fails. defaults to 1.
+    :param success_threshold: An :int:, consecutive passing probes required. defaults to 1.
+    :param max_wait: A :number:, seconds to wait for the container to become ready. defaults to 60.
+    """
+    def __init__(self, type, port=None, path='/', command=None, interval=1, timeout=1, success_threshold=1,
+                 max_wait=60):
+        if type not in PROBE_TYPES:
+            raise ValueError(logger.error("readiness type must be one of {0}. {1} was passed.".format(PROBE_TYPES, type)))
+
+        if type in ('http', 'tcp') and not isinstance(port, int):
+            raise TypeError(logger.error("readiness port must be an int for {0} probes.".format(type)))
+
+        if type == 'exec' and not isinstance(command, (six.string_types, list)):
+            raise TypeError(logger.error("readiness command must be a string or list for exec probes."))
+
+        for name, value in (('interval', interval), ('timeout', timeout), ('max_wait', max_wait)):
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0:
+                raise TypeError(logger.error("readiness {0} must be a positive number. {1} was passed.".format(name, value)))
+
+        if not isinstance(success_threshold, int) or isinstance(success_threshold, bool) or success_threshold < 1:
+            raise TypeError(
+                logger.error("readiness success_threshold must be a positive int. {0} was passed.".format(success_threshold))
+            )
+
+        self.type              = type
+        self.port              = port
+        self.path              = path if path.startswith('/') else '/' + path
+        self.command           = command
+        self.interval          = interval
+        self.timeout           = timeout
+        self.success_threshold = success_threshold
+        self.max_wait          = max_wait
+
+    def wait(self, container):
+        """ Block until container is ready.
+
+        :param container: A started :Container:.
+        :return bool: True when the container is ready, False when it exited or didn't become ready in time.
+        """
+        deadline  = time.time() + self.max_wait
+        successes = 0
+
+        while True:
+            state = container.state()
+            if not state.get('running'):
+                logger.error(
+                    "exited with {0} before it was ready.".format(state.get('exit_code')),
+                    extra={'formatter': 'container', 'container': container.name}
+                )
+                return False
+
+            successes = successes + 1 if self.check(container) else 0
+            if successes >= self.success_threshold:
+                logger.info('is ready.', extra={'formatter': 'container', 'container': container.name})
+                return True
+
+            if time.time() + self.interval > deadline:
+                logger.error(
+                    "wasn't ready after {0} seconds.".format(self.max_wait),
+                    extra={'formatter': 'container', 'container': container.name}
+                )
+                return False
+
+            time.sleep(self.interval)
+
+    def check(self, container):
+        """ Probe container once.
+
+        :param container: A running :Container:.
+        :return bool:
+        """
+        try:
+            return getattr(self, '_check_{0}'.format(self.type))(container)
+        except Exception as e:
+            logger.debug("readiness probe of {0} failed: {1}".format(container.name, e))
+            return False
+
+    ##
+    # private methods
+    ##
+    def _check_http(self, container):
+        host, port = self._address(container)
+        response   = requests.get("http://{0}:{1}{2}".format(host, port, self.path), timeout=self.timeout)
+
+        return 200 <= response.status_code < 400
+
+    def _check_tcp(self, container):
+        connection = socket.create_connection(self._address(container), timeout=self.timeout)
+        connection.close()
+
+        return True
+
+    def _check_exec(self, container):
+        exec_id  = container.client.exec_create(container.id, self.command)
+        deadline = time.time() + self.timeout
+
+        # the command runs detached so one that hangs fails the probe after timeout seconds.
+        container.client.exec_start(exec_id, detach=True)
+        while True:
+            state = normalize_keys(container.client.exec_inspect(exec_id))
+            if not state.get('running'):
+                return state.get('exit_code') == 0
+
+            if time.time() >= deadline:
+                raise RuntimeError("{0} didn't finish within {1} seconds.".format(self.command, self.timeout))
+
+            time.sleep(EXEC_POLL_INTERVAL)
+
+    def _check_healthcheck(self, container):
+        health = container.state().get('health')
+        if not health:
+            raise LookupError("the image doesn't define a HEALTHCHECK.")
+
+        return health.get('status') == 'healthy'
+
+    def _address(self, container):
+        """ Returns the host and port the probe connects to.
+        """
+        network_settings = normalize_keys(container.inspect()).get('network_settings', {})
+        bindings         = (network_settings.get('ports') or {}).get('{0}/tcp'.format(self.port)) or []
+
+        for binding in bindings:
+            if binding.get('host_port'):
+                docker_host = urlparse(container.client.base_url)
+                host        = docker_host.hostname if docker_host.scheme in ('http', 'https') else None
+                if not host or binding.get('host_ip') not in ('', '0.0.0.0', None):
+                    host = binding.get('host_ip') or '127.0.0.1'
+
+                return host, int(binding['host_port'])
+
+        return network_settings.get('ip_address'), self.port
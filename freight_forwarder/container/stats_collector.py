@@ -0,0 +1,193 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals
+import math
+import threading
+from collections import deque, namedtuple
+from time        import time
+
+import six
+from docker.errors import APIError
+
+from ..const import DOCKER_MAX_CONCURRENCY, STATS_INTERVAL, STATS_MAX_SAMPLES
+from ..utils import logger, parallel_map
+
+METRICS     = ('cpu_percent', 'memory_bytes', 'blkio_bytes_per_second', 'network_bytes_per_second')
+PERCENTILES = (50, 90, 99)
+
+StatsSample = namedtuple('StatsSample', [
+    'timestamp', 'cpu_usage', 'system_cpu_usage', 'cpus', 'memory_bytes', 'blkio_bytes', 'network_bytes'
+])
+
+
+class StatsCollector(object):
+    """ Samples the docker stats api of every watched container on a docker host from a single thread.
+
+    Every interval each container is sampled once, up to DOCKER_MAX_CONCURRENCY at a time.  CPU usage and io rates are
+    worked out from consecutive samples of a container and grouped, usually by service alias, so :meth:`summary` can
+    report percentiles per group.  Samples of containers that aren't running are skipped.
+
+    :param client: A :docker.Client:.
+    :param interval: A :float:, seconds between samples of a container. defaults to STATS_INTERVAL.
+    :param max_samples: An :int:, values kept per metric and group, the oldest are dropped first.
+    """
+    def __init__(self, client, interval=STATS_INTERVAL, max_samples=STATS_MAX_SAMPLES):
+        if not isinstance(interval, (int, float)) or isinstance(interval, bool) or interval <= 0:
+            raise TypeError(logger.error("interval must be a number greater than 0. {0} was passed.".format(interval)))
+
+        self.client      = client
+        self.interval    = interval
+        self.max_samples = max_samples
+        self._watches    = {}
+        self._metrics    = {}
+        self._lock       = threading.Lock()
+        self._stopped    = threading.Event()
+        self._thread     = None
+
+    @property
+    def closed(self):
+        return self._stopped.is_set()
+
+    def watch(self, container, group):
+        """ Start sampling container, its metrics are summarized under group.  Containers can be watched before they
+        are started.
+
+        :param container: A :Container:.
+        :param group: A :string:, usually the alias of the container's service.
+        """
+        if self.closed:
+            raise RuntimeError(logger.error("stats collector for {0} is closed.".format(self.client.base_url)))
+
+        with self._lock:
+            self._watches[container.id] = _Watch(container, group)
+            self._metrics.setdefault(group, dict((metric, deque(maxlen=self.max_samples)) for metric in METRICS))
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='stats-collector')
+                self._thread.daemon = True
+                self._thread.start()
+
+    def unwatch(self, container):
+        with self._lock:
+            self._watches.pop(container.id, None)
+
+    def close(self):
+        """ Stop sampling.  Metrics collected so far are kept for :meth:`summary`.
+        """
+        self._stopped.set()
+
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(self.interval + 5)
+
+    def summary(self):
+        """ Percentiles of every metric per group.
+
+        :rtype: A :dict: of group to {'samples': count, metric: {'p50': value, 'p90': value, 'p99': value, 'max': value}}.
+        """
+        summary = {}
+        with self._lock:
+            for group, metrics in six.iteritems(self._metrics):
+                summary[group] = {'samples': len(metrics['memory_bytes'])}
+                for metric, values in six.iteritems(metrics):
+                    values = sorted(values)
+                    summary[group][metric] = dict(
+                        ('p{0}'.format(percent), percentile(values, percent)) for percent in PERCENTILES
+                    )
+                    summary[group][metric]['max'] = values[-1] if values else None
+
+        return summary
+
+    ##
+    # private methods
+    ##
+    def _run(self):
+        while not self._stopped.is_set():
+            with self._lock:
+                watches = list(self._watches.values())
+
+            parallel_map(self._sample, watches, DOCKER_MAX_CONCURRENCY)
+            self._stopped.wait(self.interval)
+
+    def _sample(self, watch):
+        try:
+            sample = parse_stats(watch.container.stats())
+        except APIError as e:
+            if getattr(e.response, 'status_code', None) == 404:
+                # the container was removed.
+                self.unwatch(watch.container)
+            return
+        except Exception as e:
+            logger.warning("Unable to sample stats of {0}: {1}".format(watch.container.name, e))
+            return
+
+        if sample is None:
+            return
+
+        with self._lock:
+            metrics = self._metrics[watch.group]
+            metrics['memory_bytes'].append(sample.memory_bytes)
+
+            previous, watch.previous = watch.previous, sample
+            if previous is None:
+                return
+
+            elapsed    = sample.timestamp - previous.timestamp
+            system_cpu = sample.system_cpu_usage - previous.system_cpu_usage
+            if system_cpu > 0:
+                cpu_percent = float(sample.cpu_usage - previous.cpu_usage) / system_cpu * sample.cpus * 100
+                metrics['cpu_percent'].append(max(cpu_percent, 0.0))
+
+            if elapsed > 0:
+                metrics['blkio_bytes_per_second'].append(max(sample.blkio_bytes - previous.blkio_bytes, 0) / elapsed)
+                metrics['network_bytes_per_second'].append(max(sample.network_bytes - previous.network_bytes, 0) / elapsed)
+
+
+class _Watch(object):
+    def __init__(self, container, group):
+        self.container = container
+        self.group     = group
+        self.previous  = None
+
+
+def parse_stats(stats):
+    """ Reads the counters out of a docker stats api response.
+
+    :param stats: A :dict:, a response of the docker stats api.
+    :rtype: A :StatsSample: or None when the container isn't running.
+    """
+    cpu_stats        = stats.get('cpu_stats') or {}
+    cpu_usage        = cpu_stats.get('cpu_usage') or {}
+    system_cpu_usage = cpu_stats.get('system_cpu_usage')
+    if not system_cpu_usage:
+        return None
+
+    blkio_bytes = 0
+    for entry in (stats.get('blkio_stats') or {}).get('io_service_bytes_recursive') or []:
+        if entry.get('op') in ('Read', 'Write'):
+            blkio_bytes += entry.get('value') or 0
+
+    # api versions before 1.21 report a single interface under network.
+    networks      = stats.get('networks') or {'eth0': stats.get('network') or {}}
+    network_bytes = sum(
+        (interface.get('rx_bytes') or 0) + (interface.get('tx_bytes') or 0) for interface in networks.values()
+    )
+
+    return StatsSample(
+        timestamp=time(),
+        cpu_usage=cpu_usage.get('total_usage') or 0,
+        system_cpu_usage=system_cpu_usage,
+        cpus=len(cpu_usage.get('percpu_usage') or []) or 1,
+        memory_bytes=(stats.get('memory_stats') or {}).get('usage') or 0,
+        blkio_bytes=blkio_bytes,
+        network_bytes=network_bytes
+    )
+
+
+def percentile(values, percent):
+    """ The nearest rank percentile of sorted values, None when there are no values.
+    """
+    if not values:
+        return None
+
+    index = int(math.ceil(len(values) * percent / 100.0)) - 1
+
+    return values[min(max(index, 0), len(values) - 1)]
@@ -3,18 +3,34 @@ from __future__ import unicode_literals
 import os
 import copy
 import re
+import threading
+from time import time
 
 import docker
 import six
 from six.moves.urllib.parse import urlparse
 from requests.packages      import urllib3
 
-from .const                       import DOCKER_API_VERSION, DOCKER_DEFAULT_TIMEOUT
-from .container                   import Container
-from .commercial_invoice.injector import Injector
-from .commercial_invoice.service  import Service
-from .image                       import Image
-from .utils                       import utils, logger
+from .const                        import (
+    CACHE_FROM_API_VERSION,
+    CONTAINER_NAME_RETRIES,
+    DOCKER_API_VERSION,
+    DOCKER_DEFAULT_TIMEOUT,
+    DOCKER_MAX_CONCURRENCY,
+    BUILD_CONCURRENCY,
+    STATS_INTERVAL,
+    VERSION_LABEL
+)
+from .build_context                import BuildContext
+from .container                    import Container, LogCollector, StatsCollector
+from .container.log_buffer         import CapturedOutput, iter_lines
+from .commercial_invoice.benchmark import parse_metrics
+from .commercial_invoice.injector  import Injector
+from .commercial_invoice.service   import Service
+from .image                        import Image
+from .registry                     import V2
+from .build_planner                import BuildPlan, base_images, docker_file_path, parse_docker_file
+from .utils                        import utils, logger, normalize_keys, parallel_map, PrefixedStream
 
 
 class ContainerShip(object):
@@ -52,6 +68,32 @@ class ContainerShip(object):
         self._docker_info = self._client_session.version()
         self._injector = None
 
+        # container names handed out but not created yet, shared by every worker using this container ship.
+        self._reserved_names      = set()
+        self._reserved_names_lock = threading.Lock()
+
+        # buffers the output of containers using a log driver docker can't read back, closed by FreightForwarder.
+        self.log_collector = LogCollector.for_client(self._client_session, **(kwargs.get('log_buffer') or {}))
+
+        # samples the resource usage of the service containers started while it is set, see start_sampling_stats.
+        self.stats_collector = None
+
+        # when True images are always built even if the build context hasn't changed.
+        self.force_build = False
+
+        # build context digests by Dockerfile, only computed for the services this container ship builds.
+        self._context_digests = {}
+
+        # locations of the registries this container ship has logged in to, see _authenticate.
+        self._authenticated_registries = set()
+        self._authenticated_lock       = threading.Lock()
+
+        # tags of the last exported images used to seed the build cache, None disables cache seeding.
+        self.cache_from_tags = None
+
+        # the invoice's registries, images run by run_container are pulled with the auth of the one they come from.
+        self.registries = {}
+
     @property
     def injector(self):
         return self._injector
@@ -156,11 +198,14 @@ class ContainerShip(object):
     def clean_up_dangling_images(self):
         """
         Clean up all dangling images.
+
+        :return dict: summary returned by :meth:`offload`.
         """
         cargoes = Image.all(client=self._client_session, filters={'dangling': True})
-        for id, cargo in six.iteritems(cargoes):
-            logger.info("Removing dangling image: {0}".format(id))
-            cargo.delete()
+        if cargoes:
+            logger.info("Removing {0} dangling images.".format(len(cargoes)))
+
+        return self.offload(cargoes=six.itervalues(cargoes))
 
     def export(self, service, tags=[]):
         """
@@ -194,6 +239,13 @@ class ContainerShip(object):
                 service.containers.first.commit(service.containers.first.config.to_dict(), repository_tag, "latest")
             )
 
+        tags = list(tags)
+
+        # images built from an unchanged build context are identified by their context tag in the registry as well.
+        if service.context_tag and \
+                "{0}/{1}:{2}".format(service.repository, service.namespace, service.context_tag) in service.cargo.repo_tags:
+            tags.append(service.context_tag)
+
         if tags:
             service.cargo.tag("{0}/{1}".format(service.destination_registry.location, repository_tag), tags)
 
@@ -218,6 +270,180 @@ class ContainerShip(object):
 
         return current_containers
 
+    def service_log_streams(self, service, since=None, tail='all'):
+        """ Returns a stream of timestamped lines for every container of service on this container ship, read lazily
+        from the docker daemon.
+
+        :param service: A :Service:.
+        :param since: An :int: unix timestamp, only lines written after it are read.
+        :param tail: An :int: or 'all', lines read from the end of each container's output.
+        :rtype: A :dict: of container name to a generator of :string: lines.
+        """
+        streams = {}
+        for name, container in six.iteritems(self.find_service_containers(service)):
+            streams[name] = iter_lines(
+                container.output(since=since, tail=tail, stream=True, timestamps=True, follow=False)
+            )
+
+        return streams
+
+    def exec_service_containers(self, service, cmd, max_concurrency=DOCKER_MAX_CONCURRENCY):
+        """ Run cmd in every running container of service on this container ship concurrently.  Output is prefixed
+        with the container ship's address and the container's name.
+
+        :param service: A :Service:.
+        :param cmd: A :list: or :string:, the command to run.
+        :param max_concurrency: An :int:, maximum number of commands running on this container ship at the same time.
+        :rtype: A :dict: of container name to exit code, None when the command couldn't be run.
+        """
+        address    = self.url.geturl()
+        containers = []
+        for name, container in sorted(six.iteritems(self.find_service_containers(service))):
+            if container.state().get('running'):
+                containers.append((name, container))
+            else:
+                logger.info("skipping {0} on {1}, it isn't running.".format(name, address))
+
+        def execute(item):
+            name, container = item
+            output = PrefixedStream("{0} {1}".format(address, name))
+            try:
+                return name, container.execute(cmd, output)
+            except Exception as e:
+                logger.error("Running {0} in {1} on {2} failed: {3}".format(cmd, name, address, e))
+                return name, None
+            finally:
+                output.close()
+
+        return dict(parallel_map(execute, containers, max_concurrency))
+
+    def run_container(self, alias, image, command=None, env=None, output=None, host_config=None):
+        """ Run a one-off container from image to completion and remove it.  The container is named
+        ``<alias>-NN`` and image is pulled when it isn't on the container ship.
+
+        :param alias: A :string:, the container name prefix.
+        :param image: A :string:, "repository:tag" or "repository@digest".
+        :param command: A :list: or :string:, overrides the image's command.
+        :param env: A :dict: or :list: of "KEY=VALUE" environment variables.
+        :param output: A file like object the container's output is written to a line at a time.
+        :param host_config: A :dict:, the container's host config.
+        :rtype: An :int:, the container's exit code.
+        """
+        container_config = {'detach': True}
+        if command:
+            container_config['cmd'] = command
+
+        if env:
+            container_config['env'] = env
+
+        kwargs = {'container_config': container_config}
+        if host_config:
+            kwargs['host_config'] = host_config
+
+        def create():
+            return self._create_named_container(alias, self._container_registration(alias), image, **kwargs)
+
+        try:
+            container = create()
+        except docker.errors.APIError as e:
+            if getattr(e.response, 'status_code', None) != 404:
+                raise
+
+            registry = self._image_registry(image)
+            if registry:
+                self._authenticate(registry)
+
+            repository, tag = docker.utils.parse_repository_tag(image)
+            utils.parse_stream(self._client_session.pull(repository, tag=tag or 'latest', stream=True), output)
+            container = create()
+
+        try:
+            container.start(wait=False)
+            for line in iter_lines(container.output(stream=True, follow=True)):
+                if output is not None:
+                    output.write(line + '\n')
+
+            return container.wait()
+        finally:
+            container.delete(remove_volumes=True)
+
+    def benchmark_service(self, service):
+        """ Run the service's benchmark against its containers on this container ship.  The benchmark container is
+        linked to each of the service's containers and their names are passed in ``BENCHMARK_TARGETS``.
+
+        :param service: A :Service: with a benchmark, whose containers are running.
+        :rtype: A :dict: of metric to number, the metrics the benchmark printed.
+        """
+        if not isinstance(service, Service):
+            raise TypeError("service must be an instance of Service.")
+
+        benchmark = service.benchmark
+        if benchmark is None:
+            raise LookupError("Service: {0} doesn't define a benchmark.".format(service.alias))
+
+        targets = sorted(service.containers or self.find_service_containers(service))
+        if not targets:
+            raise LookupError("Service: {0} has no containers to benchmark.".format(service.alias))
+
+        image = benchmark.image
+        if benchmark.dockerfile:
+            image = Image.build(
+                self._client_session,
+                "{0}/{1}-benchmark".format(service.repository, service.namespace),
+                docker_file=benchmark.dockerfile,
+                use_cache=False
+            ).id
+
+        env = benchmark.env or {}
+        if isinstance(env, dict):
+            env = ["{0}={1}".format(key, value) for key, value in sorted(six.iteritems(env))]
+
+        alias  = "{0}-benchmark".format(service.alias)
+        output = CapturedOutput(PrefixedStream("{0} {1}".format(self.url.geturl(), alias)))
+
+        logger.info("Benchmarking Service: {0} against {1}.".format(service.alias, ', '.join(targets)))
+        try:
+            exit_code = self.run_container(
+                alias,
+                image,
+                benchmark.command,
+                env + ["BENCHMARK_TARGETS={0}".format(','.join(targets))],
+                output,
+                host_config={'links': ["{0}:{0}".format(name) for name in targets]}
+            )
+        finally:
+            output.close()
+
+        if exit_code != 0:
+            raise RuntimeError(logger.error("benchmark of {0} exited with {1}.".format(service.alias, exit_code)))
+
+        return parse_metrics(output.lines)
+
+    def start_sampling_stats(self, interval=STATS_INTERVAL):
+        """ Sample the resource usage of every service container started on this container ship until
+        :meth:`stop_sampling_stats` is called.
+
+        :param interval: A :float:, seconds between samples of a container.
+        :rtype: A :StatsCollector:
+        """
+        self.stop_sampling_stats()
+        self.stats_collector = StatsCollector(self._client_session, interval)
+
+        return self.stats_collector
+
+    def stop_sampling_stats(self):
+        """ Stop sampling resource usage.
+
+        :rtype: A :dict: of service alias to the percentiles of each metric, see :meth:`StatsCollector.summary`.
+        """
+        collector, self.stats_collector = self.stats_collector, None
+        if collector is None:
+            return {}
+
+        collector.close()
+
+        return collector.summary()
+
     def find_previous_service_containers(self, service):
         previous_containers = {}
         results = self.find_service_containers(service)
@@ -240,6 +466,166 @@ class ContainerShip(object):
 
         self._load_service_cargo(service, inject_configs, use_cache)
 
+    def load_service_cargoes(self, service, configs=None, use_cache=False, dependents=True,
+                             concurrency=BUILD_CONCURRENCY):
+        """Build the images of service and every service it will dispatch concurrently before any containers are
+        created.  Dependencies that already have containers on the container ship won't be dispatched so they
+        aren't built.  Builds are ordered by a :BuildPlan: so services built FROM another service's image are built
+        after it and, when use_cache is True, services sharing Dockerfile instructions reuse each other's layers.
+        Build output is prefixed with each service's alias.
+
+        :param service: The transport :Service:.
+        :param configs: inject configuration files into service's image.
+        :param use_cache: A :bool:, allow builds to use cached image layers.
+        :param dependents: A :bool:, include service's dependents.
+        :param concurrency: An :int:, maximum number of simultaneous builds.
+        :return list: the :Service: objects that were built.
+        """
+        if not isinstance(service, Service):
+            raise TypeError("service must be and instance of service.  {0} was passed.".format(service))
+
+        services = []
+        self._collect_unbuilt_services(service, dependents, services, set())
+
+        if not services:
+            return services
+
+        if not self.healthy():
+            logger.error("unable to connect to container ship.")
+            raise Exception('lost comms with our container ship')
+
+        # logging in isn't safe to do concurrently so every registry the builds use is authenticated up front.
+        self._authenticate_registries(services)
+
+        plan = BuildPlan(services)
+        logger.info("Building {0} services:".format(len(services)))
+        for line in plan.report(use_cache):
+            logger.info(line)
+
+        # base images are pulled while the build contexts are being packaged.
+        pulls = self.prefetch_base_images(services)
+
+        def build(build_service):
+            output = PrefixedStream(build_service.alias)
+
+            def wait_for_base_images():
+                for image in base_images(plan.instructions[build_service.alias]):
+                    if image in pulls:
+                        pulls[image].wait()
+
+            try:
+                # configs are only injected into the transport service, the same as dispatching.
+                self._load_service_cargo(
+                    build_service,
+                    configs if build_service is service else None,
+                    use_cache,
+                    output,
+                    wait_for_base_images
+                )
+            finally:
+                output.close()
+
+        # images built FROM another service's image wait for it, followers wait for their representative.
+        for wave in plan.waves:
+            parallel_map(build, wave, concurrency)
+
+        return services
+
+    def prefetch_base_images(self, services, concurrency=DOCKER_MAX_CONCURRENCY):
+        """Pull the base images of every service's Dockerfile and test Dockerfile concurrently in the background.
+        Images already on the container ship, ``scratch`` and images built from services are skipped.  Images from
+        a registry known to one of the services use that registry's auth.
+
+        :param services: An iterable of :Service: objects.
+        :param concurrency: An :int:, maximum number of simultaneous pulls.
+        :return dict: image name to a :threading.Event: that is set once the pull has finished.
+        """
+        services   = list(services)
+        registries = {}
+        images     = self._missing_base_images(services)
+
+        for service in services:
+            for registry in (service.source_registry, service.destination_registry):
+                if registry:
+                    registries[registry.location] = registry
+
+        pulls = dict((image, threading.Event()) for image in images)
+        if not images:
+            return pulls
+
+        logger.info("Prefetching base images: {0}.".format(', '.join(images)))
+
+        # logging in isn't safe to do concurrently so registries are authenticated up front.
+        for location in set(self._registry_location(image) for image in images):
+            registry = registries.get(location)
+            if registry:
+                self._authenticate(registry)
+
+        def pull(image):
+            repository, tag = docker.utils.parse_repository_tag(image)
+            output = PrefixedStream(image)
+            try:
+                utils.parse_stream(self._client_session.pull(repository, tag=tag or 'latest', stream=True), output)
+            except Exception as e:
+                # the build will pull the image itself and report the error.
+                logger.warning("Unable to prefetch {0}: {1}".format(image, e))
+            finally:
+                output.close()
+                pulls[image].set()
+
+        def prefetch():
+            try:
+                parallel_map(pull, images, concurrency)
+            finally:
+                # never leave a build waiting on an image that won't be pulled.
+                for event in six.itervalues(pulls):
+                    event.set()
+
+        thread = threading.Thread(target=prefetch)
+        thread.daemon = True
+        thread.start()
+
+        return pulls
+
+    def prefetch_service_cargoes(self, service, output=None):
+        """Pull the images of service, its dependencies and their dependents from their source registries so
+        dispatching them doesn't have to wait on a pull.  Images already on the container ship are skipped and
+        services that are built are left alone.
+
+        :param service: The transport :Service:.
+        :param output: file like object pull output is written to. defaults to stdout.
+        :return list: the identifiers of the images on the container ship.
+        """
+        if not isinstance(service, Service):
+            raise TypeError("service must be and instance of service.  {0} was passed.".format(service))
+
+        if not self.healthy():
+            logger.error("unable to connect to container ship.")
+            raise Exception('lost comms with our container ship')
+
+        services = [service]
+        seen     = set([service.alias])
+        for current in services:
+            for related in list(current.dependencies.values()) + list(current.dependents.values()):
+                if related.alias not in seen:
+                    seen.add(related.alias)
+                    services.append(related)
+
+        identifiers = []
+        for current in services:
+            if not current.source_registry:
+                continue
+
+            if not current.cargo:
+                if current.source_registry.auth:
+                    self._request_auth(current.source_registry)
+
+                self._pull_service_cargo(current, "{0}/{1}".format(current.repository, current.namespace), output)
+
+            identifiers.append(current.cargo.identifier)
+
+        return identifiers
+
     def offload_project(self, team, project):
         """
 
@@ -250,17 +636,68 @@ class ContainerShip(object):
         containers = Container.find_by_name(self._client_session, "{0}-{1}".format(team, project))
         if containers:
             logger.info("Deleting all team: {0} project: {1} containers.".format(team, project))
-            for container in six.itervalues(containers):
-                container.delete()
-                Image(self._client_session, container.image).delete()
+            self.offload(
+                containers=six.itervalues(containers),
+                cargoes=[Image(self._client_session, image_id)
+                         for image_id in set(container.image for container in six.itervalues(containers))]
+            )
 
         image_name = "{0}/{1}".format(team, project)
         cargoes = Image.find_all_by_name(self._client_session, image_name)
 
         if cargoes:
             logger.info("deleting all {0} images.".format(image_name))
-            for id, image in six.iteritems(cargoes):
-                image.delete(force=True)
+            self.offload(cargoes=six.itervalues(cargoes), force=True)
+
+    def offload(self, containers=None, cargoes=None, force=False, concurrency=DOCKER_MAX_CONCURRENCY):
+        """Remove containers and images (cargo) from the container ship concurrently.
+
+        Containers are removed first so the images they use can be released.  Images are then removed in layers; an
+        image is only removed after every image in cargoes that was built on top of it.
+
+        :param containers: An iterable of :Container: objects.
+        :param cargoes: An iterable of :Image: objects.
+        :param force: A :bool:, force the removal of images.
+        :param concurrency: An :int:, maximum number of concurrent requests made to the docker daemon.
+        :return dict: ``{'containers': {'removed': [], 'failed': []}, 'cargoes': {'removed': [], 'failed': []}}``
+        """
+        summary = {
+            'containers': {'removed': [], 'failed': []},
+            'cargoes': {'removed': [], 'failed': []}
+        }
+
+        def remove_container(container):
+            try:
+                container.delete()
+            except Exception as e:
+                logger.warning(
+                    'was unable to be deleted: {0}'.format(e),
+                    extra={'formatter': 'container', 'container': container.name}
+                )
+                return container, False
+
+            return container, True
+
+        def remove_cargo(cargo):
+            return cargo, cargo.delete(force=force)
+
+        if containers:
+            containers = list(dict((container.id, container) for container in containers).values())
+            for container, removed in parallel_map(remove_container, containers, concurrency):
+                summary['containers']['removed' if removed else 'failed'].append(container.name)
+
+        if cargoes:
+            for layer in self._cargo_removal_order(cargoes):
+                for cargo, removed in parallel_map(remove_cargo, layer, concurrency):
+                    summary['cargoes']['removed' if removed else 'failed'].append(cargo.id)
+
+        failed = len(summary['containers']['failed']) + len(summary['cargoes']['failed'])
+        if containers or cargoes:
+            logger.info("Offloaded {0} containers and {1} images. {2} failed.".format(
+                len(summary['containers']['removed']), len(summary['cargoes']['removed']), failed
+            ))
+
+        return summary
 
     def offload_service_cargo(self, service):
 
@@ -270,10 +707,13 @@ class ContainerShip(object):
 
             if anonymous_service.cargo:
                 logger.info("Offloading cargo for {}.".format(anonymous_service.alias))
-                anonymous_service.cargo.delete(force=True)
+                cargoes.append(anonymous_service.cargo)
 
+        cargoes = []
         self._service_map(service, anonymous, descending=True)
 
+        return self.offload(cargoes=cargoes, force=True)
+
     def offload_all_service_cargo(self, service):
         """Remove docker images for a specific service.  This method will call itself recursively for dependents and
          dependencies.
@@ -292,11 +732,13 @@ class ContainerShip(object):
 
             if cargoes:
                 logger.info("Offloading all images for {0}.".format(anonymous_service.alias))
-                for cargo in six.itervalues(cargoes):
-                    cargo.delete(force=True)
+                all_cargoes.extend(six.itervalues(cargoes))
 
+        all_cargoes = []
         self._service_map(service, anonymous, descending=True)
 
+        return self.offload(cargoes=all_cargoes, force=True)
+
     def offload_expired_service_cargo(self, service):
         """Remove docker images for a specific service.  This method will call itself recursively for dependents and
          dependencies.
@@ -365,15 +807,99 @@ class ContainerShip(object):
         if not service.containers:
             raise AttributeError("Must load containers before attempting to start them.")
 
-        containers = self.find_service_containers(service)
-        if containers:
-            for name, container in six.iteritems(containers):
-                # TODO: add function to container obj to see if its running.
-                if container.state().get('running'):
-                    container.stop()
+        surge = service.rollout == 'surge' and self._can_surge(service, attach)
+        if surge:
+            containers = self.find_previous_service_containers(service)
+        else:
+            containers = self.find_service_containers(service)
+            self._stop_containers(containers)
+
+        def start(item):
+            name, container = item
+            if self.stats_collector is not None:
+                self.stats_collector.watch(container, service.alias)
+
+            if container.start(attach=attach):
+                return True
+
+            logger.error("service container: {0} failed to start.".format(name))
+            container.dump_logs()
+
+            return False
+
+        # replicas are started concurrently, attached containers one at a time.
+        results = parallel_map(
+            start,
+            sorted(six.iteritems(service.containers)),
+            1 if attach else DOCKER_MAX_CONCURRENCY
+        )
+        if not all(results):
+            return False
+
+        # the previous containers are only stopped once the new ones are healthy.
+        if surge:
+            self._stop_containers(containers)
+
+        return True
+
+    def stage_service_containers(self, service):
+        """
+        Create service's containers without starting them so they can be swapped in later by
+        swap_service_containers.  The service's dependencies must already have containers.
+
+        :param service: A :Service:
+        :return bool: True when every container was created.
+        """
+        if not isinstance(service, Service):
+            raise TypeError("service must be an instance of Service.")
+
+        if not self.healthy():
+            logger.error("unable to connect to container ship.")
+            raise Exception('lost comms with our container ship')
+
+        self._load_service_containers(service, None, False)
 
         for name, container in six.iteritems(service.containers):
-            if not container.start(attach=attach):
+            if not getattr(container, 'id', None):
+                logger.error("service container: {0} wasn't created.".format(name))
+                return False
+
+        return True
+
+    def swap_service_containers(self, service):
+        """
+        Stop service's running containers and start its staged containers without waiting on them.  Use
+        verify_service_containers to check on the new containers.
+
+        :param service: A :Service: with staged containers.
+        :return float: seconds between stopping the first container and starting the last one.
+        """
+        if not isinstance(service, Service):
+            raise TypeError("service must be an instance of Service.")
+
+        if not service.containers:
+            raise AttributeError("Must stage containers before attempting to swap them.")
+
+        started_at = time()
+        for name, container in six.iteritems(self.find_previous_service_containers(service)):
+            if container.state().get('running'):
+                container.stop()
+
+        for name, container in six.iteritems(service.containers):
+            container.start(wait=False)
+
+        return time() - started_at
+
+    def verify_service_containers(self, service):
+        """
+        :param service: A :Service: whose containers have been started.
+        :return bool: True when none of service's containers failed.
+        """
+        if not isinstance(service, Service):
+            raise TypeError("service must be an instance of Service.")
+
+        for name, container in six.iteritems(service.containers):
+            if not container.verify():
                 logger.error("service container: {0} failed to start.".format(name))
                 container.dump_logs()
 
@@ -381,6 +907,19 @@ class ContainerShip(object):
 
         return True
 
+    def discard_service_containers(self, service):
+        """
+        Delete service's containers, stopping them if they're running.  Containers of other services aren't touched.
+
+        :param service: A :Service:
+        """
+        if not isinstance(service, Service):
+            raise TypeError("service must be an instance of Service.")
+
+        for name in list(service.containers.keys()):
+            service.containers[name].delete()
+            del service.containers[name]
+
     def test_service(self, service, configs):
         """
         Run test container attach to it then clean up when the test run is complete.
@@ -417,7 +956,6 @@ class ContainerShip(object):
                 docker_file=service.test_docker_file,
                 use_cache=False
             )
-            container_name = self._container_registration("{0}-test".format(service.alias))
 
             # update config with any changes.
             self._update_container_host_config(service)
@@ -432,14 +970,19 @@ class ContainerShip(object):
             test_container_host_config.port_bindings     = None
             test_container_host_config.publish_all_ports = True
 
-            container = Container(
-                self._client_session,
-                name=container_name,
-                image=image.id,
+            test_alias     = "{0}-test".format(service.alias)
+            container_name = self._container_registration(test_alias)
+            container      = self._create_named_container(
+                test_alias,
+                container_name,
+                image.id,
                 container_config=test_container_config.to_dict(),
                 host_config=test_container_host_config.to_dict()
             )
 
+            if self.stats_collector is not None:
+                self.stats_collector.watch(container, service.alias)
+
             return container.start(attach=True)
         finally:
             if container is not None:
@@ -488,65 +1031,247 @@ class ContainerShip(object):
         delattr(service, 'marked')
 
     def _offload_cargo(self, service):
-        """
+        """ Remove a service's expired images as decided by the service's retention policy. Test images are
+        handled by test_service and are never considered.
         """
         if not isinstance(service, Service):
             raise TypeError("service must be an instance of Service.")
 
         base_name = "{0}/{1}".format(service.repository, service.namespace)
+        test_name = "{0}-test".format(base_name)
 
         # TODO: update when we start using links
-        cargoes = Image.find_all_by_name(self._client_session, base_name)
-
-        # TODO when config is created this should become a parameter
-        limit = 2
-        while len(cargoes) > limit:
-            expired_cargo  = None
-            test_cargo_key = None
-
-            for key, suspect_cargo in six.iteritems(cargoes):
-                # TODO: move this logic into Image class
-                if "{0}-test".format(base_name) in suspect_cargo.identifier:
-                    test_cargo_key = key
-                    break
-
-                if expired_cargo is None:
-                    expired_cargo = suspect_cargo
-                    continue
+        cargoes = [
+            cargo for cargo in six.itervalues(Image.find_all_by_name(self._client_session, base_name))
+            if test_name not in cargo.identifier
+        ]
 
-                if suspect_cargo.created_at < expired_cargo.created_at:
-                    expired_cargo = suspect_cargo
+        if cargoes:
+            # images referenced by running or previous containers are always retained.
+            images = [container.image for container in six.itervalues(self.find_service_containers(service))]
+            images.extend(container.image for container in six.itervalues(service.containers))
+            in_use = self._cargo_ids(images, cargoes)
 
-            if test_cargo_key is not None:
-                del cargoes[test_cargo_key]
+            expired_cargoes = service.retention_policy.expired(cargoes, in_use)
+            if expired_cargoes:
+                self.offload(cargoes=expired_cargoes)
 
-            elif expired_cargo is not None:
-                expired_cargo.delete()
-                del cargoes[expired_cargo.id]
-        else:
-            logger.info("Done offloading Cargo for {0}.".format(base_name))
+        logger.info("Done offloading Cargo for {0}.".format(base_name))
 
-    def _container_registration(self, alias):
+    @staticmethod
+    def _cargo_ids(images, cargoes):
+        """ Returns the ids of the cargoes images refer to.  Inspected containers reference their image by id, created
+        containers by the id or name they were created with, so names, repo tags and short ids are all resolved.
+
+        :param images: An iterable of image ids or names.
+        :param cargoes: An iterable of :Image: objects.
+        :rtype: A :set: of image ids.
+        """
+        ids = set()
+        for image in images:
+            if not image or not isinstance(image, six.string_types):
+                continue
+
+            short_id = image.split('sha256:', 1)[-1]
+            if not re.match(r'\A[0-9a-f]{12,64}\Z', short_id):
+                short_id = None
+
+            name = image
+            if '@' not in name and ':' not in name.rsplit('/', 1)[-1]:
+                name = "{0}:latest".format(name)
+
+            for cargo in cargoes:
+                names = set(cargo.repo_tags or ())
+                names.add(cargo.identifier)
+
+                if image == cargo.id or name in names or \
+                        (short_id and cargo.id.split('sha256:', 1)[-1].startswith(short_id)):
+                    ids.add(cargo.id)
+
+        return ids
+
+    def _missing_base_images(self, services):
+        """ Returns the base images of services' Dockerfiles and test Dockerfiles that aren't on the container ship
+        and aren't built from one of services.
+        """
+        built  = set("{0}/{1}".format(service.repository, service.namespace) for service in services)
+        images = []
+
+        for docker_file in [path for service in services for path in (service.docker_file, service.test_docker_file)]:
+            if not docker_file:
+                continue
+
+            try:
+                instructions = parse_docker_file(docker_file_path(docker_file))
+            except (IOError, OSError, TypeError, ValueError):
+                continue
+
+            for image in base_images(instructions):
+                repository, tag = docker.utils.parse_repository_tag(image)
+                if repository not in built and image not in images and not self._has_cargo(image):
+                    images.append(image)
+
+        return images
+
+    @staticmethod
+    def _can_surge(service, attach):
+        """ Returns True when service's new containers can run next to the previous ones.
         """
-        Check for an available name and return that to the caller.
+        if attach or not service.container_config.detach:
+            logger.info("{0} isn't detached, falling back to the recreate rollout.".format(service.alias))
+            return False
+
+        for bindings in six.itervalues(service.host_config.port_bindings or {}):
+            if any(binding.get('host_port') for binding in bindings or []):
+                logger.info("{0} binds fixed host ports, falling back to the recreate rollout.".format(service.alias))
+                return False
+
+        return True
+
+    @staticmethod
+    def _stop_containers(containers):
+        for name, container in six.iteritems(containers or {}):
+            # TODO: add function to container obj to see if its running.
+            if container.state().get('running'):
+                container.stop()
+
+    def _has_cargo(self, identifier):
+        try:
+            self._client_session.inspect_image(identifier)
+        except docker.errors.NotFound:
+            return False
+
+        return True
+
+    @staticmethod
+    def _registry_location(image):
+        """ Returns the registry host of an image name or None for docker hub.
+        """
+        chunks = image.split('/')
+        if len(chunks) > 1 and ('.' in chunks[0] or ':' in chunks[0] or chunks[0] == 'localhost'):
+            return chunks[0]
+
+        return None
+
+    def _collect_unbuilt_services(self, service, dependents, services, visited, dependency=False):
+        if service.name in visited:
+            return
+        visited.add(service.name)
+
+        # dependencies that are already running aren't dispatched again.
+        if dependency and not service.containers and self.find_service_containers(service):
+            return
+
+        if service.docker_file and not service.cargo:
+            services.append(service)
+
+        for dependency_service in six.itervalues(service.dependencies):
+            self._collect_unbuilt_services(dependency_service, dependents, services, visited, True)
+
+        if dependents:
+            for dependent_service in six.itervalues(service.dependents):
+                self._collect_unbuilt_services(dependent_service, dependents, services, visited)
+
+    def _cargo_removal_order(self, cargoes):
+        """Group cargoes into layers that can be removed concurrently.  Every image built on top of another image in
+        cargoes is placed in an earlier layer than its parent.
+
+        :param cargoes: An iterable of :Image: objects.
+        :return list: A :list: of :list: of :Image: objects.
         """
-        containers = Container.find_by_name(self._client_session, alias)
+        remaining = dict((cargo.id, cargo) for cargo in cargoes)
+        children  = dict((cargo_id, 0) for cargo_id in remaining)
+
+        for cargo in six.itervalues(remaining):
+            parent = getattr(cargo, 'parent', None)
+            if parent in children:
+                children[parent] += 1
 
-        def validate_name(name):
-            valid = True
-            if name in containers:
-                valid = False
+        layers = []
+        while remaining:
+            layer = [cargo for cargo_id, cargo in six.iteritems(remaining) if not children[cargo_id]]
 
-            return valid
+            # a parent can't be its own descendant but protect against looping forever anyway.
+            if not layer:
+                layer = list(remaining.values())
 
-        count = 1
-        container_name = "{0}-0{1}".format(alias, count)
-        while not validate_name(container_name):
-            count += 1
-            container_index = count if count > 10 else "0{0}".format(count)
-            container_name = "{0}-{1}".format(alias, container_index)
+            for cargo in layer:
+                del remaining[cargo.id]
+                parent = getattr(cargo, 'parent', None)
+                if parent in children:
+                    children[parent] -= 1
 
-        return container_name
+            layers.append(layer)
+
+        return layers
+
+    def _container_registration(self, alias):
+        """
+        Reserve an available name and return that to the caller.
+        """
+        return self._reserve_container_names(alias)[0]
+
+    def _reserve_container_names(self, alias, count=1):
+        """ Reserve the count lowest free ``<alias>-NN`` names.
+
+        Taken names are read from a single container listing and names handed out are held until they are released, so
+        workers sharing this container ship never pick the same name.  Release names with
+        :meth:`_release_container_names` once their containers are created.
+
+        :param alias: A :string:, the container name prefix.
+        :param count: An :int:, number of names reserved.
+        :rtype: A :list: of :string: names, in index order.
+        """
+        pattern = re.compile(r'\A{0}-(\d+)\Z'.format(re.escape(alias)))
+
+        with self._reserved_names_lock:
+            taken = set()
+            for container in self._client_session.containers(all=True):
+                for container_name in normalize_keys(container).get('names') or []:
+                    match = pattern.match(container_name.lstrip('/'))
+                    if match:
+                        taken.add(int(match.group(1)))
+
+            for container_name in self._reserved_names:
+                match = pattern.match(container_name)
+                if match:
+                    taken.add(int(match.group(1)))
+
+            names = []
+            index = 0
+            while len(names) < count:
+                index += 1
+                if index not in taken:
+                    names.append("{0}-{1:02d}".format(alias, index))
+
+            self._reserved_names.update(names)
+
+        return names
+
+    def _release_container_names(self, names):
+        with self._reserved_names_lock:
+            self._reserved_names.difference_update(names)
+
+    def _create_named_container(self, alias, name, image, **kwargs):
+        """ Create a container with a name reserved by :meth:`_reserve_container_names`.  When another docker client
+        takes the name first the container is created with the next free name instead.  The reservation is released
+        once the container exists.
+
+        :rtype: A :Container:
+        """
+        try:
+            for attempt in range(1, CONTAINER_NAME_RETRIES + 1):
+                try:
+                    return Container(self._client_session, name=name, image=image, **kwargs)
+                except docker.errors.APIError as e:
+                    if getattr(e.response, 'status_code', None) != 409 or attempt == CONTAINER_NAME_RETRIES:
+                        raise
+
+                    logger.warning("{0} is already in use, retrying with the next free name.".format(name))
+                    self._release_container_names([name])
+                    name = self._reserve_container_names(alias)[0]
+        finally:
+            self._release_container_names([name])
 
     def _load_dependency_containers(self, service):
         """
@@ -598,9 +1323,11 @@ class ContainerShip(object):
                 if key in service.containers:
                     del service.containers[key]
 
-    def _load_service_cargo(self, service, inject_configs, use_cache=False):
+    def _load_service_cargo(self, service, inject_configs, use_cache=False, output=None, before_build=None):
         """
         :param service:
+        :param output: file like object build output is written to. defaults to stdout.
+        :param before_build: callable called once the build context is packaged, before the build starts.
         :return None:
         """
         if not isinstance(service, Service):
@@ -609,24 +1336,37 @@ class ContainerShip(object):
         repository = "{0}/{1}".format(service.repository, service.namespace)
 
         if service.source_registry:
-            if service.source_tag:
-                repository = "{0}:{1}".format(repository, service.source_tag)
+            self._authenticate(service.source_registry)
+            self._pull_service_cargo(service, repository)
+        elif service.docker_file:
+            if service.context_digest is None:
+                service.context_digest = self._context_digest(service.docker_file)
 
-            if service.source_registry.auth:
-                self._request_auth(service.source_registry)
+            if service.container_config and service.container_config.labels is not None:
+                service.container_config.labels.setdefault(VERSION_LABEL, service.context_digest or 'unknown')
 
-            service.cargo = Image.pull(
-                self._client_session,
-                service.source_registry,
-                repository
-            )
-        elif service.docker_file:
-            service.cargo = Image.build(
-                self._client_session,
-                repository,
-                service.docker_file,
-                use_cache=use_cache
-            )
+            if service.context_tag and not self.force_build:
+                cargo = self._find_built_cargo(service, repository)
+                if cargo:
+                    logger.info("Build context for {0} hasn't changed, using image: {1}.".format(
+                        service.alias, cargo.identifier
+                    ))
+                    service.cargo = cargo
+
+            if not service.cargo:
+                cache_from = self._seed_build_cache(service, repository, output)
+                service.cargo = Image.build(
+                    self._client_session,
+                    repository,
+                    service.docker_file,
+                    use_cache=use_cache or bool(cache_from),
+                    output=output,
+                    before_upload=before_build,
+                    cache_from=cache_from
+                )
+
+                if service.context_tag:
+                    service.cargo.tag(repository, [service.context_tag])
         else:
             raise LookupError("Couldn't locate image or Dockerfile. Every service is required to have one or the other.")
 
@@ -634,6 +1374,153 @@ class ContainerShip(object):
         if inject_configs is True and self._injector:
             self._injector.inject(self._client_session, service)
 
+    def _context_digest(self, docker_file):
+        """ Returns the content digest of the build context for docker_file, None when it can't be read.  Digests are
+        computed when a service is built, once per Dockerfile.
+        """
+        if docker_file not in self._context_digests:
+            try:
+                digest = BuildContext.from_docker_file(docker_file).checksum()
+            except (TypeError, ValueError, OSError) as e:
+                logger.warning("Unable to compute the build context digest of {0}: {1}".format(docker_file, e))
+                digest = None
+
+            self._context_digests[docker_file] = digest
+
+        return self._context_digests[docker_file]
+
+    def _find_built_cargo(self, service, repository):
+        """ Find an image built from the same build context as service, first on the container ship then in the
+        service's destination registry.
+
+        :param service: A :Service: with a context_tag.
+        :param repository: A :string:, the service's image repository.
+        :return Image: or None if an image doesn't exist.
+        """
+        repository_tag = "{0}:{1}".format(repository, service.context_tag)
+        cargo          = Image.find_by_name(self._client_session, repository_tag)
+
+        if cargo or not service.destination_registry:
+            return cargo
+
+        try:
+            if repository_tag in service.destination_registry.tags(repository):
+                self._authenticate(service.destination_registry)
+                cargo = Image.pull(self._client_session, service.destination_registry, repository_tag)
+                cargo.tag(repository, ['latest', service.context_tag])
+        except Exception as e:
+            logger.warning("Unable to look up {0} in {1}: {2}".format(
+                repository_tag, service.destination_registry.location, e
+            ))
+            cargo = None
+
+        return cargo
+
+    def _pull_service_cargo(self, service, repository, output=None):
+        """ Pull service's image from its source registry.  Pinned services are pulled by digest and tagged with
+        their source tag, the pull is skipped when the local image already has the digest.
+
+        :param service: A :Service: with a source_registry.
+        :param repository: A :string:, "namespace/repository".
+        :param output: file like object pull output is written to. defaults to stdout.
+        """
+        registry       = service.source_registry
+        repository_tag = "{0}:{1}".format(repository, service.source_tag) if service.source_tag else repository
+
+        cargo = self._find_pulled_cargo(registry, repository_tag, service.source_digest)
+        if cargo:
+            logger.info("{0} is up to date with {1}, skipping pull.".format(cargo.identifier, registry.location))
+            service.cargo = cargo
+        elif service.source_digest:
+            service.cargo = Image.pull(
+                self._client_session,
+                registry,
+                "{0}@{1}".format(repository, service.source_digest),
+                output=output
+            )
+            service.cargo.tag(self._local_repository(registry, repository), [service.source_tag or 'latest'])
+        else:
+            service.cargo = Image.pull(self._client_session, registry, repository_tag, output=output)
+
+    def _find_pulled_cargo(self, registry, repository_tag, digest=None):
+        """ Returns the local image for repository_tag when its digest matches the digest the registry's manifest
+        resolves to, so the image doesn't need to be pulled again.
+
+        :param registry: The registry repository_tag is pulled from.
+        :param repository_tag: A :string:, "namespace/repository:tag".
+        :param digest: A :string:, the digest repository_tag was pinned to. resolved through the registry if None.
+        :return Image: or None when the image has to be pulled.
+        """
+        if not isinstance(registry, V2):
+            return None
+
+        repository, tag = repository_tag.split(':') if ':' in repository_tag else (repository_tag, 'latest')
+        if digest is None:
+            try:
+                digest = registry.manifest_digest(repository, tag)
+            except Exception as e:
+                logger.debug("Unable to resolve {0} to a digest in {1}: {2}".format(repository_tag, registry.location, e))
+                return None
+
+        if not digest:
+            return None
+
+        repository = self._local_repository(registry, repository)
+
+        identifier = "{0}:{1}".format(repository, tag)
+        if not self._has_cargo(identifier):
+            return None
+
+        cargo = Image(self._client_session, identifier)
+        if "{0}@{1}".format(repository, digest) not in cargo.repo_digests:
+            return None
+
+        return cargo
+
+    @staticmethod
+    def _local_repository(registry, repository):
+        """ Returns the name of repository on the container ship once pulled from registry.
+        """
+        if 'index.docker.io' in registry.location:
+            return repository
+
+        return "{0}/{1}".format(registry.location, repository)
+
+    def _seed_build_cache(self, service, repository, output=None):
+        """ Pull the last image exported for service from its destination registry so its layers can be used as the
+        build cache.  The tags in cache_from_tags are tried in order.
+
+        :param service: A :Service: with a docker_file.
+        :param repository: A :string:, the service's image repository.
+        :param output: file like object the pull output is written to. defaults to stdout.
+        :return list: of images to use as cache sources or None if nothing was pulled.
+        """
+        registry = service.destination_registry
+        if not self.cache_from_tags or not registry:
+            return None
+
+        # without cache sources the pulled image wouldn't be used by the build, so it isn't pulled at all.
+        if not Image.supports_cache_from(self._client_session):
+            logger.info("The docker daemon's api is older than {0}, {1} is built without a registry build "
+                        "cache.".format(CACHE_FROM_API_VERSION, service.alias))
+            return None
+
+        for tag in self.cache_from_tags:
+            repository_tag = "{0}:{1}".format(repository, tag)
+            try:
+                self._authenticate(registry)
+                cargo = Image.pull(self._client_session, registry, repository, tag=tag, output=output)
+            except Exception as e:
+                logger.info("Unable to pull {0} from {1} to seed the build cache: {2}".format(
+                    repository_tag, registry.location, e
+                ))
+                continue
+
+            logger.info("Seeded the build cache for {0} with {1}.".format(service.alias, repository_tag))
+            return [cargo.identifier]
+
+        return None
+
     def _load_service_containers(self, service, configs, use_cache):
         """
         :param service:
@@ -643,8 +1530,6 @@ class ContainerShip(object):
             raise TypeError("service must of an instance of Service")
 
         if not service.containers:
-            container_name = self._container_registration(service.alias)
-
             if service.dependencies:
                 self._load_dependency_containers(service)
 
@@ -652,13 +1537,66 @@ class ContainerShip(object):
                 self._load_service_cargo(service, configs, use_cache)
 
             self._update_container_host_config(service)
-            service.containers[container_name] = Container(
-                self._client_session,
-                container_name,
-                service.cargo.id,
-                container_config=service.container_config.to_dict(),
-                host_config=service.host_config.to_dict()
-            )
+
+            container_names = []
+            created         = []
+
+            def create(replica):
+                container = self._create_named_container(
+                    service.alias,
+                    container_names[replica],
+                    service.cargo.id,
+                    container_config=service.container_config.to_dict(),
+                    host_config=self._replica_host_config(service, replica),
+                    readiness_probe=service.readiness_probe
+                )
+                created.append(container)
+
+                return container
+
+            # replicas are created concurrently, each with its own host ports.  Either every replica is created or the
+            # ones that were are removed again.
+            try:
+                container_names.extend(self._reserve_container_names(service.alias, service.replicas))
+                containers = parallel_map(create, range(service.replicas), DOCKER_MAX_CONCURRENCY)
+            except Exception:
+                for container in created:
+                    try:
+                        container.delete(remove_volumes=True)
+                    except Exception as e:
+                        logger.warning("Unable to remove replica {0}: {1}".format(container.name, e))
+                raise
+            finally:
+                self._release_container_names(container_names)
+
+            for container in containers:
+                service.containers[container.name] = container
+
+    @staticmethod
+    def _replica_host_config(service, replica):
+        """ Returns service's host config for a replica.  Fixed host ports are offset by the replica's index so every
+        replica on a host can publish its ports, a service publishing 8080 with 3 replicas binds 8080, 8081 and 8082.
+        """
+        host_config = service.host_config.to_dict()
+        if not replica or not host_config.get('port_bindings'):
+            return host_config
+
+        host_config = dict(host_config)
+
+        port_bindings = {}
+        for port, bindings in six.iteritems(host_config['port_bindings']):
+            port_bindings[port] = []
+            for binding in bindings or []:
+                binding   = dict(binding)
+                host_port = binding.get('host_port')
+                if host_port and six.text_type(host_port).isdigit():
+                    binding['host_port'] = six.text_type(int(host_port) + replica)
+
+                port_bindings[port].append(binding)
+
+        host_config['port_bindings'] = port_bindings
+
+        return host_config
 
     def _update_container_host_config(self, service):
         """
@@ -691,9 +1629,11 @@ class ContainerShip(object):
                     )
                 )
 
-            if link in service.dependencies:
-                for name, container_to_link in six.iteritems(service.dependencies[link].containers):
-                    service.host_config.links[index] = "{0}:{1}".format(container_to_link.id, link)
+            if link in service.dependencies and service.dependencies[link].containers:
+                # a dependency with replicas is linked to its first replica.
+                containers        = service.dependencies[link].containers
+                container_to_link = containers[sorted(containers)[0]]
+                service.host_config.links[index] = "{0}:{1}".format(container_to_link.id, link)
 
     def _update_volumes_from(self, service):
         if not isinstance(service, Service):
@@ -711,9 +1651,53 @@ class ContainerShip(object):
             if ':' in volume_bind:
                 volume_bind, permissions = volume_bind.split(':')
 
-            if volume_bind in service.dependencies:
-                for name, container_to_bind in six.iteritems(service.dependencies[volume_bind].containers):
-                    service.host_config.volumes_from[index] = container_to_bind.id
+            if volume_bind in service.dependencies and service.dependencies[volume_bind].containers:
+                # a dependency with replicas shares the volumes of its first replica.
+                containers        = service.dependencies[volume_bind].containers
+                container_to_bind = containers[sorted(containers)[0]]
+                service.host_config.volumes_from[index] = container_to_bind.id
+
+    def _authenticate_registries(self, services):
+        """ Log in to the source and destination registries of services that require auth, once per registry.
+        Failing to log in to a source registry raises, destination registries are only used for build caches.
+
+        :param services: An iterable of :Service: objects.
+        """
+        for service in services:
+            for registry in (service.source_registry, service.destination_registry):
+                if not registry or not registry.auth or registry.location in self._authenticated_registries:
+                    continue
+
+                try:
+                    self._request_auth(registry)
+                except Exception as e:
+                    if registry is service.source_registry:
+                        raise
+
+                    logger.warning("Unable to log in to {0}: {1}".format(registry.location, e))
+
+                self._authenticated_registries.add(registry.location)
+
+    def _authenticate(self, registry):
+        """ Log in to registry when it requires auth, once per registry.  Safe to call from concurrent workers.
+        """
+        if not registry.auth:
+            return
+
+        with self._authenticated_lock:
+            if registry.location not in self._authenticated_registries:
+                self._request_auth(registry)
+                self._authenticated_registries.add(registry.location)
+
+    def _image_registry(self, image):
+        """ Returns the registry in registries image is pulled from, or None when it isn't one of them.
+        """
+        location = self._registry_location(image) or 'index.docker.io'
+        for registry in six.itervalues(self.registries or {}):
+            if registry and registry.location == location:
+                return registry
+
+        return None
 
     def _request_auth(self, registry):
         """
@@ -1,7 +1,7 @@
 # -*- coding: utf-8; -*-
 from __future__ import unicode_literals, absolute_import
 from sys        import stdout
-from time       import sleep
+from time       import sleep, time
 import os
 
 import six
@@ -10,12 +10,25 @@ import requests
 import psutil
 from yaml.representer import SafeRepresenter
 
-from .utils                 import normalize_keys, parse_hostname, logger, normalize_value
-from .commercial_invoice    import CommercialInvoice
+from .const                 import DANGLING_SWEEP_INTERVAL, BUILD_CONCURRENCY, DOCKER_MAX_CONCURRENCY, JOB_CAPACITY
+from .utils                 import (
+    normalize_keys,
+    parse_hostname,
+    logger,
+    normalize_value,
+    parallel_map,
+    BackgroundWorker,
+    PrefixedStream
+)
+from .commercial_invoice    import CommercialInvoice, load_baseline, write_baseline
+from .log_stream            import merge_log_streams
+from .long_shoremen         import Longshoremen
 from .config                import Config, ACTIONS_SCHEME, ConfigUnicode
 
-ROOT_PATH  = os.path.realpath(os.path.dirname(__file__))
-STATE_PATH = os.path.join(os.getenv('HOME'), '.freight_forwarder', 'data', 'state')
+ROOT_PATH      = os.path.realpath(os.path.dirname(__file__))
+STATE_PATH     = os.path.join(os.getenv('HOME'), '.freight_forwarder', 'data', 'state')
+SWEEP_PATH     = os.path.join(os.getenv('HOME'), '.freight_forwarder', 'data', 'sweeps')
+BENCHMARK_PATH = os.path.join(os.getenv('HOME'), '.freight_forwarder', 'data', 'benchmarks')
 
 
 class FreightForwarder(object):
@@ -24,7 +37,19 @@ class FreightForwarder(object):
     and ship yards. it will also handle fleet orchestration and discovery. If no config is present then a invoice /
     shipping and receiving port must be provided.
     """
-    def __init__(self, config_path_override=None, verbose=True):
+    def __init__(self, config_path_override=None, verbose=True, sweep_interval=DANGLING_SWEEP_INTERVAL,
+                 background_sweep=False, background_cleanup=False):
+        """
+        :param config_path_override: A :string:, path to a config file.
+        :param verbose: A :bool:, log verbosity.
+        :param sweep_interval: An :int:, minimum seconds between dangling image sweeps of a host. None disables them.
+        :param background_sweep: A :bool:, sweep dangling images in a background process after the command finishes.
+        :param background_cleanup: A :bool:, remove the containers and images replaced by a deploy in a background
+            process after the command finishes.
+        """
+        if sweep_interval is not None and (not isinstance(sweep_interval, int) or sweep_interval < 0):
+            raise TypeError(logger.error("sweep_interval must be a positive int or None."))
+
         # create config
         self._config = Config(path_override=config_path_override, verbose=verbose)
 
@@ -34,10 +59,25 @@ class FreightForwarder(object):
         # TODO: move bill of lading to its own object.
         self._bill_of_lading = None
 
+        self.sweep_interval     = sweep_interval
+        self.background_sweep   = background_sweep
+        self.background_cleanup = background_cleanup
+
+        # removes the containers and images replaced by a deploy off the deploy's critical path.
+        self._cleanup_worker = BackgroundWorker('deploy-cleanup', threaded=not background_cleanup)
+
     @property
     def config(self):
         return self._config
 
+    @property
+    def bill_of_lading(self):
+        """
+        The services that were successfully dispatched or failed per container ship and, when sampled, the resource
+        usage percentiles per container ship and service under 'stats'.
+        """
+        return self._bill_of_lading
+
     @property
     def project(self):
         return self._config.project
@@ -115,10 +155,13 @@ class FreightForwarder(object):
         # TODO: return a list of all service names
         pass
 
-    def deploy_containers(self, commercial_invoice, tag=None, env=None):
+    def deploy_containers(self, commercial_invoice, tag=None, env=None, prefetch=True, staged=False):
         """
         Deploy containers to specific container ship.
         'restart_policy' = {"maximum_retry_count": 5, "name": "always"}
+
+        :param prefetch: pull every image onto every container ship before any containers are replaced.
+        :param staged: create the new containers on every container ship first, then swap them in fleet wide.
         """
         commercial_invoice = self.__validate_commercial_invoice(commercial_invoice, 'deploy')
 
@@ -126,27 +169,27 @@ class FreightForwarder(object):
         logger.info('Running deploy.')
 
         try:
+            if prefetch and not self.__prefetch(commercial_invoice, fleet, tag):
+                logger.error("Images couldn't be pulled onto every host, no containers were replaced.")
+                return False
+
+            # dependents are linked to the transport service's containers, they're only recreated by a host by host
+            # dispatch.
+            if staged and commercial_invoice.transport_service.dependents:
+                logger.warning("{0} has dependents, which can't be staged. Falling back to a host by host deploy.".format(
+                    commercial_invoice.transport_service.alias
+                ))
+                staged = False
+
+            if staged:
+                return self.__staged_deploy(commercial_invoice, fleet, tag, env)
+
             for address, container_ship in six.iteritems(fleet):
                 # write state file
                 self.__write_state_file(address, commercial_invoice.data_center, commercial_invoice.environment)
 
                 # get new transport service for each container ship
-                transport_service = commercial_invoice.transport_service
-
-                # if source tag is provided override what was parsed in image.
-                if tag:
-                    transport_service.source_tag = tag
-
-                # if env is provided merge what has been passed.
-                if env:
-                    transport_service.container_config.merge_env(env)
-
-                # during a deploy always restart containers on failure. if detach is true.
-                if transport_service.container_config.detach:
-                    transport_service.host_config.restart_policy = {"maximum_retry_count": 5, "name": "always"}
-
-                # validate service configs for deployment
-                self.__service_deployment_validation(transport_service)
+                transport_service = self.__deploy_transport_service(commercial_invoice, tag, env)
 
                 # check with dispatch to see if its okay to export.
                 self.__wait_for_dispatch(address)
@@ -157,25 +200,37 @@ class FreightForwarder(object):
                 if self._bill_of_lading.get('failures'):
                     container_ship.recall_service(transport_service)
                 else:
-                    container_ship.offload_previous_containers(transport_service)
-                    # clean up service expired service cargo.
-                    container_ship.offload_expired_service_cargo(transport_service)
+                    # previous containers and expired cargo are removed while the next host is deployed.
+                    self.__queue_cleanup(address, container_ship, transport_service)
 
             return False if self._bill_of_lading.get('failures') else True
         finally:
             # complete distribution and delete state file.
             self.__complete_distribution(commercial_invoice)
 
-    def quality_control(self, commercial_invoice, attach=False, clean=None, test=None, configs=None, use_cache=False, env=None):
+    def quality_control(self, commercial_invoice, attach=False, clean=None, test=None, configs=None, use_cache=False, env=None,
+                        force_build=False, build_concurrency=BUILD_CONCURRENCY, cache_from_registry=False, stats_interval=None,
+                        benchmark=True, baseline=None, update_baseline=False):
         """
         :param attach:
         :param clean:
         :param test:
         :param configs:
+        :param force_build: build images even if an image with the same build context already exists.
+        :param build_concurrency: maximum number of images built at the same time on a host.
+        :param cache_from_registry: seed the build cache with the last image exported to the destination registry.
+        :param stats_interval: seconds between resource usage samples of the service containers, the percentiles
+            per service are added to the bill of lading. None doesn't sample.
+        :param benchmark: run the transport service's benchmark, when it defines one, and fail on regressions.
+        :param baseline: path to the benchmark baseline. defaults to one per service under BENCHMARK_PATH.
+        :param update_baseline: record the benchmark results as the baseline instead of comparing them.
         :return:
         """
         commercial_invoice = self.__validate_commercial_invoice(commercial_invoice, 'quality_control')
 
+        if benchmark and commercial_invoice.transport_service.benchmark and attach:
+            logger.warning("The benchmark isn't run when attached to the service containers.")
+
         fleet = self.__assemble_fleet(commercial_invoice)
         logger.info('Running quality control.')
 
@@ -193,6 +248,9 @@ class FreightForwarder(object):
 
                 # share some host info with user.
                 container_ship.report()
+                container_ship.force_build     = force_build
+                container_ship.cache_from_tags = self.__cache_from_tags(commercial_invoice, cache_from_registry)
+                container_ship.registries      = commercial_invoice.registries
 
                 # check with dispatch to see if its okay to export.
                 self.__wait_for_dispatch(address)
@@ -211,7 +269,25 @@ class FreightForwarder(object):
                 else:
                     dependents = True
 
-                self.__dispatch(container_ship, transport_service, attach, configs, dependents, test, use_cache)
+                # build every image up front so independent services are built concurrently.
+                container_ship.load_service_cargoes(transport_service, configs, use_cache, dependents, build_concurrency)
+
+                if stats_interval:
+                    container_ship.start_sampling_stats(stats_interval)
+
+                try:
+                    self.__dispatch(container_ship, transport_service, attach, configs, dependents, test, use_cache)
+
+                    if benchmark and transport_service.benchmark and not attach:
+                        # a benchmark of containers that failed to deploy or test doesn't mean anything.
+                        if self._bill_of_lading and self._bill_of_lading.get('failures'):
+                            logger.warning("Skipping the benchmark of {0}, quality control already failed.".format(
+                                transport_service.alias
+                            ))
+                        else:
+                            self.__benchmark(container_ship, transport_service, baseline, update_baseline)
+                finally:
+                    self.__record_stats(container_ship)
 
                 if clean:
                     # delete containers.
@@ -232,8 +308,10 @@ class FreightForwarder(object):
             # complete distribution and delete state file.
             self.__complete_distribution(commercial_invoice)
 
-    def test(self, commercial_invoice, configs):
+    def test(self, commercial_invoice, configs, stats_interval=None):
         """
+        :param stats_interval: seconds between resource usage samples of the test containers, the percentiles per
+            service are added to the bill of lading. None doesn't sample.
         """
         commercial_invoice = self.__validate_commercial_invoice(commercial_invoice, 'test')
 
@@ -254,7 +332,15 @@ class FreightForwarder(object):
                 self.__wait_for_dispatch(address)
 
                 logger.info("dispatching service: {0} on host: {1}.".format(transport_service.alias, address))
-                if not container_ship.test_service(transport_service, configs):
+                if stats_interval:
+                    container_ship.start_sampling_stats(stats_interval)
+
+                try:
+                    passed = container_ship.test_service(transport_service, configs)
+                finally:
+                    self.__record_stats(container_ship)
+
+                if not passed:
                     raise AssertionError(
                         "Service: {0} Failed tests on Host: {1}.".format(transport_service.alias, container_ship.url.geturl())
                     )
@@ -267,6 +353,124 @@ class FreightForwarder(object):
             # complete distribution and delete state file.
             self.__complete_distribution(commercial_invoice)
 
+    def prefetch(self, commercial_invoice, tag=None):
+        """
+        Pull every image the transport service needs onto every container ship of the fleet concurrently.
+
+        :param commercial_invoice: A deploy :CommercialInvoice:.
+        :param tag: overrides the transport service's source tag.
+        :return bool: True when every container ship has every image.
+        """
+        commercial_invoice = self.__validate_commercial_invoice(commercial_invoice, 'deploy')
+
+        fleet = self.__assemble_fleet(commercial_invoice)
+        logger.info('Running prefetch.')
+
+        return self.__prefetch(commercial_invoice, fleet, tag)
+
+    def logs(self, commercial_invoice, since=None, tail='all'):
+        """
+        Stream the logs of the transport service's containers on every container ship of the fleet as one stream
+        ordered by timestamp.  Every container's logs are requested concurrently, since and tail are applied by the
+        docker daemons.
+
+        :param commercial_invoice: A deploy :CommercialInvoice:.
+        :param since: An :int: unix timestamp, only lines written after it are returned.
+        :param tail: An :int: or 'all', lines read from the end of each container's logs.
+        :return: A generator of :LogLine: whose source is the container ship's address and the container's name.
+        """
+        commercial_invoice = self.__validate_commercial_invoice(commercial_invoice, 'deploy')
+
+        fleet   = self.__assemble_fleet(commercial_invoice)
+        service = commercial_invoice.transport_service
+
+        def open_streams(host):
+            address, container_ship = host
+            try:
+                return address, container_ship.service_log_streams(service, since, tail)
+            except Exception as e:
+                logger.error("Unable to read logs from {0}: {1}".format(address, e))
+                return address, {}
+
+        streams = {}
+        for address, host_streams in parallel_map(open_streams, list(six.iteritems(fleet)), DOCKER_MAX_CONCURRENCY):
+            for name, lines in six.iteritems(host_streams):
+                streams["{0} {1}".format(address, name)] = lines
+
+        if not streams:
+            logger.warning("No containers were found for {0}.".format(service.alias))
+
+        return merge_log_streams(streams)
+
+    def exec_containers(self, commercial_invoice, cmd, max_concurrency=DOCKER_MAX_CONCURRENCY):
+        """
+        Run cmd in every running container of the transport service on every container ship of the fleet.  Hosts are
+        run concurrently, max_concurrency caps the commands running on a single host.
+
+        :param commercial_invoice: A deploy :CommercialInvoice:.
+        :param cmd: A :list: or :string:, the command to run.
+        :param max_concurrency: An :int:, maximum number of commands running on a host at the same time.
+        :return: A :dict: of "<address> <container name>" to exit code, None when the command couldn't be run.
+        """
+        if not isinstance(max_concurrency, int) or max_concurrency < 1:
+            raise TypeError(logger.error("max_concurrency must be an int greater than 0."))
+
+        commercial_invoice = self.__validate_commercial_invoice(commercial_invoice, 'deploy')
+
+        fleet   = self.__assemble_fleet(commercial_invoice)
+        service = commercial_invoice.transport_service
+
+        def execute(host):
+            address, container_ship = host
+            try:
+                return address, container_ship.exec_service_containers(service, cmd, max_concurrency)
+            except Exception as e:
+                logger.error("Unable to run {0} on {1}: {2}".format(cmd, address, e))
+                return address, {}
+
+        exit_codes = {}
+        for address, host_exit_codes in parallel_map(execute, list(six.iteritems(fleet))):
+            for name, exit_code in six.iteritems(host_exit_codes):
+                exit_codes["{0} {1}".format(address, name)] = exit_code
+
+        if not exit_codes:
+            logger.warning("No running containers were found for {0}.".format(service.alias))
+
+        failures = sorted(name for name, exit_code in six.iteritems(exit_codes) if exit_code != 0)
+        for name in failures:
+            logger.error("{0} exited with {1}.".format(name, exit_codes[name]))
+
+        logger.info("{0} of {1} containers exited with 0.".format(len(exit_codes) - len(failures), len(exit_codes)))
+
+        return exit_codes
+
+    def run_jobs(self, commercial_invoice, jobs, capacity=JOB_CAPACITY):
+        """
+        Run batch jobs, one-off containers, across the container ships of the fleet.  Job containers are named after
+        the transport service, ``<alias>-job-<job name>-NN``, and removed once they exit.
+
+        :param commercial_invoice: A deploy :CommercialInvoice:.
+        :param jobs: A :list: of :Job:.
+        :param capacity: An :int:, maximum number of jobs running on a host at the same time.
+        :return: The :list: of :Job: with their attempts, exit codes and output.
+        """
+        commercial_invoice = self.__validate_commercial_invoice(commercial_invoice, 'deploy')
+
+        fleet = self.__assemble_fleet(commercial_invoice)
+        logger.info('Running jobs.')
+
+        try:
+            for address, container_ship in six.iteritems(fleet):
+                self.__write_state_file(address, commercial_invoice.data_center, commercial_invoice.environment)
+                container_ship.registries = commercial_invoice.registries
+
+            namespace = "{0}-job".format(commercial_invoice.transport_service.alias)
+
+            return Longshoremen(fleet, capacity, namespace).run(jobs)
+        finally:
+            # complete distribution and delete state file.
+            self.__complete_distribution(commercial_invoice)
+
     def offload(self, commercial_invoice):
         """
         """
@@ -297,8 +501,9 @@ class FreightForwarder(object):
             self.__complete_distribution(commercial_invoice)
 
     def export(self, commercial_invoice, clean=None, configs=None, tags=None, test=None, use_cache=False,
-               validate=True):
+               validate=True, force_build=False, build_concurrency=BUILD_CONCURRENCY, cache_from_registry=False):
         """
+        :param cache_from_registry: seed the build cache with the last image exported to the destination registry.
         """
         commercial_invoice = self.__validate_commercial_invoice(commercial_invoice, 'export')
 
@@ -326,6 +531,8 @@ class FreightForwarder(object):
 
                 # share some host info with user.
                 container_ship.report()
+                container_ship.force_build     = force_build
+                container_ship.cache_from_tags = self.__cache_from_tags(commercial_invoice, cache_from_registry)
 
                 # cleaning up existing containers that might conflict while exporting images.
                 container_ship.offload_all_service_containers(transport_service)
@@ -335,6 +542,9 @@ class FreightForwarder(object):
                     container_ship.injector = commercial_invoice.injector if configs else None
 
                 if validate:
+                    # build every image up front so independent services are built concurrently.
+                    container_ship.load_service_cargoes(transport_service, configs, use_cache, False, build_concurrency)
+
                     # dispatch service and test.
                     self.__dispatch(container_ship, transport_service, False, configs, False, test, use_cache)
                 else:
@@ -399,6 +609,82 @@ class FreightForwarder(object):
         else:
             bill_of_lading[address] = [service]
 
+    def __record_stats(self, container_ship):
+        """ stop sampling container_ship's resource usage, add the percentiles per service to the bill of lading and
+        log them.
+        """
+        summary = container_ship.stop_sampling_stats()
+        if not summary:
+            return
+
+        if self._bill_of_lading is None:
+            self._bill_of_lading = {
+                "failures": {},
+                "successful": {}
+            }
+
+        address = container_ship.url.geturl()
+        self._bill_of_lading.setdefault('stats', {}).setdefault(address, {}).update(summary)
+
+        for alias, metrics in sorted(six.iteritems(summary)):
+            logger.info("resource usage of {0} on {1} over {2} samples:".format(alias, address, metrics['samples']))
+            for metric in sorted(metric for metric in metrics if metric != 'samples'):
+                logger.info("\t {0}: {1}".format(metric, ', '.join(
+                    "{0} {1}".format(key, '-' if metrics[metric][key] is None else "{0:.2f}".format(metrics[metric][key]))
+                    for key in ('p50', 'p90', 'p99', 'max')
+                )))
+
+    def __benchmark(self, container_ship, service, baseline_path=None, update_baseline=False):
+        """ run service's benchmark on container_ship and compare the results with the baseline.  The service is
+        added to the bill of lading's failures when any metric regressed.  The results become the baseline when asked
+        to or when the default baseline doesn't exist yet.
+        """
+        address = container_ship.url.geturl()
+        results = container_ship.benchmark_service(service)
+        path    = baseline_path or os.path.join(BENCHMARK_PATH, "{0}.json".format(service.alias))
+
+        baseline    = load_baseline(path)
+        regressions = []
+        if baseline is None and baseline_path and not update_baseline:
+            raise OSError(logger.error("benchmark baseline {0} doesn't exist.".format(path)))
+
+        if baseline is None or update_baseline:
+            write_baseline(path, results)
+            logger.info("recorded benchmark baseline of {0} in {1}.".format(service.alias, path))
+        else:
+            regressions = service.benchmark.compare(results, baseline)
+
+        if self._bill_of_lading is None:
+            self._bill_of_lading = {
+                "failures": {},
+                "successful": {}
+            }
+
+        self._bill_of_lading.setdefault('benchmarks', {}).setdefault(address, {})[service.alias] = {
+            'results': results,
+            'baseline': baseline,
+            'regressions': [dict(regression._asdict()) for regression in regressions]
+        }
+
+        logger.info("benchmark of {0} on {1}:".format(service.alias, address))
+        for metric, result in sorted(six.iteritems(results)):
+            logger.info("\t {0}: {1} baseline: {2}".format(metric, result, (baseline or {}).get(metric, '-')))
+
+        for regression in regressions:
+            logger.error("benchmark of {0} on {1} regressed {2}: {3} against a baseline of {4} with a {5}% tolerance.".format(
+                service.alias,
+                address,
+                regression.metric,
+                '-' if regression.result is None else regression.result,
+                regression.baseline,
+                regression.tolerance
+            ))
+
+        if regressions:
+            self.__set_bill_of_lading(container_ship, service, False)
+
+        return regressions
+
     def __dispatch_dependencies(self, container_ship, service, configs, dependents, test, use_cache):
         """
         """
@@ -442,6 +728,174 @@ class FreightForwarder(object):
                 "failed while dispatching service: {0} on host: {1}.".format(service.name, container_ship.url.geturl())
             )
 
+    def __cache_from_tags(self, commercial_invoice, cache_from_registry):
+        """ Returns the tags, in order of preference, of the exported images used to seed the build cache.
+        """
+        if not cache_from_registry:
+            return None
+
+        tags = list(commercial_invoice.tags)
+        if 'latest' not in tags:
+            tags.append('latest')
+
+        return tags
+
+    def __deploy_transport_service(self, commercial_invoice, tag=None, env=None):
+        """ returns a new transport service configured for a deploy.
+        """
+        transport_service = commercial_invoice.transport_service
+
+        # if source tag is provided override what was parsed in image.
+        if tag:
+            transport_service.source_tag = tag
+
+        # every host pulls the digest the tags resolved to when the first host was dispatched.
+        commercial_invoice.pin_source_digests(transport_service)
+
+        # if env is provided merge what has been passed.
+        if env:
+            transport_service.container_config.merge_env(env)
+
+        # during a deploy always restart containers on failure. if detach is true.
+        if transport_service.container_config.detach:
+            transport_service.host_config.restart_policy = {"maximum_retry_count": 5, "name": "always"}
+
+        # validate service configs for deployment
+        self.__service_deployment_validation(transport_service)
+
+        return transport_service
+
+    def __staged_deploy(self, commercial_invoice, fleet, tag=None, env=None):
+        """ create the new containers on every container ship concurrently, then stop the previous containers and start
+        the new ones host after host in a tight loop.  When any host fails to swap or verify every host is rolled back.
+        Only used for transport services without dependents.
+        """
+        hosts    = list(six.iteritems(fleet))
+        services = {}
+
+        for address, container_ship in hosts:
+            self.__write_state_file(address, commercial_invoice.data_center, commercial_invoice.environment)
+            services[address] = self.__deploy_transport_service(commercial_invoice, tag, env)
+
+            # check with dispatch to see if its okay to deploy.
+            self.__wait_for_dispatch(address)
+
+            # missing dependencies are started, they don't replace anything.
+            self.__dispatch_dependencies(container_ship, services[address], None, True, False, False)
+
+        def stage(host):
+            address, container_ship = host
+            logger.info("staging service: {0} on host: {1}.".format(services[address].alias, address))
+            try:
+                return container_ship.stage_service_containers(services[address])
+            except Exception as e:
+                logger.error("Staging {0} on {1} failed: {2}".format(services[address].alias, address, e))
+                return False
+
+        if not all(parallel_map(stage, hosts, DOCKER_MAX_CONCURRENCY)):
+            logger.error("Containers couldn't be staged on every host, no containers were replaced.")
+            for address, container_ship in hosts:
+                container_ship.discard_service_containers(services[address])
+
+            return False
+
+        def verify(host):
+            address, container_ship = host
+            return container_ship.verify_service_containers(services[address])
+
+        if self.__swap_fleet(hosts, services):
+            for (address, container_ship), verified in zip(hosts, parallel_map(verify, hosts, DOCKER_MAX_CONCURRENCY)):
+                self.__set_bill_of_lading(container_ship, services[address], verified)
+
+        for address, container_ship in hosts:
+            if self._bill_of_lading.get('failures'):
+                self.__roll_back(address, container_ship, services[address])
+            else:
+                self.__queue_cleanup(address, container_ship, services[address])
+
+        return False if self._bill_of_lading.get('failures') else True
+
+    def __roll_back(self, address, container_ship, transport_service):
+        """ discard transport_service's new containers on container_ship and restart the previous ones.  Hosts that
+        weren't swapped still run their previous containers, recall leaves them running.
+        """
+        try:
+            container_ship.discard_service_containers(transport_service)
+            container_ship.recall_service(transport_service)
+        except Exception as e:
+            logger.error("Rolling back {0} on {1} failed: {2}".format(transport_service.alias, address, e))
+
+    def __swap_fleet(self, hosts, services):
+        """ swap the staged containers in host after host.  Stops at the first host that fails, which is added to the
+        bill of lading's failures.
+
+        :return bool: True when every host was swapped.
+        """
+        for address, container_ship in hosts:
+            try:
+                elapsed = container_ship.swap_service_containers(services[address])
+            except Exception as e:
+                logger.error("Swapping {0} on {1} failed: {2}".format(services[address].alias, address, e))
+                self.__set_bill_of_lading(container_ship, services[address], False)
+                return False
+
+            logger.info("swapped service: {0} on host: {1} in {2:.2f}s.".format(services[address].alias, address, elapsed))
+
+        return True
+
+    def __queue_cleanup(self, address, container_ship, transport_service):
+        """ hand the removal of the containers and cargo transport_service replaced on container_ship to the cleanup
+        worker.  The deploy of the host is done once its new containers are healthy, cleanup failures are logged and
+        don't fail the deploy.
+        """
+        def clean_up():
+            container_ship.offload_previous_containers(transport_service)
+            # clean up service expired service cargo.
+            container_ship.offload_expired_service_cargo(transport_service)
+
+        logger.info("deployed service: {0} on host: {1}, previous containers will be removed in the background.".format(
+            transport_service.alias,
+            address
+        ))
+        self._cleanup_worker.submit("Clean up of {0} on {1}".format(transport_service.alias, address), clean_up)
+
+    def __prefetch(self, commercial_invoice, fleet, tag=None):
+        """ pull the transport service's images onto every container ship concurrently, output is prefixed with
+        each container ship's address.
+        """
+        def transport_service():
+            service = commercial_invoice.transport_service
+            if tag:
+                service.source_tag = tag
+
+            commercial_invoice.pin_source_digests(service)
+
+            return service
+
+        def prefetch(host):
+            address, container_ship = host
+            output = PrefixedStream(address)
+            try:
+                container_ship.prefetch_service_cargoes(transport_service(), output)
+            except Exception as e:
+                logger.error("Prefetch on {0} failed: {1}".format(address, e))
+                return False
+            finally:
+                output.close()
+
+            return True
+
+        # tags are resolved before the hosts are prefetched concurrently so every host pulls the same digests.
+        transport_service()
+
+        started_at = time()
+        results    = parallel_map(prefetch, list(six.iteritems(fleet)), DOCKER_MAX_CONCURRENCY)
+        logger.info("Prefetched images on {0} of {1} hosts in {2:.2f}s.".format(
+            sum(1 for result in results if result), len(results), time() - started_at
+        ))
+
+        return all(results)
+
     def __dispatch_export_no_validation(self, container_ship, transport_service, configs, use_cache):
         try:
             container_ship.load_cargo(transport_service, configs, use_cache)
@@ -477,55 +931,53 @@ class FreightForwarder(object):
         return services
 
     def __wait_for_dispatch(self, address):
-        dispatch_queue = self.__get_dispatch_queue(address)
-        if not dispatch_queue:
-            return True
-
         host = parse_hostname(address)
-        state_path = os.path.join(STATE_PATH, self.team, self.project, host)
-        current_pid = None
-        while current_pid != os.getpid():
-            try:
-                current_pid = dispatch_queue.pop(0)[1]
-                queue_length = len(dispatch_queue)
+        if not os.path.isdir(os.path.join(STATE_PATH, self.team, self.project, host)):
+            return True
 
-                if queue_length > 0:
-                    logger.info("Dispatch for {0} has a queue count of {1} for {2}-{3}.".format(
-                        host,
-                        queue_length,
-                        self.team,
-                        self.project
-                    ))
+        while True:
+            # read the queue again after every wait, a finished run may have handed its place to a detached cleanup.
+            pids  = [pid for created_at, pid in self.__get_dispatch_queue(address)]
+            ahead = pids[:pids.index(os.getpid())] if os.getpid() in pids else pids
+            if not ahead:
+                return True
+
+            current_pid = ahead[0]
+            logger.info("Dispatch for {0} has a queue count of {1} for {2}-{3}.".format(
+                host,
+                len(ahead),
+                self.team,
+                self.project
+            ))
 
+            try:
                 currently_dispatched = psutil.Process(current_pid)
 
-                if current_pid == os.getpid():
-                    break
+                state_data = self.__get_state_data(address, current_pid)
+                if state_data:
+                    logger.info("Please wait for dispatch while pid: {0} completes {1} "
+                                "for {2}-{3} in data center: {4} for environment: {5}.".format(
+                                    state_data.get('pid'),
+                                    state_data.get('action'),
+                                    state_data.get('team'),
+                                    state_data.get('project'),
+                                    state_data.get('data_center'),
+                                    state_data.get('environment'))
+                                )
+
+                while currently_dispatched.is_running() and currently_dispatched.status() != psutil.STATUS_ZOMBIE:
+                    stdout.write('.')
+                    stdout.flush()
+                    sleep(1)
                 else:
-                    state_data = self.__get_state_data(address, current_pid)
-                    if state_data:
-                        logger.info("Please wait for dispatch while pid: {0} completes {1} "
-                                    "for {2}-{3} in data center: {4} for environment: {5}.".format(
-                                        state_data.get('pid'),
-                                        state_data.get('action'),
-                                        state_data.get('team'),
-                                        state_data.get('project'),
-                                        state_data.get('data_center'),
-                                        state_data.get('environment'))
-                                    )
-
-                    while currently_dispatched.is_running():
-                        stdout.write('.')
-                        stdout.flush()
-                        sleep(1)
-                    else:
-                        stdout.write('\n')
+                    stdout.write('\n')
 
             except psutil.NoSuchProcess:
                 logger.info("Was unable to find pid: {0}.".format(current_pid))
-                self.__delete_state_file(state_path, current_pid)
 
-        return True
+            # a run that exited without cleaning up leaves its state file behind.
+            if not psutil.pid_exists(current_pid):
+                self.__delete_state_file(address, current_pid)
 
     def __get_state_data(self, address, pid):
         host = parse_hostname(address)
@@ -579,7 +1031,8 @@ class FreightForwarder(object):
         pids = []
         for path in os.listdir(state_path):
             file_path = os.path.join(state_path, path)
-            created_at = os.path.getctime(file_path)
+            # mtime, unlike ctime, can be carried over when a state file is handed to a detached process.
+            created_at = os.path.getmtime(file_path)
             pid, ext = os.path.splitext(path)
             try:
                 pid = int(pid)
@@ -610,20 +1063,174 @@ class FreightForwarder(object):
             return False
 
     def __complete_distribution(self, commercial_invoice):
-        cleaned = []
+        fleet = {}
         for container_ships in six.itervalues(commercial_invoice.container_ships):
-
             for address, container_ship in six.iteritems(container_ships):
-                if address in cleaned:
-                    continue
+                fleet.setdefault(address, container_ship)
+
+        # stop every thread before any work is handed to a background process.
+        for container_ship in six.itervalues(fleet):
+            container_ship.log_collector.close()
+            container_ship.stop_sampling_stats()
 
-                # clean up dangling images
-                container_ship.clean_up_dangling_images()
+        # hosts whose state file is held by a detached process until its work is done.
+        detached = self.__finish_cleanups(fleet)
 
+        sweeps = [(address, container_ship) for address, container_ship in sorted(six.iteritems(fleet)) if self.__sweep_due(address)]
+        if sweeps:
+            detached.update(self.__dispatch_sweeps(sweeps))
+
+        for address in fleet:
+            if address not in detached:
                 # remove state file
                 self.__delete_state_file(address, os.getpid())
 
-                cleaned.append(address)
+    def __dispatch_sweeps(self, sweeps):
+        """ clean up dangling images on each container ship.  When background_sweep is set the sweep is handed off to
+        a detached child process so the command can return immediately.  Returns the addresses whose state file was
+        handed to the child.
+        """
+        def sweep(sweep_args):
+            address, container_ship = sweep_args
+            try:
+                summary = container_ship.clean_up_dangling_images()
+            except Exception as e:
+                logger.warning("Dangling image sweep of {0} failed: {1}".format(address, e))
+                summary = None
+
+            self.__write_sweep_file(address, summary)
+
+        # claim the hosts before sweeping so concurrent runs don't sweep the same host.
+        for address, container_ship in sweeps:
+            self.__write_sweep_file(address)
+
+        if self.background_sweep:
+            detached = self.__detach('Sweeping dangling images', dict(sweeps), parallel_map, sweep, sweeps)
+            if detached is not None:
+                return detached
+
+        parallel_map(sweep, sweeps)
+
+        return set()
+
+    def __finish_cleanups(self, fleet):
+        """ run the cleanups queued by a deploy.  With background_cleanup they are handed off to a detached child
+        process, otherwise this waits for the cleanup worker to finish.  Returns the addresses whose state file was
+        handed to the child.
+        """
+        if not self._cleanup_worker.pending:
+            return set()
+
+        if self.background_cleanup:
+            detached = self.__detach('Removing previous containers', fleet, self._cleanup_worker.run)
+            if detached is not None:
+                return detached
+
+        logger.info("Waiting for {0} clean up(s) of previous containers.".format(self._cleanup_worker.pending))
+        self._cleanup_worker.join()
+
+        return set()
+
+    def __detach(self, description, fleet, callback, *args):
+        """ call callback in a detached child process so the command can return immediately.  The state file of each
+        host in fleet is handed to the child and removed once callback returns, so no other run dispatches to those
+        hosts in the meantime.  Returns the addresses handed over, None when the child couldn't be started and the
+        caller should do the work.
+        """
+        if not hasattr(os, 'fork'):
+            return None
+
+        # a thread holding a lock at the time of the fork would leave it locked in the child for good.
+        self._cleanup_worker.close()
+        for container_ship in six.itervalues(fleet):
+            container_ship.log_collector.close()
+            container_ship.stop_sampling_stats()
+
+        handed_over, release = os.pipe()
+        try:
+            pid = os.fork()
+        except OSError as e:
+            os.close(handed_over)
+            os.close(release)
+            logger.warning("Unable to start background process, {0} now: {1}".format(description.lower(), e))
+            return None
+
+        if pid:
+            os.close(handed_over)
+            try:
+                detached = set(address for address in fleet if self.__hand_over_state_file(address, pid))
+            finally:
+                # the child starts once its state files are in place.
+                os.close(release)
+
+            logger.info("{0} in the background pid: {1}.".format(description, pid))
+            return detached
+
+        os.close(release)
+        os.read(handed_over, 1)
+        os.close(handed_over)
+
+        # detach from the terminal and any pipes so the calling process isn't held open.
+        os.setsid()
+        devnull = os.open(os.devnull, os.O_RDWR)
+        for fd in (0, 1, 2):
+            os.dup2(devnull, fd)
+
+        try:
+            for container_ship in six.itervalues(fleet):
+                # don't reuse connections inherited from the parent.
+                container_ship._client_session.close()
+
+            callback(*args)
+        finally:
+            try:
+                for address in fleet:
+                    self.__delete_state_file(address, os.getpid())
+            finally:
+                os._exit(0)
+
+    def __hand_over_state_file(self, address, pid):
+        """ move this process' state file for address to pid, keeping its place in the dispatch queue.
+        """
+        state_data = self.__get_state_data(address, os.getpid())
+        if not state_data:
+            return False
+
+        state_path = os.path.join(STATE_PATH, self.team, self.project, parse_hostname(address))
+        state_file = os.path.join(state_path, "{0}.yml".format(os.getpid()))
+        queued_at  = os.path.getmtime(state_file)
+
+        state_data['pid'] = pid
+        child_state_file  = os.path.join(state_path, "{0}.yml".format(pid))
+        with open(child_state_file, 'w') as f:
+            f.write(yaml.safe_dump(dict(state_data)))
+
+        os.utime(child_state_file, (queued_at, queued_at))
+        self.__delete_state_file(address, os.getpid())
+
+        return True
+
+    def __sweep_due(self, address):
+        if self.sweep_interval is None:
+            return False
+
+        sweep_file = os.path.join(SWEEP_PATH, "{0}.yml".format(parse_hostname(address)))
+        if not os.path.isfile(sweep_file):
+            return True
+
+        return time() - os.path.getmtime(sweep_file) >= self.sweep_interval
+
+    def __write_sweep_file(self, address, summary=None):
+        if not os.path.exists(SWEEP_PATH):
+            os.makedirs(SWEEP_PATH)
+
+        data = {'host': parse_hostname(address), 'pid': os.getpid(), 'swept_at': int(time())}
+        if summary:
+            data['removed'] = len(summary['cargoes']['removed'])
+            data['failed']  = len(summary['cargoes']['failed'])
+
+        with open(os.path.join(SWEEP_PATH, "{0}.yml".format(data['host'])), 'w') as f:
+            f.write(yaml.safe_dump(data, default_flow_style=False))
 
     def __service_deployment_validation(self, service, validated=[]):
         if not service:
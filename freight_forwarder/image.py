@@ -1,11 +1,16 @@
 # -*- coding: utf-8; -*-
 from __future__ import unicode_literals
+import json
 import os
+from time import time
+
 import docker
 import dateutil.parser
 import six
 
-from .utils            import parse_stream, normalize_keys, retry, logger
+from .build_context    import BuildContext
+from .const            import CACHE_FROM_API_VERSION, DOCKER_MAX_CONCURRENCY
+from .utils            import parse_stream, normalize_keys, parallel_map, retry, logger
 from .registry         import V1, V2
 from .container.config import Config as ContainerConfig
 
@@ -25,6 +30,7 @@ class Image(object):
 
         self.identifier = identifier
         self.repo_tags = ()
+        self.repo_digests = ()
         self._inspect_and_map(identifier)
 
     def push(self, registry, repository_tag, tag=None):
@@ -202,6 +208,8 @@ class Image(object):
             self.architecture = response['architecture']
             self.docker_version = response['docker_version']
             self.size = response['size']
+            self.repo_tags = tuple(response.get('repo_tags') or ())
+            self.repo_digests = tuple(response.get('repo_digests') or ())
             self.container_config = ContainerConfig(response.get('container_config')) if response.get('config') else ContainerConfig()
             self.config = ContainerConfig(response.get('config')) if response.get('config') else ContainerConfig()
 
@@ -214,18 +222,21 @@ class Image(object):
         if not isinstance(client, docker.Client):
             raise TypeError("client needs to be of type docker.Client.")
 
-        images = {}
+        image_ids = []
 
         response = client.images(all=True, filters=filters)
 
         for image in response:
             image = normalize_keys(image)
 
-            if image['id'] not in images:
-                images[image['id']] = Image(client, image['id'])
+            if image['id'] not in image_ids:
+                image_ids.append(image['id'])
             continue
 
-        return images
+        # each image requires an inspect so they are done concurrently.
+        cargoes = parallel_map(lambda image_id: Image(client, image_id), image_ids, DOCKER_MAX_CONCURRENCY)
+
+        return dict(zip(image_ids, cargoes))
 
     @staticmethod
     def find_by_name(client, name):
@@ -280,8 +291,10 @@ class Image(object):
             raise e
 
     @staticmethod
-    def pull(client, registry, repository_tag, tag=None):
+    def pull(client, registry, repository_tag, tag=None, output=None):
         """
+        :param repository_tag: A :string:, "repository:tag" or "repository@digest" to pull an exact image.
+        :param output: file like object the pull output is written to. defaults to stdout.
         """
         if not isinstance(client, docker.Client):
             raise TypeError("client needs to be of type docker.Client.")
@@ -292,7 +305,16 @@ class Image(object):
         if not isinstance(repository_tag, six.string_types):
             raise TypeError('repository must be a string')
 
-        if ':' in repository_tag:
+        separator = ':'
+        if '@' in repository_tag:
+            if tag:
+                raise AttributeError(
+                    'When passing the tag parameter you must remove the digest from repository_tag.'
+                )
+
+            repository_tag, tag = repository_tag.split('@')
+            separator           = '@'
+        elif ':' in repository_tag:
             if tag:
                 raise AttributeError(
                     'When passing the tag parameter you must remove the tag from repository_tag.'
@@ -313,15 +335,20 @@ class Image(object):
         else:
             response = client.pull("{0}/{1}".format(registry.location, repository_tag), stream=True, tag=tag)
 
-        parse_stream(response)
+        parse_stream(response, output)
         client.close()
 
-        return Image(client, '{0}/{1}:{2}'.format(registry.location, repository_tag, tag))
+        return Image(client, '{0}/{1}{2}{3}'.format(registry.location, repository_tag, separator, tag))
 
     @staticmethod
-    def build(client, repository_tag, docker_file, tag=None, use_cache=False):
+    def build(client, repository_tag, docker_file, tag=None, use_cache=False, output=None, before_upload=None,
+              cache_from=None):
         """
         Build a docker image
+
+        :param output: file like object the build output is written to. defaults to stdout.
+        :param before_upload: callable called after the build context is packaged and before it is uploaded.
+        :param cache_from: A :list: of images used as cache sources. Ignored when the docker daemon doesn't support it.
         """
         if not isinstance(client, docker.Client):
             raise TypeError("client needs to be of type docker.Client.")
@@ -343,36 +370,84 @@ class Image(object):
 
         if ':' not in repository_tag:
             repository_tag = "{0}:{1}".format(repository_tag, tag)
+        build_context = BuildContext.from_docker_file(docker_file)
+
         file_obj = None
         try:
-            if os.path.isfile(docker_file):
-                path = os.getcwd()
-                docker_file = "./{0}".format(os.path.relpath(docker_file))
+            file_obj = build_context.archive()
+            logger.info("Uploading build context: {0} files {1:.2f}MB.".format(
+                build_context.file_count, build_context.size / 1024.0 / 1024.0
+            ))
 
-                # TODO: support using file_obj in the future. Needed for post pre hooks and the injector.
-                # with open(docker_file) as Dockerfile:
-                #     testing = Dockerfile.read()
-                #     file_obj = BytesIO(testing.encode('utf-8'))
+            if before_upload:
+                before_upload()
 
+            started_at = time()
+            if cache_from and Image.supports_cache_from(client):
+                response = Image._build_from_cache(client, file_obj, build_context.docker_file, repository_tag, cache_from)
+            else:
                 response = client.build(
-                    path=path,
+                    fileobj=file_obj,
+                    custom_context=True,
+                    dockerfile=build_context.docker_file,
                     nocache=no_cache,
-                    # custom_context=True,
-                    dockerfile=docker_file,
-                    # fileobj=file_obj,
                     tag=repository_tag,
                     rm=True,
                     stream=True
                 )
-            else:
-                response = client.build(path=docker_file, tag=repository_tag, rm=True, nocache=no_cache, stream=True)
+            logger.info("Uploaded build context in {0:.2f}s.".format(time() - started_at))
         except Exception as e:
             raise e
         finally:
             if file_obj:
                 file_obj.close()
 
-        parse_stream(response)
+        stream_data = parse_stream(response, output)
         client.close()
 
+        steps  = [data['stream'] for data in stream_data if data.get('stream')]
+        total  = sum(1 for line in steps if line.startswith('Step '))
+        cached = sum(1 for line in steps if 'Using cache' in line)
+        logger.info("Built {0}: {1} of {2} steps used the layer cache.".format(repository_tag, cached, total))
+
         return Image(client, repository_tag)
+
+    @staticmethod
+    def supports_cache_from(client):
+        """
+        Returns True when the docker daemon accepts cache sources for builds, api version 1.25 and later.
+        """
+        try:
+            api_version = client.version(api_version=False).get('ApiVersion')
+        except Exception as e:
+            logger.warning("Unable to get the docker daemon's api version: {0}".format(e))
+            return False
+
+        return bool(api_version) and docker.utils.version_gte(api_version, CACHE_FROM_API_VERSION)
+
+    @staticmethod
+    def _build_from_cache(client, file_obj, docker_file, repository_tag, cache_from):
+        """
+        Posts a build with cache sources to the daemon's /build endpoint.  docker-py 1.x's build doesn't take
+        ``cachefrom`` and the client is pinned to an api version older than the one that introduced it, so the
+        request is made at CACHE_FROM_API_VERSION directly.  The layer cache is always used.
+        """
+        headers = {'Content-Type': 'application/tar'}
+        client._set_auth_headers(headers)
+
+        response = client._post(
+            "{0}/v{1}/build".format(client.base_url, CACHE_FROM_API_VERSION),
+            data=file_obj,
+            params={
+                't': repository_tag,
+                'nocache': False,
+                'rm': True,
+                'dockerfile': docker_file,
+                'cachefrom': json.dumps(cache_from)
+            },
+            headers=headers,
+            stream=True
+        )
+        client._raise_for_status(response)
+
+        return client._stream_helper(response)
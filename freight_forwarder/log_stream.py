@@ -0,0 +1,136 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals
+import heapq
+import threading
+from collections import namedtuple
+
+import dateutil.parser
+import dateutil.tz
+import six
+from six.moves import queue
+
+from .utils import logger
+
+# lines read ahead from each stream while the merge waits on slower streams.
+READ_AHEAD = 256
+
+LogLine = namedtuple('LogLine', ['timestamp', 'source', 'message'])
+
+_END = object()
+
+
+def parse_timestamp(line):
+    """ Splits a line logged with docker's ``timestamps`` option into a sort key, the timestamp and the message.
+
+    Docker writes RFC 3339 timestamps with trailing zeros trimmed from the nanoseconds so they can't be compared as
+    strings.  Lines without a timestamp sort first.
+
+    :param line: A :string:, ``"2016-04-12T10:00:00.1234Z message"``.
+    :rtype: A :tuple: of (sort key, timestamp, message).
+    """
+    stamp, _, message = line.partition(' ')
+
+    if stamp.endswith('Z') and len(stamp) >= 20 and stamp[10] == 'T':
+        seconds, _, fraction = stamp[:-1].partition('.')
+        if fraction.isdigit() or not fraction:
+            return (seconds, int(fraction.ljust(9, '0')[:9])), stamp, message
+
+    try:
+        parsed = dateutil.parser.parse(stamp)
+    except (ValueError, OverflowError):
+        return ('', 0), None, line
+
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(dateutil.tz.tzutc()).replace(tzinfo=None)
+
+    return (parsed.strftime('%Y-%m-%dT%H:%M:%S'), parsed.microsecond * 1000), stamp, message
+
+
+def merge_log_streams(streams, read_ahead=READ_AHEAD):
+    """ Merges timestamped log streams into one stream ordered by timestamp.
+
+    Every stream is read on its own thread into a bounded queue, so streams are fetched concurrently while memory is
+    limited to read_ahead lines per stream.  A heap holding the next line of every stream yields the oldest line,
+    streams are expected to be ordered themselves, like docker logs are.
+
+    :param streams: A :dict: of source name to an iterable of lines written with timestamps.
+    :param read_ahead: An :int:, lines buffered for each stream.
+    :rtype: A generator of :LogLine:
+    """
+    readers = [_StreamReader(source, lines, read_ahead) for source, lines in sorted(six.iteritems(streams))]
+    heap    = []
+
+    try:
+        for reader in readers:
+            reader.start()
+
+        for index, reader in enumerate(readers):
+            _push(heap, index, reader)
+
+        while heap:
+            key, index, line = heapq.heappop(heap)
+            yield line
+
+            _push(heap, index, readers[index])
+    finally:
+        for reader in readers:
+            reader.stop()
+
+
+def _push(heap, index, reader):
+    line = reader.next_line()
+    if line is not None:
+        key, stamp, message = parse_timestamp(line)
+        heapq.heappush(heap, (key, index, LogLine(stamp, reader.source, message)))
+
+
+class _StreamReader(object):
+    """ Reads an iterable of lines on a daemon thread into a bounded queue.
+    """
+    def __init__(self, source, lines, read_ahead):
+        self.source   = source
+        self._lines   = lines
+        self._queue   = queue.Queue(maxsize=read_ahead)
+        self._stopped = threading.Event()
+        self._thread  = threading.Thread(target=self._read, name="logs-{0}".format(source))
+        self._thread.daemon = True
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+        # unblock the reader if it is waiting on a full queue.
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def next_line(self):
+        line = self._queue.get()
+        if line is _END:
+            return None
+
+        return line
+
+    def _read(self):
+        try:
+            for line in self._lines:
+                if not self._put(line):
+                    return
+        except Exception as e:
+            logger.error("Reading logs from {0} failed: {1}".format(self.source, e))
+        finally:
+            self._put(_END)
+
+    def _put(self, item):
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+
+        return False
@@ -1,10 +1,184 @@
 # -*- coding: utf-8; -*-
 from __future__ import unicode_literals
+import re
+import threading
+from collections import namedtuple
+from time        import time
+
+import six
+from six.moves import queue
+
+from .const                import JOB_CAPACITY, LOG_BUFFER_LINES
+from .container.log_buffer import CapturedOutput
+from .utils                import logger, PrefixedStream
+
+JobAttempt = namedtuple('JobAttempt', ['host', 'exit_code', 'duration'])
+
+_NAME_REGEX = re.compile(r'\A[a-zA-Z0-9][a-zA-Z0-9_.-]*\Z')
+
+
+class Job(object):
+    """ A one-off container run by :class:`Longshoremen`.
+
+    :param name: A :string:, used to name the job's containers.
+    :param image: A :string:, "repository:tag" or "repository@digest".
+    :param command: A :list: or :string:, overrides the image's command.
+    :param env: A :dict: or :list: of "KEY=VALUE" environment variables.
+    :param retries: An :int:, times the job is run again after it fails.
+    """
+    def __init__(self, name, image, command=None, env=None, retries=0):
+        if not isinstance(name, six.string_types) or not _NAME_REGEX.match(name):
+            raise TypeError(logger.error("job name must be a string of letters, numbers, _, . or -. {0} was passed.".format(name)))
+
+        if not isinstance(image, six.string_types) or not image:
+            raise TypeError(logger.error("job {0} image must be a string.".format(name)))
+
+        if command is not None and not isinstance(command, (list, six.string_types)):
+            raise TypeError(logger.error("job {0} command must be a list or a string.".format(name)))
+
+        if env is not None and not isinstance(env, (dict, list)):
+            raise TypeError(logger.error("job {0} env must be a dict or a list.".format(name)))
+
+        if not isinstance(retries, int) or isinstance(retries, bool) or retries < 0:
+            raise TypeError(logger.error("job {0} retries must be an int of 0 or more.".format(name)))
+
+        self.name     = name
+        self.image    = image
+        self.command  = command
+        self.env      = env
+        self.retries  = retries
+        self.attempts = []
+        self.output   = []
+        self.error    = None
+
+    def __repr__(self):
+        return "<Job {0} attempts={1} exit_code={2}>".format(self.name, len(self.attempts), self.exit_code)
+
+    @property
+    def exit_code(self):
+        """ The exit code of the last attempt, None when the job hasn't run or its container couldn't be run.
+        """
+        return self.attempts[-1].exit_code if self.attempts else None
+
+    @property
+    def duration(self):
+        """ Seconds spent running the job over every attempt.
+        """
+        return sum(attempt.duration for attempt in self.attempts)
+
+    @property
+    def succeeded(self):
+        return self.exit_code == 0
+
+    @property
+    def retryable(self):
+        return not self.succeeded and len(self.attempts) <= self.retries
 
 
-# TODO: Implement Longshoremen.
 class Longshoremen(object):
-    """Longshoremen should be doing the loading and unloading of cargo and containers. They should also run batch like jobs.
+    """Longshoremen run batch jobs, one-off containers, across the container ships of a fleet.
+
+    Every container ship gets ``capacity`` workers taking jobs from a shared queue, so a host never runs more than
+    capacity jobs at once and hosts that finish jobs sooner take on more of them.  A failed job goes back on the queue
+    until it has been retried ``job.retries`` times, on whichever host is free first.
+
+    :param fleet: A :dict: of address to :ContainerShip:.
+    :param capacity: An :int:, maximum number of jobs running on a container ship at the same time.
+    :param namespace: A :string:, prefixed to job names to name their containers.
+    :param max_lines: An :int:, lines of output kept for each job, the oldest lines are dropped first.
     """
-    def __init__(self):
-        raise NotImplementedError
+    def __init__(self, fleet, capacity=JOB_CAPACITY, namespace=None, max_lines=LOG_BUFFER_LINES):
+        if not isinstance(fleet, dict) or not fleet:
+            raise TypeError(logger.error("fleet must be a dict of address to container ship with at least one host."))
+
+        if not isinstance(capacity, int) or isinstance(capacity, bool) or capacity < 1:
+            raise TypeError(logger.error("capacity must be an int greater than 0. {0} was passed.".format(capacity)))
+
+        self.fleet     = fleet
+        self.capacity  = capacity
+        self.namespace = namespace
+        self.max_lines = max_lines
+
+    def run(self, jobs):
+        """ Run jobs across the fleet and wait for every one of them to finish.
+
+        :param jobs: An iterable of :Job:.
+        :rtype: A :list: of the :Job: passed, with their attempts, exit codes and output filled in.
+        """
+        jobs = list(jobs)
+        for job in jobs:
+            if not isinstance(job, Job):
+                raise TypeError(logger.error("jobs must be instances of Job. {0} was passed.".format(job)))
+
+        if not jobs:
+            return jobs
+
+        pending = queue.Queue()
+        for job in jobs:
+            pending.put(job)
+
+        workers = []
+        for address, container_ship in sorted(six.iteritems(self.fleet)):
+            for slot in range(min(self.capacity, len(jobs))):
+                worker = threading.Thread(
+                    target=self._work,
+                    args=(pending, address, container_ship),
+                    name="longshoreman-{0}-{1}".format(address, slot)
+                )
+                worker.daemon = True
+                worker.start()
+                workers.append(worker)
+
+        pending.join()
+
+        for worker in workers:
+            pending.put(None)
+
+        for worker in workers:
+            worker.join()
+
+        failures = [job for job in jobs if not job.succeeded]
+        for job in failures:
+            logger.error("job {0} failed after {1} attempt(s), exit code: {2}.".format(job.name, len(job.attempts), job.exit_code))
+
+        logger.info("{0} of {1} jobs succeeded.".format(len(jobs) - len(failures), len(jobs)))
+
+        return jobs
+
+    ##
+    # private methods
+    ##
+    def _work(self, pending, address, container_ship):
+        while True:
+            job = pending.get()
+            try:
+                if job is None:
+                    return
+
+                self._run(address, container_ship, job)
+
+                # put back before the attempt is marked done so the queue isn't drained in between.
+                if job.retryable:
+                    logger.warning("job {0} exited with {1} on {2}, retrying.".format(job.name, job.exit_code, address))
+                    pending.put(job)
+            finally:
+                pending.task_done()
+
+    def _run(self, address, container_ship, job):
+        alias   = "{0}-{1}".format(self.namespace, job.name) if self.namespace else job.name
+        output  = CapturedOutput(PrefixedStream("{0} {1}".format(address, job.name)), self.max_lines)
+        started = time()
+
+        logger.info("running job {0} on {1}.".format(job.name, address))
+        try:
+            exit_code = container_ship.run_container(alias, job.image, job.command, job.env, output)
+            job.error = None
+        except Exception as e:
+            logger.error("job {0} couldn't be run on {1}: {2}".format(job.name, address, e))
+            exit_code = None
+            job.error = e
+        finally:
+            output.close()
+
+        job.attempts.append(JobAttempt(address, exit_code, time() - started))
+        job.output = list(output.lines)
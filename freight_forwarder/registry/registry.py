@@ -8,6 +8,12 @@ from freight_forwarder.utils import logger
 from .registry_base          import RegistryBase
 from .exceptions             import RegistryException
 
+MANIFEST_MEDIA_TYPES = (
+    'application/vnd.docker.distribution.manifest.v2+json',
+    'application/vnd.docker.distribution.manifest.list.v2+json',
+    'application/vnd.docker.distribution.manifest.v1+prettyjws'
+)
+
 
 def Registry(address='https://index.docker.io', **kwargs):
     """
@@ -127,14 +133,53 @@ class V2(RegistryBase):
     def __init__(self, address='https://index.docker.io', **kwargs):
         super(V2, self).__init__('v2', address, **kwargs)
 
-    def blobs(self):
-        pass
+    def blobs(self, image_name, digest, method='HEAD'):
+        """ Request a layer blob.
+
+        :param image_name: A :string:, "namespace/repository".
+        :param digest: A :string:, the blob's content digest.
+        :param method: A :string:, HEAD to check that the blob exists or GET to download it.
+        :return requests.Response:
+        """
+        self._validate_image_name(image_name)
+
+        response = self._request_builder(method, '{0}/blobs/{1}'.format(image_name, digest))
+        self._validate_response(response)
+
+        return response
 
     def catalog(self, count=None, last=None):
         pass
 
-    def manifests(self):
-        pass
+    def manifests(self, image_name, reference='latest', method='GET'):
+        """ Request an image manifest.
+
+        :param image_name: A :string:, "namespace/repository".
+        :param reference: A :string:, tag or digest of the manifest.
+        :param method: A :string:, HEAD to only fetch the headers or GET to fetch the manifest as well.
+        :return requests.Response:
+        """
+        self._validate_image_name(image_name)
+
+        response = self._request_builder(
+            method,
+            '{0}/manifests/{1}'.format(image_name, reference),
+            headers={'Accept': ', '.join(MANIFEST_MEDIA_TYPES)}
+        )
+        self._validate_response(response)
+
+        return response
+
+    def manifest_digest(self, image_name, reference='latest'):
+        """ Resolve a tag to the content digest of its manifest without downloading the manifest.
+
+        :param image_name: A :string:, "namespace/repository".
+        :param reference: A :string:, tag of the manifest.
+        :return string: "sha256:..." or None when the registry doesn't return a digest.
+        """
+        response = self.manifests(image_name, reference, method='HEAD')
+
+        return response.headers.get('Docker-Content-Digest')
 
     def ping(self):
         return self._validate_response(response=self._request_builder('GET', ''))
@@ -162,13 +207,7 @@ class V2(RegistryBase):
                         yield repository_name
 
     def tags(self, image_name):
-        if not isinstance(image_name, six.string_types):
-            raise TypeError('image_name must be a str. {0} was passed.'.format(type(image_name).__name__))
-
-        if '/' not in image_name:
-            raise AttributeError(
-                'image_name must be in the following format: \"namespace/repository\". {0} was passed.'.format(image_name)
-            )
+        self._validate_image_name(image_name)
 
         response = self._request_builder('GET', '{0}/tags/list'.format(image_name))
         if self._validate_response(response):
@@ -176,3 +215,16 @@ class V2(RegistryBase):
 
         for tag in response.get('tags'):
             yield '{0}:{1}'.format(image_name, tag)
+
+    ##
+    # private methods
+    ##
+    @staticmethod
+    def _validate_image_name(image_name):
+        if not isinstance(image_name, six.string_types):
+            raise TypeError('image_name must be a str. {0} was passed.'.format(type(image_name).__name__))
+
+        if '/' not in image_name:
+            raise AttributeError(
+                'image_name must be in the following format: \"namespace/repository\". {0} was passed.'.format(image_name)
+            )
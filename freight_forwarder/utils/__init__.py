@@ -15,6 +15,9 @@ from .utils import(
     normalize_keys,
     normalize_value,
     capitalize_keys,
+    parallel_map,
+    BackgroundWorker,
     parse_stream,
+    PrefixedStream,
     DockerStreamException
 )
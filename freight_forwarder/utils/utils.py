@@ -3,12 +3,15 @@ from __future__ import unicode_literals
 import json
 import os
 import re
+import threading
 from time import sleep
 from sys  import stdout
 
 import six
-from ipaddress import IPv4Address
-from functools import wraps
+from six.moves            import queue
+from ipaddress            import IPv4Address
+from functools            import wraps
+from multiprocessing.pool import ThreadPool
 
 
 from . import logger
@@ -156,14 +159,175 @@ def retry(f):
     return wrapped_f
 
 
-def parse_stream(response):
+def parallel_map(callback, items, max_workers=None):
+    """
+    call callback for each item using a pool of threads and return the results in the same order as items.
+
+    the first exception raised by callback is re-raised once every item has been processed.  When max_workers is 1
+    or there is only one item callback is called in the current thread.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    if max_workers is not None and (not isinstance(max_workers, int) or max_workers < 1):
+        raise ValueError("max_workers must be an int greater than 0. {0} was passed.".format(max_workers))
+
+    workers = min(len(items), max_workers) if max_workers else len(items)
+    if workers == 1:
+        return [callback(item) for item in items]
+
+    pool = ThreadPool(workers)
+    try:
+        return pool.map(callback, items, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+
+class BackgroundWorker(object):
+    """
+    runs callbacks one after another, in the order they were submitted, on a daemon thread so work that doesn't need to
+    finish before the caller moves on is taken off the critical path.  Call join to wait for everything submitted.
+    When threaded is False callbacks are only queued until run is called, so they can be handed to another process.
+    Failures are logged and kept in failures, they are never raised to the caller.
+    """
+    def __init__(self, name='background-worker', threaded=True):
+        self.name     = name
+        self.threaded = threaded
+        self.failures = []
+        self._queue   = queue.Queue()
+        self._thread  = None
+        self._lock    = threading.Lock()
+
+    @property
+    def pending(self):
+        """
+        number of callbacks submitted that haven't finished.
+        """
+        return self._queue.unfinished_tasks
+
+    def submit(self, description, callback, *args):
+        self._queue.put((description, callback, args))
+
+        if self.threaded:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._work, name=self.name)
+                    self._thread.daemon = True
+                    self._thread.start()
+
+    def run(self):
+        """
+        run every queued callback in the current thread.
+        """
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+            self._call(*item)
+
+    def join(self):
+        """
+        wait for every submitted callback to finish.
+
+        :rtype: A :list: of (description, exception) tuples for the callbacks that failed.
+        """
+        if self._thread is None:
+            self.run()
+        else:
+            self._queue.join()
+
+        return self.failures
+
+    def close(self):
+        """
+        wait for every submitted callback to finish and stop the worker thread, nothing is left running that could hold
+        a lock when the process forks.  Callbacks submitted afterwards start a new thread.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+
+        if thread is not None:
+            self._queue.join()
+            self._queue.put(None)
+            thread.join()
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+
+            self._call(*item)
+
+    def _call(self, description, callback, args):
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.warning("{0} failed: {1}".format(description, e))
+            self.failures.append((description, e))
+        finally:
+            self._queue.task_done()
+
+
+class PrefixedStream(object):
+    """
+    file like object that writes complete lines to stream prefixed with a name.  Used to keep the output of concurrent
+    operations readable.  Text overwritten with a carriage return, like progress bars, is dropped.
+    """
+    _lock = threading.Lock()
+
+    def __init__(self, prefix, stream=None):
+        self.prefix  = prefix
+        self._stream = stream
+        self._buffer = ''
+
+    def write(self, data):
+        if isinstance(data, six.binary_type):
+            data = data.decode('utf-8', 'replace')
+
+        self._buffer += data
+        lines = self._buffer.split('\n')
+        # only the text after the last carriage return is ever displayed.
+        self._buffer = lines.pop().rsplit('\r', 1)[-1]
+
+        self._write_lines(lines)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self._buffer:
+            self._write_lines([self._buffer])
+            self._buffer = ''
+
+    def _write_lines(self, lines):
+        lines = [line.rsplit('\r', 1)[-1] for line in lines]
+        lines = [line for line in lines if line.strip()]
+        if not lines:
+            return
+
+        stream = self._stream if self._stream is not None else stdout
+        with self._lock:
+            for line in lines:
+                stream.write("[{0}] {1}\n".format(self.prefix, line))
+            stream.flush()
+
+
+def parse_stream(response, stream=None):
     """
     take stream from docker-py lib and display it to the user.
 
     this also builds a stream list and returns it.
+
+    :param stream: file like object to write to. defaults to stdout.
     """
     stream_data = []
-    stream = stdout
+    stream = stream if stream is not None else stdout
 
     for data in response:
         if data:
@@ -224,9 +388,10 @@ def find_key(key, var):
                         yield result
 
 
-def normalize_keys(suspect, snake_case=True):
+def normalize_keys(suspect, snake_case=True, preserve=()):
     """
-    take a dict and turn all of its type string keys into snake_case
+    take a dict and turn all of its type string keys into snake_case.  The keys of dicts stored under a key in
+    preserve, environment variable names for example, are left as they are.
     """
     if not isinstance(suspect, dict):
         raise TypeError('you must pass a dict.')
@@ -242,12 +407,14 @@ def normalize_keys(suspect, snake_case=True):
             new_key = key.lower()
 
         value = suspect.pop(key)
-        if isinstance(value, dict):
-            suspect[new_key] = normalize_keys(value, snake_case)
+        if isinstance(value, dict) and new_key in preserve:
+            suspect[new_key] = value
+        elif isinstance(value, dict):
+            suspect[new_key] = normalize_keys(value, snake_case, preserve)
         elif isinstance(value, list):
             for i in range(0, len(value)):
                 if isinstance(value[i], dict):
-                    normalize_keys(value[i], snake_case)
+                    normalize_keys(value[i], snake_case, preserve)
 
             suspect[new_key] = value
         else:
@@ -21,7 +21,5 @@ class ContainerFactory(factory.Factory):
     created_at       = dateutil.parser.parse('2016-01-01T14:51:42.041847+02:00', ignoretz=True)
     client           = DockerClientFactory
     transcribe       = False
-    transcribe_queue = None
-    transcribe_proc  = None
     config           = ConfigFactory
     host_config      = HostConfigFactory
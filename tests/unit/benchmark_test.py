@@ -0,0 +1,105 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals, absolute_import
+import os
+import shutil
+import tempfile
+
+from tests import unittest
+
+from freight_forwarder.commercial_invoice.benchmark import (
+    Benchmark,
+    Regression,
+    load_baseline,
+    parse_metrics,
+    write_baseline
+)
+
+
+class BenchmarkTest(unittest.TestCase):
+    def test_init(self):
+        benchmark = Benchmark(image='team/app-bench:1.0', env={'DURATION': '30'}, tolerances={'latency_p99': 5})
+
+        self.assertEqual(benchmark.image, 'team/app-bench:1.0')
+        self.assertIsNone(benchmark.dockerfile)
+        self.assertEqual(benchmark.tolerance, 10)
+        self.assertEqual(benchmark.higher_is_better, [])
+
+        dockerfile = tempfile.NamedTemporaryFile()
+        self.addCleanup(dockerfile.close)
+        self.assertEqual(Benchmark(dockerfile=dockerfile.name).dockerfile, os.path.abspath(dockerfile.name))
+
+    def test_init_failure(self):
+        with self.assertRaises(TypeError):
+            Benchmark()
+
+        with self.assertRaises(TypeError):
+            Benchmark(image='team/app-bench:1.0', dockerfile='Dockerfile.bench')
+
+        with self.assertRaises(OSError):
+            Benchmark(dockerfile='/does/not/exist/Dockerfile.bench')
+
+        with self.assertRaises(TypeError):
+            Benchmark(image='team/app-bench:1.0', command={'cmd': 'bench'})
+
+        with self.assertRaises(TypeError):
+            Benchmark(image='team/app-bench:1.0', tolerance=-1)
+
+        with self.assertRaises(TypeError):
+            Benchmark(image='team/app-bench:1.0', tolerances={'latency_p99': '5%'})
+
+        with self.assertRaises(TypeError):
+            Benchmark(image='team/app-bench:1.0', higher_is_better='requests_per_second')
+
+    def test_compare(self):
+        benchmark = Benchmark(
+            image='team/app-bench:1.0',
+            tolerances={'latency_p99': 5},
+            higher_is_better=['requests_per_second']
+        )
+        baseline = {'latency_p50': 10, 'latency_p99': 100, 'requests_per_second': 2000, 'errors': 0}
+
+        self.assertEqual(benchmark.compare({'latency_p50': 11, 'latency_p99': 105, 'requests_per_second': 1800, 'errors': 0}, baseline), [])
+
+        regressions = benchmark.compare({'latency_p50': 9, 'latency_p99': 106, 'requests_per_second': 1799, 'new': 1}, baseline)
+        self.assertEqual(regressions, [
+            Regression('errors', 0, None, 10),
+            Regression('latency_p99', 100, 106, 5),
+            Regression('requests_per_second', 2000, 1799, 10)
+        ])
+
+        # a baseline of zero allows no increase.
+        self.assertEqual(benchmark.compare({'errors': 1}, {'errors': 0}), [Regression('errors', 0, 1, 10)])
+
+    def test_parse_metrics(self):
+        lines = [
+            'warming up',
+            '{"latency_p99": 12.5, "requests_per_second": 2000, "host": "app-01", "ok": true}',
+            'done'
+        ]
+        self.assertEqual(parse_metrics(lines), {'latency_p99': 12.5, 'requests_per_second': 2000})
+
+        # the last object printed wins.
+        self.assertEqual(parse_metrics(lines + ['{"latency_p99": 11}', '{not json}']), {'latency_p99': 11})
+
+        with self.assertRaises(ValueError):
+            parse_metrics(['done', '{"status": "ok"}', '[1, 2]'])
+
+    def test_baseline(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        baseline = os.path.join(path, 'benchmarks', 'team-app.json')
+
+        self.assertIsNone(load_baseline(baseline))
+
+        write_baseline(baseline, {'latency_p99': 12.5})
+        self.assertEqual(load_baseline(baseline), {'latency_p99': 12.5})
+
+        # baselines passed as files may hold just the metrics.
+        with open(baseline, 'w') as baseline_file:
+            baseline_file.write('{"latency_p99": 10}')
+        self.assertEqual(load_baseline(baseline), {'latency_p99': 10})
+
+        with open(baseline, 'w') as baseline_file:
+            baseline_file.write('[10]')
+        with self.assertRaises(ValueError):
+            load_baseline(baseline)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals, absolute_import
+import os
+import shutil
+import tarfile
+import tempfile
+
+from tests import unittest
+
+from freight_forwarder.build_context import BuildContext
+
+
+class BuildContextTest(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.write('Dockerfile', 'FROM scratch\n')
+        self.write('app.py', 'print("hello")\n')
+        self.write('.git/HEAD', 'ref: refs/heads/master\n')
+        self.write('node_modules/left-pad/index.js', 'module.exports = null;\n')
+        self.write('logs/debug.log', 'debug\n')
+        self.write('logs/keep.log', 'keep\n')
+        self.write('src/nested/build.pyc', '')
+        self.write('.dockerignore', '# comment\n.git\nnode_modules\nlogs/*.log\n!logs/keep.log\n**/*.pyc\nDockerfile\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def write(self, relative_path, content):
+        path = os.path.join(self.path, relative_path)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+
+        with open(path, 'w') as f:
+            f.write(content)
+
+    def test_files(self):
+        files = list(BuildContext(self.path).files())
+
+        self.assertEqual(
+            sorted(files),
+            ['.dockerignore', 'Dockerfile', 'app.py', 'logs', 'logs/keep.log', 'src', 'src/nested']
+        )
+
+    def test_archive(self):
+        build_context = BuildContext(self.path, os.path.join(self.path, 'Dockerfile'))
+        archive = build_context.archive()
+
+        try:
+            with tarfile.open(fileobj=archive, mode='r') as tar:
+                names = tar.getnames()
+        finally:
+            archive.close()
+
+        self.assertIn('app.py', names)
+        self.assertNotIn('.git/HEAD', names)
+        self.assertEqual(build_context.file_count, 4)
+        self.assertEqual(build_context.docker_file, 'Dockerfile')
+        self.assertGreater(build_context.size, 0)
+
+    def test_digest(self):
+        build_context = BuildContext(self.path)
+        build_context.archive().close()
+        digest = build_context.digest
+
+        # excluded files don't change the digest.
+        self.write('logs/debug.log', 'more debug\n')
+        build_context.archive().close()
+        self.assertEqual(build_context.digest, digest)
+
+        self.write('app.py', 'print("goodbye")\n')
+        build_context.archive().close()
+        self.assertNotEqual(build_context.digest, digest)
+
+        # checksum matches the digest computed while archiving.
+        self.assertEqual(BuildContext(self.path).checksum(), build_context.digest)
+
+    def test_failure(self):
+        with self.assertRaises(TypeError):
+            BuildContext(os.path.join(self.path, 'missing'))
+
+        with self.assertRaises(ValueError):
+            BuildContext(os.path.join(self.path, 'src'), os.path.join(self.path, 'Dockerfile'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals, absolute_import
+import os
+import shutil
+import tempfile
+
+from tests import unittest, mock
+
+from freight_forwarder.build_planner import BuildPlan, base_images, parse_docker_file
+
+BASE = 'FROM python:2.7\nRUN apt-get update && \\\n    apt-get install -y libpq-dev\nCOPY requirements.txt /app/\n'
+
+
+class BuildPlannerTest(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def create_service(self, name, docker_file):
+        path = os.path.join(self.path, name)
+        os.makedirs(path)
+        with open(os.path.join(path, 'Dockerfile'), 'w') as f:
+            f.write(docker_file)
+
+        service = mock.Mock(docker_file=path)
+        service.alias = name
+
+        return service
+
+    def test_parse_docker_file(self):
+        service = self.create_service('api', '# comment\n\nfrom  python:2.7\nRUN apt-get update && \\\n# inline\n    apt-get install -y   curl\n')
+
+        self.assertEqual(
+            parse_docker_file(os.path.join(service.docker_file, 'Dockerfile')),
+            ['FROM python:2.7', 'RUN apt-get update && apt-get install -y curl']
+        )
+
+    def test_base_images(self):
+        instructions = [
+            'FROM golang:1.6 AS builder',
+            'RUN make',
+            'FROM builder',
+            'FROM ${BASE}',
+            'FROM scratch',
+            'FROM alpine:3.3',
+            'FROM golang:1.6',
+        ]
+
+        self.assertEqual(base_images(instructions), ['golang:1.6', 'alpine:3.3'])
+
+    def test_plan(self):
+        api = self.create_service('api', BASE + 'CMD ["api"]\n')
+        worker = self.create_service('worker', BASE + 'CMD ["worker"]\n')
+        admin = self.create_service('admin', 'FROM python:2.7\nRUN pip install django\n')
+        cache = self.create_service('cache', 'FROM redis:3\n')
+
+        plan = BuildPlan([api, worker, admin, cache])
+
+        self.assertEqual(sorted(service.alias for service in plan.representatives), ['admin', 'api', 'cache'])
+        self.assertEqual([service.alias for service in plan.followers], ['worker'])
+        self.assertEqual(plan.shared_instructions(worker), 2)
+        self.assertEqual(plan.shared_instructions(api), 0)
+        self.assertIn('  then worker: 2 of 3 instructions expected from cache', plan.report())
+
+    def test_waves(self):
+        base = self.create_service('base', 'FROM python:2.7\nRUN pip install flask\n')
+        app = self.create_service('app', 'FROM itops/project-base:latest\nRUN make\nCMD ["app"]\n')
+        worker = self.create_service('worker', 'FROM itops/project-base:latest\nRUN make\nCMD ["worker"]\n')
+        cache = self.create_service('cache', 'FROM redis:3\n')
+        for service in (base, app, worker, cache):
+            service.repository = 'itops'
+            service.namespace = 'project-{0}'.format(service.alias)
+
+        plan = BuildPlan([worker, app, cache, base])
+
+        # services built FROM base wait for it, the follower waits for its representative.
+        self.assertEqual([[service.alias for service in wave] for wave in plan.waves], [['base', 'cache'], ['app'], ['worker']])
+        self.assertIn('app (FROM itops/project-base:latest), after base', plan.report())
+        self.assertIn('  then worker: 1 of 2 instructions shared, the layer cache is disabled', plan.report(False))
+
+    def test_plan_unparsable_docker_file(self):
+        service = mock.Mock(docker_file=os.path.join(self.path, 'missing'))
+        service.alias = 'missing'
+
+        plan = BuildPlan([service])
+
+        self.assertEqual(plan.representatives, [service])
+        self.assertEqual(plan.followers, [])
+        self.assertEqual(plan.waves, [[service]])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,7 @@ from tests import unittest, mock
 from mock import call
 from freight_forwarder.commercial_invoice import CommercialInvoice
 from freight_forwarder.freight_forwarder  import FreightForwarder
+from freight_forwarder.registry           import V2
 
 
 class CommercialInvoiceConstructorTest(unittest.TestCase):
@@ -64,6 +65,117 @@ class CommercialInvoiceConstructorTest(unittest.TestCase):
         self.assertEqual(commercial_invoice.tags, [])
         self.assertEqual(commercial_invoice._tagging_scheme, True)
 
+    @mock.patch('freight_forwarder.commercial_invoice.commercial_invoice.subprocess')
+    @mock.patch.object(CommercialInvoice, '_create_registries', autospec=True)
+    @mock.patch.object(CommercialInvoice, '_create_container_ships', autospec=True)
+    def test_create_labels(self, mocked_create_container_ships, mocked_create_registries, mock_subprocess):
+        mock_subprocess.check_output.return_value = b'1a2b3c\n'
+        commercial_invoice = CommercialInvoice(
+            'power_rangers',
+            'mighty_morphing',
+            self.services,
+            self.hosts,
+            'app',
+            'quality_control',
+            'development',
+            'local',
+            self.registries
+        )
+
+        # built services are labeled with their build context digest when they are built.
+        labels = commercial_invoice._create_labels('app', self.services['app'])
+        self.assertEqual(labels['com.freight-forwarder.git_sha'], '1a2b3c')
+        self.assertNotIn('com.freight-forwarder.version', labels)
+
+        labels = commercial_invoice._create_labels('redis', self.services['redis'])
+        self.assertEqual(labels['com.freight-forwarder.version'], 'docker_hub/library/redis:latest')
+
+        # git is only inspected once per invoice.
+        commercial_invoice._create_labels('app', self.services['app'])
+        self.assertEqual(mock_subprocess.check_output.call_count, 1)
+
+    @mock.patch.object(CommercialInvoice, '_create_registries', autospec=True)
+    @mock.patch.object(CommercialInvoice, '_create_container_ships', autospec=True)
+    def test_resolve_digest(self, mocked_create_container_ships, mocked_create_registries):
+        commercial_invoice = CommercialInvoice(
+            'power_rangers',
+            'mighty_morphing',
+            self.services,
+            self.hosts,
+            'app',
+            'deploy',
+            'development',
+            'local',
+            self.registries
+        )
+        registry = mock.Mock(spec=V2, location='development-registry.com')
+        registry.manifest_digest.return_value = 'sha256:abc'
+        service = mock.Mock(repository='library', namespace='redis', source_tag='latest', source_registry=registry)
+
+        self.assertEqual(commercial_invoice.resolve_digest(service), 'sha256:abc')
+        self.assertEqual(commercial_invoice.resolve_digest(service), 'sha256:abc')
+        registry.manifest_digest.assert_called_once_with('library/redis', 'latest')
+
+        # the tag moving in the registry doesn't change what the invoice deploys.
+        registry.manifest_digest.return_value = 'sha256:def'
+        self.assertEqual(commercial_invoice.resolve_digest(service), 'sha256:abc')
+
+        service.source_tag = '3.0'
+        registry.manifest_digest.side_effect = Exception('unauthorized')
+        self.assertIsNone(commercial_invoice.resolve_digest(service))
+
+    @mock.patch.object(CommercialInvoice, '_create_registries', autospec=True)
+    @mock.patch.object(CommercialInvoice, '_create_container_ships', autospec=True)
+    def test_pin_source_digests(self, mocked_create_container_ships, mocked_create_registries):
+        commercial_invoice = CommercialInvoice(
+            'power_rangers',
+            'mighty_morphing',
+            self.services,
+            self.hosts,
+            'app',
+            'deploy',
+            'development',
+            'local',
+            self.registries
+        )
+        registry = mock.Mock(spec=V2, location='development-registry.com')
+        registry.manifest_digest.return_value = 'sha256:abc'
+        dependency = mock.Mock(repository='library', namespace='redis', source_tag='latest', source_registry=registry,
+                               source_digest=None, dependencies={})
+        service = mock.Mock(source_registry=None, source_digest=None, dependencies={'redis': dependency})
+
+        commercial_invoice.pin_source_digests(service)
+
+        self.assertIsNone(service.source_digest)
+        self.assertEqual(dependency.source_digest, 'sha256:abc')
+
+
+    def test_validate_replica_ports(self):
+        def service(alias, replicas, port_bindings):
+            return mock.Mock(alias=alias, replicas=replicas, host_config=mock.Mock(port_bindings=port_bindings))
+
+        api   = service('api', 3, {'80/tcp': [{'host_port': '8080', 'host_ip': ''}]})
+        admin = service('admin', 1, {'80/tcp': [{'host_port': '8083', 'host_ip': ''}]})
+        redis = service('redis', 1, {'6379/tcp': [{'host_port': '', 'host_ip': ''}]})
+        CommercialInvoice._validate_replica_ports({'api': api, 'admin': admin, 'redis': redis})
+
+        # admin binds 8082, the port api's third replica is offset to.
+        admin.host_config.port_bindings = {'80/tcp': [{'host_port': '8082', 'host_ip': '0.0.0.0'}]}
+        with self.assertRaises(ValueError):
+            CommercialInvoice._validate_replica_ports({'api': api, 'admin': admin})
+
+        # a different protocol or host ip doesn't clash.
+        admin.host_config.port_bindings = {'80/udp': [{'host_port': '8082', 'host_ip': ''}]}
+        CommercialInvoice._validate_replica_ports({'api': api, 'admin': admin})
+
+        api.host_config.port_bindings   = {'80/tcp': [{'host_port': '8080', 'host_ip': '10.0.0.1'}]}
+        admin.host_config.port_bindings = {'80/tcp': [{'host_port': '8082', 'host_ip': '10.0.0.2'}]}
+        CommercialInvoice._validate_replica_ports({'api': api, 'admin': admin})
+
+        api.host_config.port_bindings = {'80/tcp': [{'host_port': '65534', 'host_ip': ''}]}
+        with self.assertRaises(ValueError):
+            CommercialInvoice._validate_replica_ports({'api': api})
+
 
 class CommercialInvoiceInjectorTest(unittest.TestCase):
 
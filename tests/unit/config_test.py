@@ -266,3 +266,55 @@ class ConfigTest(unittest.TestCase):
         self.assertEquals(config.project, 'docker-example')
         self.assertEquals(config.project, config.get('project'))
         self.assertIsInstance(config.project, ConfigUnicode)
+
+    @mock.patch('freight_forwarder.config.os.getcwd', create=True)
+    def test_benchmark_env_dict(self, mocked_os):
+        mocked_os.return_value = self.temp_dir
+        with open(os.path.join(self.temp_dir, 'freight-forwarder.yml'), 'a') as config:
+            config.write(
+                """
+                couchdb:
+                  build: "./"
+                  benchmark:
+                    image: "registry_alias/itops/cia-couchdb-bench:latest"
+                    env:
+                      DURATION: "30"
+                    tolerance: 10
+                    tolerances:
+                      latency_p99: 5
+                    higher_is_better:
+                      - requests_per_second
+          """
+            )
+
+        config = Config()
+        config.validate()
+
+        benchmark = config._data['couchdb']['benchmark']
+        self.assertEquals(benchmark['env'], {'DURATION': '30'})
+        self.assertEquals(benchmark['tolerances'], {'latency_p99': 5})
+
+    @mock.patch('freight_forwarder.config.os.getcwd', create=True)
+    def test_fractional_readiness_interval(self, mocked_os):
+        mocked_os.return_value = self.temp_dir
+        with open(os.path.join(self.temp_dir, 'freight-forwarder.yml'), 'a') as config:
+            config.write(
+                """
+                couchdb:
+                  build: "./"
+                  readiness:
+                    type: http
+                    port: 5984
+                    path: /_up
+                    interval: 0.5
+                    timeout: 1.5
+          """
+            )
+
+        config = Config()
+        config.validate()
+
+        readiness = config._data['couchdb']['readiness']
+        self.assertIsInstance(readiness['interval'], float)
+        self.assertEquals(readiness['interval'], 0.5)
+        self.assertEquals(readiness['timeout'], 1.5)
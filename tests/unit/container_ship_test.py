@@ -1,5 +1,10 @@
 # -*- coding: utf-8; -*-
 from __future__ import unicode_literals, absolute_import
+import os
+import shutil
+import tempfile
+
+import docker
 
 from tests import unittest, mock
 from tests.factories.injector_factory import InjectorFactory
@@ -7,7 +12,16 @@ from tests.factories.injector_factory import InjectorFactory
 from freight_forwarder.container.config import Config
 from freight_forwarder.container_ship import ContainerShip
 from freight_forwarder.container_ship import Injector
+from freight_forwarder.commercial_invoice.benchmark import Benchmark
 from freight_forwarder.commercial_invoice.service import Service
+from freight_forwarder.registry import V2
+
+
+def create_cargo(id, parent):
+    cargo = mock.Mock(id=id)
+    cargo.parent = parent
+
+    return cargo
 
 
 class ContainerShipTest(unittest.TestCase):
@@ -179,6 +193,169 @@ class ContainerShipTest(unittest.TestCase):
         container_ship.offload_project(team='foo', project='bar')
         self.assertIsInstance(container_ship, ContainerShip)
 
+    def test_offload(self):
+        container = mock.Mock(id='c1')
+        container.name = 'foo-bar-01'
+        broken_container = mock.Mock(id='c2')
+        broken_container.name = 'foo-bar-02'
+        broken_container.delete.side_effect = Exception('boom')
+
+        calls = []
+        parent = create_cargo('parent', '')
+        child = create_cargo('child', 'parent')
+        for cargo in (parent, child):
+            cargo.delete.side_effect = lambda force, cargo=cargo: calls.append(cargo.id) or True
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        summary = container_ship.offload(containers=[container, broken_container], cargoes=[parent, child], force=True)
+
+        self.assertEqual(summary['containers'], {'removed': ['foo-bar-01'], 'failed': ['foo-bar-02']})
+        self.assertEqual(summary['cargoes'], {'removed': ['child', 'parent'], 'failed': []})
+        self.assertEqual(calls, ['child', 'parent'])
+        parent.delete.assert_called_once_with(force=True)
+
+    @mock.patch.object(ContainerShip, 'healthy')
+    @mock.patch.object(ContainerShip, 'find_service_containers')
+    @mock.patch.object(ContainerShip, '_load_service_cargo')
+    def test_load_service_cargoes(self, mock_load_service_cargo, mock_find_service_containers, mock_healthy):
+        def create_service(name, docker_file='./Dockerfile', cargo=None):
+            service = mock.Mock(spec=Service)
+            service.name = name
+            service.alias = 'team-project-{0}'.format(name)
+            service.docker_file = docker_file
+            service.cargo = cargo
+            service.containers = {}
+            service.dependencies = {}
+            service.dependents = {}
+
+            return service
+
+        app = create_service('app')
+        api = create_service('api')
+        db = create_service('db', docker_file=None)
+        running = create_service('running')
+        worker = create_service('worker')
+        app.dependencies = {'api': api, 'db': db, 'running': running}
+        app.dependents = {'worker': worker}
+        mock_find_service_containers.side_effect = lambda service: {'01': True} if service is running else {}
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        built = container_ship.load_service_cargoes(app, configs=True, use_cache=True, dependents=False)
+
+        self.assertEqual(sorted(service.name for service in built), ['api', 'app'])
+        mock_load_service_cargo.assert_any_call(app, True, True, mock.ANY, mock.ANY)
+        mock_load_service_cargo.assert_any_call(api, None, True, mock.ANY, mock.ANY)
+        self.assertEqual(mock_load_service_cargo.call_count, 2)
+
+    @mock.patch.object(ContainerShip, 'healthy')
+    @mock.patch.object(ContainerShip, 'find_service_containers', return_value={})
+    @mock.patch.object(ContainerShip, '_load_service_cargo')
+    def test_load_service_cargoes_built_from_a_service(self, mock_load_service_cargo, mock_find_service_containers,
+                                                       mock_healthy):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+
+        def create_service(name, docker_file):
+            os.makedirs(os.path.join(path, name))
+            with open(os.path.join(path, name, 'Dockerfile'), 'w') as f:
+                f.write(docker_file)
+
+            service = mock.Mock(spec=Service)
+            service.alias = name
+            service.repository = 'itops'
+            service.namespace = 'project-{0}'.format(name)
+            service.docker_file = os.path.join(path, name)
+            service.cargo = None
+            service.containers = {}
+            service.dependencies = {}
+            service.dependents = {}
+
+            return service
+
+        base = create_service('base', 'FROM python:2.7\nRUN pip install flask\n')
+        app = create_service('app', 'FROM itops/project-base:latest\nCMD ["app"]\n')
+        app.dependencies = {'base': base}
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        container_ship.load_service_cargoes(app, use_cache=False)
+
+        # base is built first and the cache stays disabled even though app is built from it.
+        self.assertEqual(
+            mock_load_service_cargo.call_args_list,
+            [mock.call(base, None, False, mock.ANY, mock.ANY), mock.call(app, None, False, mock.ANY, mock.ANY)]
+        )
+
+    @mock.patch.object(ContainerShip, '_request_auth')
+    def test_authenticate_registries(self, mock_request_auth):
+        source = mock.Mock(location='registry.example.com')
+        destination = mock.Mock(location='cache.example.com')
+        public = mock.Mock(location='index.docker.io', auth=None)
+        app = mock.Mock(spec=Service, source_registry=None, destination_registry=destination)
+        api = mock.Mock(spec=Service, source_registry=source, destination_registry=destination)
+        db = mock.Mock(spec=Service, source_registry=public, destination_registry=public)
+
+        def request_auth(registry):
+            if registry is not source:
+                raise Exception('denied')
+
+        mock_request_auth.side_effect = request_auth
+        self.mock_urlparse.return_value.scheme = 'http'
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        container_ship._authenticate_registries([app, api, db])
+
+        # every registry is logged in to once, a destination registry failing to log in isn't fatal.
+        self.assertEqual(mock_request_auth.call_args_list, [mock.call(destination), mock.call(source)])
+        self.assertEqual(container_ship._authenticated_registries, set(['registry.example.com', 'cache.example.com']))
+
+        # build threads don't log in again.
+        container_ship._authenticate(source)
+        self.assertEqual(mock_request_auth.call_count, 2)
+
+        container_ship._authenticated_registries = set()
+        with self.assertRaises(Exception):
+            container_ship._authenticate_registries([mock.Mock(spec=Service, source_registry=destination,
+                                                               destination_registry=None)])
+
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        with open(os.path.join(path, 'Dockerfile'), 'w') as f:
+            f.write('FROM python:2.7 AS build\nFROM build\nFROM redis:3\nFROM team/project-app\n')
+
+        self.mock_service.repository = 'team'
+        self.mock_service.namespace = 'project-app'
+        self.mock_service.docker_file = path
+        self.mock_service.test_docker_file = None
+        self.mock_service.source_registry = None
+        self.mock_service.destination_registry = None
+        self.mock_urlparse.return_value.scheme = 'http'
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        client = container_ship._client_session
+
+        def inspect_image(image):
+            if image == 'python:2.7':
+                raise docker.errors.NotFound('not found', mock.Mock(status_code=404))
+
+        client.inspect_image.side_effect = inspect_image
+        pulls = container_ship.prefetch_base_images([self.mock_service])
+
+        self.assertEqual(list(pulls), ['python:2.7'])
+        self.assertTrue(pulls['python:2.7'].wait(5))
+        client.pull.assert_called_once_with('python', tag='2.7', stream=True)
+
+    def test_cargo_removal_order(self):
+        base = create_cargo('base', '')
+        middle = create_cargo('middle', 'base')
+        leaf = create_cargo('leaf', 'middle')
+        other = create_cargo('other', 'unknown')
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        layers = container_ship._cargo_removal_order([base, leaf, other, middle])
+
+        self.assertEqual([sorted(cargo.id for cargo in layer) for layer in layers],
+                         [['leaf', 'other'], ['middle'], ['base']])
+
     def test_offload_service_cargo(self):
         pass
 
@@ -207,6 +384,79 @@ class ContainerShipTest(unittest.TestCase):
         container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
         self.assertTrue(container_ship.start_service_containers(service=self.mock_service, attach=False))
 
+    @mock.patch('freight_forwarder.container_ship.StatsCollector')
+    @mock.patch.object(ContainerShip, 'find_service_containers')
+    def test_start_service_containers_sampling_stats(self, mock_find_service_containers, mock_stats_collector):
+        mock_find_service_containers.return_value = {'foo-bar': self.mock_container}
+        self.mock_container.start.return_value = True
+        self.mock_service.alias = 'bar'
+        self.mock_service.containers = {'foo-bar': self.mock_container}
+        mock_stats_collector.return_value.summary.return_value = {'bar': {'samples': 3}}
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        self.assertEqual(container_ship.stop_sampling_stats(), {})
+
+        collector = container_ship.start_sampling_stats(0.5)
+        self.assertTrue(container_ship.start_service_containers(service=self.mock_service, attach=False))
+
+        mock_stats_collector.assert_called_once_with(self.mock_docker_client.return_value, 0.5)
+        collector.watch.assert_called_once_with(self.mock_container, 'bar')
+        self.assertEqual(container_ship.stop_sampling_stats(), {'bar': {'samples': 3}})
+        collector.close.assert_called_once_with()
+        self.assertIsNone(container_ship.stats_collector)
+
+    @mock.patch.object(ContainerShip, 'find_previous_service_containers')
+    def test_start_service_containers_surge(self, mock_find_previous_service_containers):
+        self.mock_urlparse.return_value.scheme = 'http'
+        calls = mock.Mock()
+        previous = calls.previous
+        previous.state.return_value = {'running': True}
+        new = calls.new
+        new.start.return_value = True
+        mock_find_previous_service_containers.return_value = {'foo-bar-01': previous}
+        self.mock_service.rollout = 'surge'
+        self.mock_service.alias = 'foo-bar'
+        self.mock_service.container_config.detach = True
+        self.mock_service.host_config.port_bindings = {'80/tcp': [{'host_port': '', 'host_ip': ''}]}
+        self.mock_service.containers = {'foo-bar-02': new}
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        self.assertTrue(container_ship.start_service_containers(service=self.mock_service, attach=False))
+
+        self.assertEqual(
+            [name for name, args, kwargs in calls.mock_calls if name in ('new.start', 'previous.stop')],
+            ['new.start', 'previous.stop']
+        )
+
+        # the previous containers keep running when the new ones fail.
+        previous.reset_mock()
+        new.start.return_value = False
+        self.assertFalse(container_ship.start_service_containers(service=self.mock_service, attach=False))
+        self.assertFalse(previous.stop.called)
+
+    @mock.patch.object(ContainerShip, 'find_service_containers')
+    def test_start_service_containers_surge_with_host_ports(self, mock_find_service_containers):
+        self.mock_urlparse.return_value.scheme = 'http'
+        calls = mock.Mock()
+        previous = calls.previous
+        previous.state.return_value = {'running': True}
+        new = calls.new
+        new.start.return_value = True
+        mock_find_service_containers.return_value = {'foo-bar-01': previous}
+        self.mock_service.rollout = 'surge'
+        self.mock_service.alias = 'foo-bar'
+        self.mock_service.container_config.detach = True
+        self.mock_service.host_config.port_bindings = {'80/tcp': [{'host_port': '8080', 'host_ip': ''}]}
+        self.mock_service.containers = {'foo-bar-02': new}
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        self.assertTrue(container_ship.start_service_containers(service=self.mock_service, attach=False))
+
+        self.assertEqual(
+            [name for name, args, kwargs in calls.mock_calls if name in ('new.start', 'previous.stop')],
+            ['previous.stop', 'new.start']
+        )
+
     @mock.patch('freight_forwarder.container_ship.copy')
     @mock.patch.object(ContainerShip, '_update_container_host_config')
     def test_service(self, mock_update_container_host_config, mock_copy):
@@ -253,13 +503,83 @@ class ContainerShipTest(unittest.TestCase):
             )
         )
 
+    def test_cargo_ids(self):
+        current = mock.Mock(id='sha256:' + 'a' * 64, identifier='team/app:1.1', repo_tags=('team/app:1.1', 'team/app:latest'))
+        previous = mock.Mock(id='sha256:' + 'b' * 64, identifier='team/app:1.0', repo_tags=('team/app:1.0',))
+        unused = mock.Mock(id='sha256:' + 'c' * 64, identifier='team/app:0.9', repo_tags=())
+        cargoes = [current, previous, unused]
+
+        # containers reference images by id, short id, repo tag or a name without a tag.
+        self.assertEqual(ContainerShip._cargo_ids(['sha256:' + 'a' * 64], cargoes), set([current.id]))
+        self.assertEqual(ContainerShip._cargo_ids(['b' * 12, None], cargoes), set([previous.id]))
+        self.assertEqual(ContainerShip._cargo_ids(['team/app:1.0', 'team/app'], cargoes), set([current.id, previous.id]))
+        self.assertEqual(ContainerShip._cargo_ids(['team/app:2.0', 'redis'], cargoes), set())
+
     def test_container_registration(self):
-        self.mock_container.find_by_name.return_value = {'foo-bar': self.mock_container}
+        self.mock_docker_client.return_value.containers.return_value = [{'Names': ['/foo-bar']}]
         container_alias = 'foobar'
         container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
         container_name = container_ship._container_registration(alias=container_alias)
         self.assertEqual(container_name, '{0}-01'.format(container_alias))
 
+    def test_reserve_container_names(self):
+        self.mock_urlparse.return_value.scheme = 'http'
+        self.mock_docker_client.return_value.containers.return_value = [
+            {'Names': ['/foobar-01']},
+            {'Names': ['/foobar-03']},
+            {'Names': ['/foobar-test-02']},
+            {'Names': ['/linked/foobar-02', '/foobar-05']}
+        ]
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+
+        self.assertEqual(container_ship._reserve_container_names('foobar', 2), ['foobar-02', 'foobar-04'])
+
+        # reserved names aren't handed out again until they are released.
+        self.assertEqual(container_ship._reserve_container_names('foobar'), ['foobar-06'])
+        container_ship._release_container_names(['foobar-02'])
+        self.assertEqual(container_ship._reserve_container_names('foobar'), ['foobar-02'])
+
+        self.assertEqual(self.mock_docker_client.return_value.containers.call_count, 3)
+
+    def test_reserve_container_names_past_ten(self):
+        self.mock_urlparse.return_value.scheme = 'http'
+        self.mock_docker_client.return_value.containers.return_value = [
+            {'Names': ['/foobar-{0:02d}'.format(index)]} for index in range(1, 11)
+        ]
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+
+        self.assertEqual(container_ship._reserve_container_names('foobar', 2), ['foobar-11', 'foobar-12'])
+
+    def test_create_named_container_conflict(self):
+        self.mock_urlparse.return_value.scheme = 'http'
+        response = mock.Mock(status_code=409)
+        self.mock_container.side_effect = [docker.errors.APIError('Conflict', response), self.mock_container]
+        self.mock_docker_client.return_value.containers.return_value = [{'Names': ['/foobar-01']}]
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        name = container_ship._reserve_container_names('foobar')[0]
+
+        # another client creates foobar-02 before this container ship does.
+        self.mock_docker_client.return_value.containers.return_value = [{'Names': ['/foobar-01']}, {'Names': ['/foobar-02']}]
+        container = container_ship._create_named_container('foobar', name, 'image-id')
+
+        self.assertIs(container, self.mock_container)
+        self.assertEqual(self.mock_container.call_args_list[0][1]['name'], 'foobar-02')
+        self.assertEqual(self.mock_container.call_args_list[1][1]['name'], 'foobar-03')
+        self.assertEqual(container_ship._reserved_names, set())
+
+    def test_create_named_container_error(self):
+        self.mock_urlparse.return_value.scheme = 'http'
+        response = mock.Mock(status_code=500)
+        self.mock_container.side_effect = docker.errors.APIError('Server Error', response)
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        container_ship._reserved_names.add('foobar-01')
+
+        with self.assertRaises(docker.errors.APIError):
+            container_ship._create_named_container('foobar', 'foobar-01', 'image-id')
+
+        self.assertEqual(self.mock_container.call_count, 1)
+        self.assertEqual(container_ship._reserved_names, set())
+
     @mock.patch.object(ContainerShip, 'find_service_containers')
     def test_load_dependency_containers(self, mock_find_service_containers):
         self.mock_service.dependencies = {'foobar-dependency': self.mock_container}
@@ -298,8 +618,426 @@ class ContainerShipTest(unittest.TestCase):
             '{0}/{1}:{2}'.format(self.mock_service.repository, self.mock_service.namespace, self.mock_service.source_tag)
         )
 
-    @mock.patch.object(ContainerShip, '_update_container_host_config')
+    def test_load_service_cargo_skips_pull_when_digest_matches(self):
+        registry = mock.Mock(spec=V2, location='registry.local', auth=None)
+        registry.manifest_digest.return_value = 'sha256:abc'
+        self.mock_service.repository = 'team'
+        self.mock_service.namespace = 'project-app'
+        self.mock_service.source_registry = registry
+        self.mock_service.source_tag = '1.0'
+        self.mock_service.source_digest = None
+        self.mock_service.cargo = None
+        self.mock_urlparse.return_value.scheme = 'http'
+        self.mock_image.return_value.repo_digests = ('registry.local/team/project-app@sha256:abc',)
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        container_ship._load_service_cargo(service=self.mock_service, inject_configs=False)
+
+        registry.manifest_digest.assert_called_once_with('team/project-app', '1.0')
+        self.mock_image.assert_called_once_with(mock.ANY, 'registry.local/team/project-app:1.0')
+        self.assertFalse(self.mock_image.pull.called)
+        self.assertEqual(self.mock_service.cargo, self.mock_image.return_value)
+
+    def test_load_service_cargo_pulls_when_digest_changed(self):
+        registry = mock.Mock(spec=V2, location='registry.local', auth=None)
+        registry.manifest_digest.return_value = 'sha256:def'
+        self.mock_service.repository = 'team'
+        self.mock_service.namespace = 'project-app'
+        self.mock_service.source_registry = registry
+        self.mock_service.source_tag = '1.0'
+        self.mock_service.source_digest = None
+        self.mock_service.cargo = None
+        self.mock_urlparse.return_value.scheme = 'http'
+        self.mock_image.return_value.repo_digests = ('registry.local/team/project-app@sha256:abc',)
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        container_ship._load_service_cargo(service=self.mock_service, inject_configs=False)
+
+        self.mock_image.pull.assert_called_once_with(mock.ANY, registry, 'team/project-app:1.0', output=None)
+
+    def test_load_service_cargo_pulls_when_digest_lookup_fails(self):
+        registry = mock.Mock(spec=V2, location='registry.local', auth=None)
+        registry.manifest_digest.side_effect = Exception('unauthorized')
+        self.mock_service.repository = 'team'
+        self.mock_service.namespace = 'project-app'
+        self.mock_service.source_registry = registry
+        self.mock_service.source_tag = '1.0'
+        self.mock_service.source_digest = None
+        self.mock_service.cargo = None
+        self.mock_urlparse.return_value.scheme = 'http'
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        container_ship._load_service_cargo(service=self.mock_service, inject_configs=False)
+
+        self.assertTrue(self.mock_image.pull.called)
+
+    def test_load_service_cargo_pulls_pinned_digest(self):
+        registry = mock.Mock(spec=V2, location='registry.local', auth=None)
+        self.mock_service.repository = 'team'
+        self.mock_service.namespace = 'project-app'
+        self.mock_service.source_registry = registry
+        self.mock_service.source_tag = '1.0'
+        self.mock_service.source_digest = 'sha256:def'
+        self.mock_service.cargo = None
+        self.mock_urlparse.return_value.scheme = 'http'
+        self.mock_image.return_value.repo_digests = ('registry.local/team/project-app@sha256:abc',)
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        container_ship._load_service_cargo(service=self.mock_service, inject_configs=False)
+
+        self.assertFalse(registry.manifest_digest.called)
+        self.mock_image.pull.assert_called_once_with(mock.ANY, registry, 'team/project-app@sha256:def', output=None)
+        self.mock_image.pull.return_value.tag.assert_called_once_with('registry.local/team/project-app', ['1.0'])
+
+    @mock.patch.object(ContainerShip, '_pull_service_cargo')
+    def test_prefetch_service_cargoes(self, mock_pull_service_cargo):
+        self.mock_urlparse.return_value.scheme = 'http'
+        registry = mock.Mock(auth=None)
+        built = mock.Mock(spec=Service, alias='team-project-app', source_registry=None, dependencies={}, dependents={})
+        database = mock.Mock(spec=Service, alias='team-project-db', source_registry=registry, cargo=None,
+                             repository='library', namespace='postgres', dependents={})
+        database.dependencies = {}
+        database.dependents = {'app': built}
+        service = mock.Mock(spec=Service, alias='team-project-api', source_registry=registry, cargo=None,
+                            repository='team', namespace='project-api', dependents={})
+        service.dependencies = {'db': database}
+
+        def pull(current, repository, output):
+            current.cargo = mock.Mock(identifier=repository)
+        mock_pull_service_cargo.side_effect = pull
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        identifiers = container_ship.prefetch_service_cargoes(service)
+
+        self.assertEqual(identifiers, ['team/project-api', 'library/postgres'])
+        self.assertEqual(mock_pull_service_cargo.call_count, 2)
+
+    @mock.patch.object(ContainerShip, 'find_service_containers')
+    def test_service_log_streams(self, mock_find_service_containers):
+        self.mock_urlparse.return_value.scheme = 'http'
+        container = mock.Mock()
+        container.output.return_value = iter([b'2016-04-12T10:00:01Z one\n2016-04-12', b'T10:00:02Z two\n'])
+        mock_find_service_containers.return_value = {'team-project-app-01': container}
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        streams = container_ship.service_log_streams(self.mock_service, since=100, tail=5)
+
+        self.assertEqual(list(streams), ['team-project-app-01'])
+        self.assertEqual(list(streams['team-project-app-01']), [
+            '2016-04-12T10:00:01Z one', '2016-04-12T10:00:02Z two'
+        ])
+        # the logs of running containers aren't followed so the stream ends.
+        container.output.assert_called_once_with(since=100, tail=5, stream=True, timestamps=True, follow=False)
+
+    @mock.patch('freight_forwarder.container_ship.PrefixedStream')
+    @mock.patch.object(ContainerShip, 'find_service_containers')
+    def test_exec_service_containers(self, mock_find_service_containers, mock_prefixed_stream):
+        self.mock_urlparse.return_value.scheme = 'http'
+        self.mock_urlparse.return_value.geturl.return_value = 'http://127.0.0.1:2376'
+        running, stopped, broken = mock.Mock(), mock.Mock(), mock.Mock()
+        running.state.return_value = {'running': True}
+        running.execute.return_value = 0
+        stopped.state.return_value = {'running': False}
+        broken.state.return_value = {'running': True}
+        broken.execute.side_effect = Exception('exec failed')
+        mock_find_service_containers.return_value = {
+            'team-project-app-01': running,
+            'team-project-app-02': stopped,
+            'team-project-app-03': broken
+        }
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        exit_codes = container_ship.exec_service_containers(self.mock_service, ['uptime'], max_concurrency=2)
+
+        self.assertEqual(exit_codes, {'team-project-app-01': 0, 'team-project-app-03': None})
+        running.execute.assert_called_once_with(['uptime'], mock_prefixed_stream.return_value)
+        self.assertFalse(stopped.execute.called)
+        mock_prefixed_stream.assert_any_call('http://127.0.0.1:2376 team-project-app-01')
+        self.assertEqual(mock_prefixed_stream.return_value.close.call_count, 2)
+
+    @mock.patch.object(ContainerShip, '_create_named_container')
+    @mock.patch.object(ContainerShip, '_container_registration')
+    def test_run_container(self, mock_container_registration, mock_create_named_container):
+        self.mock_urlparse.return_value.scheme = 'http'
+        mock_container_registration.return_value = 'app-job-reindex-01'
+        container = mock_create_named_container.return_value
+        container.output.return_value = iter([b'indexed 10\nindexed', b' 20\n'])
+        container.wait.return_value = 0
+        output = mock.Mock()
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        exit_code = container_ship.run_container('app-job-reindex', 'team/app:1.0', 'bin/reindex', {'A': 'b'}, output)
+
+        self.assertEqual(exit_code, 0)
+        mock_create_named_container.assert_called_once_with(
+            'app-job-reindex',
+            'app-job-reindex-01',
+            'team/app:1.0',
+            container_config={'detach': True, 'cmd': 'bin/reindex', 'env': {'A': 'b'}}
+        )
+        container.start.assert_called_once_with(wait=False)
+        container.output.assert_called_once_with(stream=True, follow=True)
+        self.assertEqual(output.write.call_args_list, [mock.call('indexed 10\n'), mock.call('indexed 20\n')])
+        container.delete.assert_called_once_with(remove_volumes=True)
+
+    @mock.patch.object(ContainerShip, '_request_auth')
+    @mock.patch.object(ContainerShip, '_create_named_container')
     @mock.patch.object(ContainerShip, '_container_registration')
+    def test_run_container_pulls_missing_image(self, mock_container_registration, mock_create_named_container,
+                                               mock_request_auth):
+        self.mock_urlparse.return_value.scheme = 'http'
+        registry = mock.Mock(location='registry.example.com:5000')
+        hub = mock.Mock(location='index.docker.io')
+        container = mock.Mock()
+        container.output.return_value = iter([])
+        container.wait.return_value = 3
+        mock_create_named_container.side_effect = [
+            docker.errors.APIError('No such image', mock.Mock(status_code=404)),
+            container
+        ]
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        container_ship.registries = {'default': hub, 'private': registry}
+        mock_request_auth.side_effect = lambda registry: self.assertFalse(self.mock_docker_client.return_value.pull.called)
+        self.assertEqual(container_ship.run_container('app-job-reindex', 'registry.example.com:5000/team/app:1.0'), 3)
+
+        # the image is pulled with the auth of the invoice registry it comes from.
+        mock_request_auth.assert_called_once_with(registry)
+        self.mock_docker_client.return_value.pull.assert_called_once_with(
+            'registry.example.com:5000/team/app', tag='1.0', stream=True
+        )
+        self.assertEqual(mock_create_named_container.call_count, 2)
+        container.delete.assert_called_once_with(remove_volumes=True)
+
+    @mock.patch('freight_forwarder.container_ship.PrefixedStream')
+    @mock.patch.object(ContainerShip, 'run_container')
+    def test_benchmark_service(self, mock_run_container, mock_prefixed_stream):
+        def run_container(alias, image, command, env, output, host_config):
+            output.write('warming up\n')
+            output.write(b'{"latency_p99": 12.5, "requests_per_second": 2000}\n')
+            return 0
+
+        mock_run_container.side_effect = run_container
+        self.mock_service.alias = 'team-project-app'
+        self.mock_service.benchmark = Benchmark(image='team/app-bench:1.0', command='bench', env={'DURATION': '30'})
+        self.mock_service.containers = {'team-project-app-01': mock.Mock(), 'team-project-app-02': mock.Mock()}
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        metrics = container_ship.benchmark_service(self.mock_service)
+
+        self.assertEqual(metrics, {'latency_p99': 12.5, 'requests_per_second': 2000})
+        mock_run_container.assert_called_once_with(
+            'team-project-app-benchmark',
+            'team/app-bench:1.0',
+            'bench',
+            ['DURATION=30', 'BENCHMARK_TARGETS=team-project-app-01,team-project-app-02'],
+            mock.ANY,
+            host_config={'links': ['team-project-app-01:team-project-app-01', 'team-project-app-02:team-project-app-02']}
+        )
+        mock_prefixed_stream.return_value.close.assert_called_once_with()
+
+        mock_run_container.side_effect = None
+        mock_run_container.return_value = 1
+        with self.assertRaises(RuntimeError):
+            container_ship.benchmark_service(self.mock_service)
+
+        self.mock_service.benchmark = None
+        with self.assertRaises(LookupError):
+            container_ship.benchmark_service(self.mock_service)
+
+    @mock.patch.object(ContainerShip, '_load_service_containers')
+    def test_stage_service_containers(self, mock_load_service_containers):
+        self.mock_urlparse.return_value.scheme = 'http'
+        self.mock_service.containers = {'team-project-app-02': mock.Mock(id='456')}
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        self.assertTrue(container_ship.stage_service_containers(self.mock_service))
+        mock_load_service_containers.assert_called_once_with(self.mock_service, None, False)
+
+        self.mock_service.containers = {'team-project-app-02': mock.Mock(id=None)}
+        self.assertFalse(container_ship.stage_service_containers(self.mock_service))
+
+    @mock.patch.object(ContainerShip, 'find_previous_service_containers')
+    def test_swap_service_containers(self, mock_find_previous_service_containers):
+        self.mock_urlparse.return_value.scheme = 'http'
+        previous = mock.Mock()
+        previous.state.return_value = {'running': True}
+        staged = mock.Mock()
+        mock_find_previous_service_containers.return_value = {'team-project-app-01': previous}
+        self.mock_service.containers = {'team-project-app-02': staged}
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        container_ship.swap_service_containers(self.mock_service)
+
+        previous.stop.assert_called_once_with()
+        staged.start.assert_called_once_with(wait=False)
+
+        self.mock_service.containers = {}
+        with self.assertRaises(AttributeError):
+            container_ship.swap_service_containers(self.mock_service)
+
+    def test_verify_and_discard_service_containers(self):
+        self.mock_urlparse.return_value.scheme = 'http'
+        healthy = mock.Mock()
+        healthy.verify.return_value = True
+        failed = mock.Mock()
+        failed.verify.return_value = False
+        self.mock_service.containers = {'team-project-app-02': healthy}
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        self.assertTrue(container_ship.verify_service_containers(self.mock_service))
+
+        self.mock_service.containers['team-project-app-03'] = failed
+        self.assertFalse(container_ship.verify_service_containers(self.mock_service))
+
+        container_ship.discard_service_containers(self.mock_service)
+        healthy.delete.assert_called_once_with()
+        failed.delete.assert_called_once_with()
+        self.assertEqual(self.mock_service.containers, {})
+
+    def test_load_service_cargo_unchanged_build_context(self):
+        self.mock_service.repository = 'team'
+        self.mock_service.namespace = 'project-app'
+        self.mock_service.source_registry = None
+        self.mock_service.docker_file = './Dockerfile'
+        self.mock_service.context_tag = 'ctx-abc'
+        self.mock_service.cargo = None
+        self.mock_urlparse.return_value.scheme = 'http'
+        cargo = mock.Mock(identifier='team/project-app:ctx-abc')
+        self.mock_image.find_by_name.return_value = cargo
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        container_ship._load_service_cargo(service=self.mock_service, inject_configs=False)
+
+        self.mock_image.find_by_name.assert_called_once_with(mock.ANY, 'team/project-app:ctx-abc')
+        self.assertFalse(self.mock_image.build.called)
+        self.assertEqual(self.mock_service.cargo, cargo)
+
+    @mock.patch('freight_forwarder.container_ship.BuildContext')
+    def test_load_service_cargo_computes_context_digest(self, mock_build_context):
+        mock_build_context.from_docker_file.return_value.checksum.return_value = 'f00d'
+        self.mock_service.repository = 'team'
+        self.mock_service.namespace = 'project-app'
+        self.mock_service.source_registry = None
+        self.mock_service.docker_file = './Dockerfile'
+        self.mock_service.context_digest = None
+        self.mock_service.context_tag = None
+        self.mock_service.container_config.labels = {}
+        self.mock_service.cargo = None
+        self.mock_urlparse.return_value.scheme = 'http'
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        container_ship._load_service_cargo(service=self.mock_service, inject_configs=False)
+
+        self.assertEqual(self.mock_service.context_digest, 'f00d')
+        self.assertEqual(self.mock_service.container_config.labels['com.freight-forwarder.version'], 'f00d')
+
+        # the build context is only read once per Dockerfile.
+        self.mock_service.context_digest = None
+        self.mock_service.cargo = None
+        container_ship._load_service_cargo(service=self.mock_service, inject_configs=False)
+        self.assertEqual(mock_build_context.from_docker_file.return_value.checksum.call_count, 1)
+
+    def test_load_service_cargo_changed_build_context(self):
+        self.mock_service.repository = 'team'
+        self.mock_service.namespace = 'project-app'
+        self.mock_service.source_registry = None
+        self.mock_service.destination_registry = None
+        self.mock_service.docker_file = './Dockerfile'
+        self.mock_service.context_tag = 'ctx-abc'
+        self.mock_service.cargo = None
+        self.mock_urlparse.return_value.scheme = 'http'
+        self.mock_image.find_by_name.return_value = None
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        container_ship._load_service_cargo(service=self.mock_service, inject_configs=False)
+
+        self.mock_image.build.assert_called_once_with(
+            mock.ANY, 'team/project-app', './Dockerfile', use_cache=False, output=None, before_upload=None,
+            cache_from=None
+        )
+        self.mock_image.build.return_value.tag.assert_called_once_with('team/project-app', ['ctx-abc'])
+
+    def test_load_service_cargo_seeds_build_cache(self):
+        self.mock_service.repository = 'team'
+        self.mock_service.namespace = 'project-app'
+        self.mock_service.source_registry = None
+        self.mock_service.destination_registry.auth = None
+        self.mock_service.docker_file = './Dockerfile'
+        self.mock_service.context_tag = None
+        self.mock_service.cargo = None
+        self.mock_urlparse.return_value.scheme = 'http'
+        self.mock_image.pull.side_effect = [
+            Exception('manifest unknown'),
+            mock.Mock(identifier='registry/team/project-app:latest')
+        ]
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        container_ship.cache_from_tags = ['us-east-1-dev-1.0', 'latest']
+        container_ship._load_service_cargo(service=self.mock_service, inject_configs=False)
+
+        self.mock_image.pull.assert_called_with(
+            mock.ANY, self.mock_service.destination_registry, 'team/project-app', tag='latest', output=None
+        )
+        self.mock_image.build.assert_called_once_with(
+            mock.ANY, 'team/project-app', './Dockerfile', use_cache=True, output=None, before_upload=None,
+            cache_from=['registry/team/project-app:latest']
+        )
+
+    def test_load_service_cargo_build_cache_old_api(self):
+        self.mock_service.repository = 'team'
+        self.mock_service.namespace = 'project-app'
+        self.mock_service.source_registry = None
+        self.mock_service.docker_file = './Dockerfile'
+        self.mock_service.context_tag = None
+        self.mock_service.cargo = None
+        self.mock_urlparse.return_value.scheme = 'http'
+        self.mock_image.supports_cache_from.return_value = False
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        container_ship.cache_from_tags = ['latest']
+        container_ship._load_service_cargo(service=self.mock_service, inject_configs=False)
+
+        # the image wouldn't be used as the build cache so it isn't pulled.
+        self.assertFalse(self.mock_image.pull.called)
+        self.assertEqual(self.mock_image.build.call_args[1]['cache_from'], None)
+
+    def test_load_service_cargo_without_build_cache_seed(self):
+        self.mock_service.repository = 'team'
+        self.mock_service.namespace = 'project-app'
+        self.mock_service.source_registry = None
+        self.mock_service.destination_registry.auth = None
+        self.mock_service.docker_file = './Dockerfile'
+        self.mock_service.context_tag = None
+        self.mock_service.cargo = None
+        self.mock_urlparse.return_value.scheme = 'http'
+        self.mock_image.pull.side_effect = Exception('manifest unknown')
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        container_ship.cache_from_tags = ['latest']
+        container_ship._load_service_cargo(service=self.mock_service, inject_configs=False)
+
+        self.assertEqual(self.mock_image.build.call_args[1]['cache_from'], None)
+        self.assertFalse(self.mock_image.build.call_args[1]['use_cache'])
+
+    def test_load_service_cargo_force_build(self):
+        self.mock_service.repository = 'team'
+        self.mock_service.namespace = 'project-app'
+        self.mock_service.source_registry = None
+        self.mock_service.docker_file = './Dockerfile'
+        self.mock_service.context_tag = 'ctx-abc'
+        self.mock_service.cargo = None
+        self.mock_urlparse.return_value.scheme = 'http'
+
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        container_ship.force_build = True
+        container_ship._load_service_cargo(service=self.mock_service, inject_configs=False)
+
+        self.assertFalse(self.mock_image.find_by_name.called)
+        self.assertTrue(self.mock_image.build.called)
+
+    @mock.patch.object(ContainerShip, '_update_container_host_config')
+    @mock.patch.object(ContainerShip, '_reserve_container_names')
     @mock.patch.object(ContainerShip, '_load_dependency_containers')
     @mock.patch.object(ContainerShip, '_load_service_cargo')
     @mock.patch.object(Config, 'to_dict')
@@ -307,17 +1045,137 @@ class ContainerShipTest(unittest.TestCase):
                                      mock_config_to_dict,
                                      mock_load_service_cargo,
                                      mock_load_dependency_containers,
-                                     mock_container_registration,
+                                     mock_reserve_container_names,
                                      mock_update_container_host_config):
-        mock_container_registration.return_value = 'appexample-api-01'
+        mock_reserve_container_names.return_value = ['appexample-api-01']
+        self.mock_container.return_value.name = 'appexample-api-01'
         self.mock_service.containers = {}
         self.mock_service.cargo = self.mock_image
         self.mock_service.alias = 'appexample-api'
+        self.mock_service.replicas = 1
         self.mock_urlparse.return_value.scheme = 'http'
         container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
         container_ship._load_service_containers(service=self.mock_service, configs='', use_cache=False)
         self.assertIn('appexample-api-01', self.mock_service.containers)
 
+    @mock.patch.object(ContainerShip, '_update_container_host_config')
+    @mock.patch.object(ContainerShip, '_load_dependency_containers')
+    @mock.patch.object(ContainerShip, '_load_service_cargo')
+    @mock.patch.object(Config, 'to_dict')
+    def test_load_service_containers_replicas(self,
+                                              mock_config_to_dict,
+                                              mock_load_service_cargo,
+                                              mock_load_dependency_containers,
+                                              mock_update_container_host_config):
+        def create(client, name=None, image=None, **kwargs):
+            container = mock.Mock()
+            container.name = name
+            return container
+
+        self.mock_docker_client.return_value.containers.return_value = [{'Names': ['/appexample-api-02']}]
+        self.mock_container.side_effect = create
+        self.mock_service.containers = {}
+        self.mock_service.cargo = self.mock_image
+        self.mock_service.alias = 'appexample-api'
+        self.mock_service.replicas = 3
+        self.mock_service.host_config.to_dict.return_value = {
+            'port_bindings': {'80/tcp': [{'host_port': '8080', 'host_ip': ''}]}
+        }
+        self.mock_urlparse.return_value.scheme = 'http'
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+        container_ship._load_service_containers(service=self.mock_service, configs='', use_cache=False)
+
+        self.assertEqual(
+            sorted(self.mock_service.containers),
+            ['appexample-api-01', 'appexample-api-03', 'appexample-api-04']
+        )
+        self.assertEqual(container_ship._reserved_names, set())
+        self.assertEqual(self.mock_container.call_count, 3)
+        self.assertEqual(mock_load_service_cargo.call_count, 0)
+
+        host_ports = sorted(
+            call[1]['host_config']['port_bindings']['80/tcp'][0]['host_port']
+            for call in self.mock_container.call_args_list
+        )
+        self.assertEqual(host_ports, ['8080', '8081', '8082'])
+
+    @mock.patch.object(ContainerShip, '_update_container_host_config')
+    @mock.patch.object(ContainerShip, '_load_dependency_containers')
+    @mock.patch.object(ContainerShip, '_load_service_cargo')
+    @mock.patch.object(Config, 'to_dict')
+    def test_load_service_containers_removes_created_replicas(self,
+                                                              mock_config_to_dict,
+                                                              mock_load_service_cargo,
+                                                              mock_load_dependency_containers,
+                                                              mock_update_container_host_config):
+        created = []
+
+        def create(client, name=None, image=None, **kwargs):
+            if name == 'appexample-api-02':
+                raise Exception('port is already allocated')
+
+            container = mock.Mock()
+            container.name = name
+            created.append(container)
+            return container
+
+        self.mock_docker_client.return_value.containers.return_value = []
+        self.mock_container.side_effect = create
+        self.mock_service.containers = {}
+        self.mock_service.cargo = self.mock_image
+        self.mock_service.alias = 'appexample-api'
+        self.mock_service.replicas = 3
+        self.mock_service.host_config.to_dict.return_value = {}
+        self.mock_urlparse.return_value.scheme = 'http'
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+
+        with self.assertRaises(Exception):
+            container_ship._load_service_containers(service=self.mock_service, configs='', use_cache=False)
+
+        self.assertEqual(sorted(container.name for container in created), ['appexample-api-01', 'appexample-api-03'])
+        for container in created:
+            container.delete.assert_called_once_with(remove_volumes=True)
+
+        self.assertEqual(self.mock_service.containers, {})
+        self.assertEqual(container_ship._reserved_names, set())
+
+    @mock.patch.object(ContainerShip, '_update_container_host_config')
+    @mock.patch.object(ContainerShip, '_reserve_container_names')
+    @mock.patch.object(ContainerShip, '_load_dependency_containers')
+    @mock.patch.object(ContainerShip, '_load_service_cargo')
+    def test_load_service_containers_reserves_names_after_loading_cargo(self,
+                                                                        mock_load_service_cargo,
+                                                                        mock_load_dependency_containers,
+                                                                        mock_reserve_container_names,
+                                                                        mock_update_container_host_config):
+        mock_load_service_cargo.side_effect = Exception('build failed')
+        self.mock_service.containers = {}
+        self.mock_service.cargo = None
+        self.mock_service.dependencies = {}
+        self.mock_urlparse.return_value.scheme = 'http'
+        container_ship = ContainerShip(address='http://127.0.0.1:2376', **{})
+
+        with self.assertRaises(Exception):
+            container_ship._load_service_containers(service=self.mock_service, configs='', use_cache=False)
+
+        self.assertFalse(mock_reserve_container_names.called)
+        self.assertEqual(container_ship._reserved_names, set())
+
+    def test_replica_host_config(self):
+        self.mock_service.host_config.to_dict.return_value = {
+            'port_bindings': {
+                '80/tcp': [{'host_port': '8080', 'host_ip': '0.0.0.0'}],
+                '443/tcp': [{'host_port': '', 'host_ip': ''}]
+            }
+        }
+
+        host_config = ContainerShip._replica_host_config(self.mock_service, 2)
+        self.assertEqual(host_config['port_bindings']['80/tcp'], [{'host_port': '8082', 'host_ip': '0.0.0.0'}])
+        self.assertEqual(host_config['port_bindings']['443/tcp'], [{'host_port': '', 'host_ip': ''}])
+
+        host_config = ContainerShip._replica_host_config(self.mock_service, 0)
+        self.assertEqual(host_config['port_bindings']['80/tcp'][0]['host_port'], '8080')
+
     @mock.patch.object(ContainerShip, '_update_volumes_from')
     @mock.patch.object(ContainerShip, '_update_links')
     @mock.patch.object(ContainerShip, '_load_dependency_containers')
@@ -1,14 +1,16 @@
 from __future__ import absolute_import, unicode_literals
 
 import docker
+import six
 import time
 
 from tests import unittest, mock
 from tests.factories.docker_client_factory   import DockerClientFactory
 
-from freight_forwarder.container.config      import Config
-from freight_forwarder.container.container   import Container
-from freight_forwarder.container.host_config import HostConfig
+from freight_forwarder.container.config          import Config
+from freight_forwarder.container.container       import Container
+from freight_forwarder.container.host_config     import HostConfig
+from freight_forwarder.container.readiness_probe import ReadinessProbe
 
 
 class ContainerTest(unittest.TestCase):
@@ -83,8 +85,45 @@ class ContainerTest(unittest.TestCase):
             container.name = 'foo'
             self.assertEqual(container.inspect(), {'state': {'running': True}})
 
-    def test_output(self):
-        pass
+    @mock.patch.object(docker.Client, '_get')
+    def test_output(self, mock_docker_get):
+        with mock.patch.object(Container, '_find_by_id'):
+            container = Container(self.docker_client, name='foo', image='bar', id='123')
+            container.id = '123'
+            with mock.patch.object(docker.Client, '_get_result', return_value=iter([])):
+                container.output(stream=True, timestamps=True)
+                self.assertEqual(mock_docker_get.call_args[1]['params']['follow'], 0)
+
+                container.output(stream=True, follow=True)
+                self.assertEqual(mock_docker_get.call_args[1]['params']['follow'], 1)
+
+    @mock.patch.object(docker.api.ExecApiMixin, 'exec_inspect')
+    @mock.patch.object(docker.api.ExecApiMixin, 'exec_start')
+    @mock.patch.object(docker.api.ExecApiMixin, 'exec_create')
+    def test_execute(self, mock_docker_exec_create, mock_docker_exec_start, mock_docker_exec_inspect):
+        mock_docker_exec_create.return_value = {'Id': 'abc'}
+        mock_docker_exec_start.return_value = iter([b'flushed 12 ', b'keys\ndone\n'])
+        mock_docker_exec_inspect.return_value = {'ExitCode': 3, 'Running': False}
+        output = six.StringIO()
+        with mock.patch.object(Container, '_find_by_id'):
+            container = Container(self.docker_client, name='foo', image='bar', id='123')
+            container.id = '123'
+            container.name = 'foo'
+            self.assertEqual(container.execute(['redis-cli', 'flushall'], output), 3)
+
+        mock_docker_exec_create.assert_called_once_with('123', ['redis-cli', 'flushall'], stdout=True, stderr=True)
+        mock_docker_exec_start.assert_called_once_with('abc', stream=True)
+        self.assertEqual(output.getvalue(), 'flushed 12 keys\ndone\n')
+
+    @mock.patch.object(docker.api.ContainerApiMixin, 'stats')
+    def test_stats(self, mock_docker_container_stats):
+        mock_docker_container_stats.return_value = {'memory_stats': {'usage': 4096}}
+        with mock.patch.object(Container, '_find_by_id'):
+            container = Container(self.docker_client, name='foo', image='bar', id='123')
+            container.id = '123'
+            self.assertEqual(container.stats(), {'memory_stats': {'usage': 4096}})
+
+        mock_docker_container_stats.assert_called_once_with('123', stream=False)
 
     @mock.patch.object(Container, '_wait_for_exit_code')
     @mock.patch.object(docker.api.ContainerApiMixin, 'inspect_container')
@@ -106,19 +145,75 @@ class ContainerTest(unittest.TestCase):
             container.name = 'foo'
             self.assertTrue(container.start())
 
+    @mock.patch.object(Container, '_wait_for_exit_code')
+    @mock.patch.object(docker.api.ContainerApiMixin, 'inspect_container')
+    @mock.patch.object(docker.api.ContainerApiMixin, 'start')
+    def test_start_without_wait(self, mock_docker_container_start, mock_docker_container_inspect, mock_container_wait):
+        mock_docker_container_inspect.return_value = {'state': {'running': False, 'exit_code': 0}}
+        with mock.patch.object(Container, '_find_by_id'):
+            container = Container(self.docker_client, name='foo', image='bar', id='123')
+            container.id = '123'
+            container.name = 'foo'
+            self.assertTrue(container.start(wait=False))
+
+        mock_docker_container_start.assert_called_once_with('123')
+        self.assertFalse(mock_container_wait.called)
+
+    @mock.patch.object(Container, 'state', return_value={'running': True, 'exit_code': 0})
+    @mock.patch.object(Container, '_wait_for_exit_code')
+    def test_verify(self, mock_container_wait, mock_container_state):
+        with mock.patch.object(Container, '_find_by_id'):
+            container = Container(self.docker_client, name='foo', image='bar', id='123')
+
+        mock_container_wait.return_value = 0
+        self.assertTrue(container.verify())
+        mock_container_wait.return_value = None
+        self.assertTrue(container.verify())
+        mock_container_wait.return_value = 137
+        self.assertFalse(container.verify(timer=2))
+        mock_container_wait.assert_called_with(2)
+
+    @mock.patch.object(ReadinessProbe, 'wait', return_value=True)
+    @mock.patch.object(Container, '_wait_for_exit_code')
+    def test_verify_readiness_probe(self, mock_container_wait, mock_probe_wait):
+        readiness_probe = ReadinessProbe('tcp', port=80)
+        with mock.patch.object(Container, '_find_by_id'):
+            container = Container(self.docker_client, name='foo', image='bar', id='123',
+                                  readiness_probe=readiness_probe)
+
+        self.assertTrue(container.verify())
+        mock_probe_wait.assert_called_once_with(container)
+        self.assertFalse(mock_container_wait.called)
+
+    @mock.patch.object(ReadinessProbe, 'wait', return_value=False)
+    @mock.patch.object(Container, 'state', return_value={'running': True, 'health': {'status': 'starting'}})
+    @mock.patch.object(Container, '_wait_for_exit_code')
+    def test_verify_image_healthcheck(self, mock_container_wait, mock_container_state, mock_probe_wait):
+        with mock.patch.object(Container, '_find_by_id'):
+            container = Container(self.docker_client, name='foo', image='bar', id='123')
+
+        self.assertFalse(container.verify())
+        mock_probe_wait.assert_called_once_with(container)
+        self.assertFalse(mock_container_wait.called)
+
+    def test_readiness_probe_failure(self):
+        with self.assertRaises(TypeError):
+            with mock.patch.object(Container, '_find_by_id'):
+                Container(self.docker_client, name='foo', image='bar', id='123', readiness_probe={'type': 'tcp'})
+
     def test_start_failure(self):
         pass
 
-    @mock.patch.object(Container, '_start_recording')
-    def test_start_transcribing(self, mock_container_start_recording):
+    @mock.patch('freight_forwarder.container.container.LogCollector')
+    def test_start_transcribing(self, mock_log_collector):
         with mock.patch.object(Container, '_find_by_id'):
             container = Container(self.docker_client, name='foo', image='bar', id='123')
             container.id = '123'
             container.start_transcribing()
             self.assertTrue(container._transcribe)
-            self.assertIsNotNone(container._transcribe_queue)
-            self.assertIsNotNone(container._transcribe_proc)
-            self.assertTrue(container._transcribe_proc.daemon)
+
+        mock_log_collector.for_client.assert_called_with(self.docker_client)
+        mock_log_collector.for_client.return_value.collect.assert_called_once_with(container)
 
     @mock.patch.object(docker.api.ContainerApiMixin, 'inspect_container')
     def test_state(self, mock_docker_container_inspect):
@@ -164,6 +259,52 @@ class ContainerTest(unittest.TestCase):
     def test_dump_logs(self):
         pass
 
+    @mock.patch('freight_forwarder.container.container.logger')
+    @mock.patch('freight_forwarder.container.container.LogCollector')
+    def test_dump_logs_transcribed(self, mock_log_collector, mock_logger):
+        mock_log_collector.for_client.return_value.drain.return_value = [b'starting\n', b'fail', b'ed\n']
+        with mock.patch.object(Container, '_find_by_id'):
+            container = Container(self.docker_client, name='foo', image='bar', id='123')
+            container.name = 'foo'
+            container._transcribe = True
+            container.dump_logs()
+
+        mock_log_collector.for_client.return_value.drain.assert_called_once_with(container)
+        extra = {'formatter': 'container', 'container': 'foo'}
+        self.assertEqual(mock_logger.error.call_args_list, [
+            mock.call('log dump:', extra=extra),
+            mock.call('starting', extra=extra),
+            mock.call('failed', extra=extra)
+        ])
+
+    @mock.patch('freight_forwarder.container.container.logger')
+    @mock.patch.object(docker.api.ContainerApiMixin, 'logs')
+    def test_dump_logs_streams_to_output(self, mock_docker_container_logs, mock_logger):
+        mock_docker_container_logs.return_value = iter([b'Exception in thread "main"\n', b'\tat Main.main\n'])
+        output = six.StringIO()
+        with mock.patch.object(Container, '_find_by_id'):
+            container = Container(self.docker_client, name='foo', image='bar', id='123')
+            container.id = '123'
+            container.name = 'foo'
+            container.dump_logs(output=output, tail=50)
+
+        mock_docker_container_logs.assert_called_once_with(
+            '123', stdout=True, stderr=True, stream=True, timestamps=False, tail=50, follow=False
+        )
+        self.assertEqual(output.getvalue(), 'Exception in thread "main"\n\tat Main.main\n')
+
+    @mock.patch('freight_forwarder.container.container.logger')
+    @mock.patch.object(docker.Client, '_get')
+    def test_dump_logs_of_running_container_does_not_follow(self, mock_docker_get, mock_logger):
+        with mock.patch.object(Container, '_find_by_id'):
+            container = Container(self.docker_client, name='foo', image='bar', id='123')
+            container.id = '123'
+            container.name = 'foo'
+            with mock.patch.object(docker.Client, '_get_result', return_value=iter([b'waiting\n'])):
+                container.dump_logs(output=six.StringIO())
+
+        self.assertEqual(mock_docker_get.call_args[1]['params']['follow'], 0)
+
     @mock.patch.object(docker.api.ContainerApiMixin, 'containers')
     def test_find_by_name(self, mock_docker_container_containers):
         mock_docker_container_containers.return_value = [{
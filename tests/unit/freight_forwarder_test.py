@@ -1,8 +1,10 @@
 # -*- coding: utf-8; -*-
 from __future__ import absolute_import, unicode_literals
 
+import collections
 import os
-
+import shutil
+import tempfile
 
 from tests import unittest, mock
 from mock import call
@@ -11,6 +13,7 @@ from ..factories.registry_factory import RegistryV1Factory
 
 from freight_forwarder        import FreightForwarder
 from freight_forwarder.config import ConfigDict
+from freight_forwarder.commercial_invoice.benchmark import Benchmark
 from freight_forwarder.commercial_invoice.commercial_invoice import CommercialInvoice
 
 
@@ -42,6 +45,7 @@ class FreightForwarderTest(unittest.TestCase):
 
         self.assertNotIn('image', commercial_invoice_services['tomcat_test'].values())
 
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__prefetch', return_value=True)
     @mock.patch.object(FreightForwarder, '_FreightForwarder__complete_distribution')
     @mock.patch.object(FreightForwarder, '_FreightForwarder__dispatch')
     @mock.patch.object(FreightForwarder, '_FreightForwarder__wait_for_dispatch')
@@ -58,7 +62,8 @@ class FreightForwarderTest(unittest.TestCase):
                                                          mock_service_deployment_validation,
                                                          mock_wait_for_dispatch,
                                                          mock_dispatch,
-                                                         mock_complete_distribution
+                                                         mock_complete_distribution,
+                                                         mock_prefetch
                                                          ):
         """
         Verify that feel is built correctly based on the provided configuration data
@@ -92,3 +97,464 @@ class FreightForwarderTest(unittest.TestCase):
         calls = [call('Running deploy.'),
                  call('dispatching service: ffbug-example-tomcat-test on host: https://192.168.99.100:2376.')]
         mock_logger.info.assert_has_calls(calls)
+
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__complete_distribution')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__dispatch')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__assemble_fleet')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__validate_commercial_invoice')
+    def test_deploy_stops_when_prefetch_fails(self, mock_validate_commercial_invoice, mock_assemble_fleet,
+                                              mock_dispatch, mock_complete_distribution):
+        healthy_ship = mock.Mock()
+        failed_ship  = mock.Mock()
+        failed_ship.prefetch_service_cargoes.side_effect = Exception('manifest unknown')
+        mock_assemble_fleet.return_value = {'https://10.0.0.1:2376': healthy_ship, 'https://10.0.0.2:2376': failed_ship}
+        commercial_invoice = mock_validate_commercial_invoice.return_value
+
+        self.assertFalse(self.freight_forwarder.deploy_containers(commercial_invoice, tag='1.0'))
+
+        healthy_ship.prefetch_service_cargoes.assert_called_once_with(commercial_invoice.transport_service, mock.ANY)
+        self.assertEqual(commercial_invoice.transport_service.source_tag, '1.0')
+        self.assertTrue(commercial_invoice.pin_source_digests.called)
+        self.assertFalse(mock_dispatch.called)
+        self.assertTrue(mock_complete_distribution.called)
+
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__complete_distribution')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__dispatch_dependencies')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__wait_for_dispatch')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__write_state_file')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__service_deployment_validation')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__assemble_fleet')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__validate_commercial_invoice')
+    def test_staged_deploy(self, mock_validate_commercial_invoice, mock_assemble_fleet, mock_validation,
+                           mock_write_state_file, mock_wait_for_dispatch, mock_dispatch_dependencies,
+                           mock_complete_distribution):
+        container_ships = [mock.Mock(), mock.Mock()]
+        for container_ship in container_ships:
+            container_ship.url.geturl.return_value = 'https://10.0.0.1:2376'
+            container_ship.swap_service_containers.return_value = 0.5
+
+        mock_assemble_fleet.return_value = {
+            'https://10.0.0.1:2376': container_ships[0],
+            'https://10.0.0.2:2376': container_ships[1]
+        }
+        commercial_invoice = mock_validate_commercial_invoice.return_value
+        commercial_invoice.transport_service.dependents = {}
+
+        self.assertTrue(
+            self.freight_forwarder.deploy_containers(commercial_invoice, prefetch=False, staged=True)
+        )
+        self.freight_forwarder._cleanup_worker.join()
+
+        for container_ship in container_ships:
+            self.assertEqual(container_ship.stage_service_containers.call_count, 1)
+            self.assertEqual(container_ship.swap_service_containers.call_count, 1)
+            self.assertEqual(container_ship.offload_previous_containers.call_count, 1)
+            self.assertFalse(container_ship.recall_service.called)
+
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__complete_distribution')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__dispatch_dependencies')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__wait_for_dispatch')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__write_state_file')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__service_deployment_validation')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__assemble_fleet')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__validate_commercial_invoice')
+    def test_staged_deploy_stops_when_staging_fails(self, mock_validate_commercial_invoice, mock_assemble_fleet,
+                                                    mock_validation, mock_write_state_file, mock_wait_for_dispatch,
+                                                    mock_dispatch_dependencies, mock_complete_distribution):
+        container_ships = [mock.Mock(), mock.Mock()]
+        container_ships[1].stage_service_containers.side_effect = Exception('no such image')
+        mock_assemble_fleet.return_value = {
+            'https://10.0.0.1:2376': container_ships[0],
+            'https://10.0.0.2:2376': container_ships[1]
+        }
+        mock_validate_commercial_invoice.return_value.transport_service.dependents = {}
+
+        self.assertFalse(self.freight_forwarder.deploy_containers(
+            mock_validate_commercial_invoice.return_value, prefetch=False, staged=True
+        ))
+
+        for container_ship in container_ships:
+            self.assertEqual(container_ship.discard_service_containers.call_count, 1)
+            self.assertFalse(container_ship.swap_service_containers.called)
+
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__complete_distribution')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__dispatch_dependencies')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__wait_for_dispatch')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__write_state_file')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__service_deployment_validation')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__assemble_fleet')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__validate_commercial_invoice')
+    def test_staged_deploy_rolls_back_every_host_when_a_swap_fails(self, mock_validate_commercial_invoice,
+                                                                   mock_assemble_fleet, mock_validation,
+                                                                   mock_write_state_file, mock_wait_for_dispatch,
+                                                                   mock_dispatch_dependencies,
+                                                                   mock_complete_distribution):
+        container_ships = [mock.Mock(), mock.Mock(), mock.Mock()]
+        for index, container_ship in enumerate(container_ships):
+            container_ship.url.geturl.return_value = 'https://10.0.0.{0}:2376'.format(index + 1)
+            container_ship.swap_service_containers.return_value = 0.5
+
+        container_ships[1].swap_service_containers.side_effect = Exception('container stop timed out')
+        mock_assemble_fleet.return_value = collections.OrderedDict(
+            (container_ship.url.geturl.return_value, container_ship) for container_ship in container_ships
+        )
+        mock_validate_commercial_invoice.return_value.transport_service.dependents = {}
+
+        self.assertFalse(self.freight_forwarder.deploy_containers(
+            mock_validate_commercial_invoice.return_value, prefetch=False, staged=True
+        ))
+
+        # the swap stops at the failed host and every host, swapped or not, is rolled back without being verified.
+        self.assertFalse(container_ships[2].swap_service_containers.called)
+        for container_ship in container_ships:
+            self.assertFalse(container_ship.verify_service_containers.called)
+            self.assertEqual(container_ship.discard_service_containers.call_count, 1)
+            self.assertEqual(container_ship.recall_service.call_count, 1)
+            self.assertFalse(container_ship.offload_previous_containers.called)
+
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__complete_distribution')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__dispatch')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__wait_for_dispatch')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__write_state_file')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__service_deployment_validation')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__assemble_fleet')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__validate_commercial_invoice')
+    def test_staged_deploy_with_dependents_deploys_host_by_host(self, mock_validate_commercial_invoice,
+                                                                mock_assemble_fleet, mock_validation,
+                                                                mock_write_state_file, mock_wait_for_dispatch,
+                                                                mock_dispatch, mock_complete_distribution):
+        container_ship = mock.Mock()
+        mock_assemble_fleet.return_value = {'https://10.0.0.1:2376': container_ship}
+        commercial_invoice = mock_validate_commercial_invoice.return_value
+        commercial_invoice.transport_service.dependents = {'worker': mock.Mock()}
+        self.freight_forwarder._bill_of_lading = {'failures': {}, 'successful': {}}
+
+        self.assertTrue(self.freight_forwarder.deploy_containers(commercial_invoice, prefetch=False, staged=True))
+        self.freight_forwarder._cleanup_worker.join()
+
+        mock_dispatch.assert_called_once_with(container_ship, commercial_invoice.transport_service)
+        self.assertFalse(container_ship.stage_service_containers.called)
+
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__delete_state_file')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__dispatch')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__wait_for_dispatch')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__write_state_file')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__service_deployment_validation')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__assemble_fleet')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__validate_commercial_invoice')
+    def test_deploy_cleans_up_in_the_background(self, mock_validate_commercial_invoice, mock_assemble_fleet,
+                                                mock_validation, mock_write_state_file, mock_wait_for_dispatch,
+                                                mock_dispatch, mock_delete_state_file):
+        container_ships = [mock.Mock(), mock.Mock()]
+        container_ships[0].offload_previous_containers.side_effect = Exception('no such container')
+        fleet = {'https://10.0.0.1:2376': container_ships[0], 'https://10.0.0.2:2376': container_ships[1]}
+        mock_assemble_fleet.return_value = fleet
+
+        commercial_invoice = mock_validate_commercial_invoice.return_value
+        commercial_invoice.container_ships = {'tomcat-test': fleet}
+        self.freight_forwarder.sweep_interval = None
+        self.freight_forwarder._bill_of_lading = {}
+
+        # a failed clean up doesn't fail the deploy.
+        self.assertTrue(self.freight_forwarder.deploy_containers(commercial_invoice, prefetch=False))
+
+        self.assertEqual(self.freight_forwarder._cleanup_worker.pending, 0)
+        self.assertEqual(len(self.freight_forwarder._cleanup_worker.failures), 1)
+        self.assertFalse(container_ships[0].offload_expired_service_cargo.called)
+        self.assertEqual(container_ships[1].offload_previous_containers.call_count, 1)
+        self.assertEqual(container_ships[1].offload_expired_service_cargo.call_count, 1)
+
+    @mock.patch('freight_forwarder.freight_forwarder.os.pipe', return_value=(10, 11))
+    @mock.patch('freight_forwarder.freight_forwarder.os.close')
+    @mock.patch('freight_forwarder.freight_forwarder.os.fork')
+    def test_detached_cleanup_holds_the_state_file(self, mock_fork, mock_close, mock_pipe):
+        state_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, state_path)
+        address = 'https://10.0.0.1:2376'
+
+        calls = mock.Mock()
+        calls.fork.return_value = 4321
+        mock_fork.side_effect = calls.fork
+        container_ship = mock.Mock()
+        container_ship.log_collector.close.side_effect = calls.close_log_collector
+        clean_up = mock.Mock()
+
+        self.freight_forwarder = FreightForwarder(
+            config_path_override=os.path.join(os.getcwd(), 'tests', 'fixtures', 'test_freight_forwarder.yaml'),
+            verbose=False,
+            sweep_interval=None,
+            background_cleanup=True
+        )
+        self.freight_forwarder._cleanup_worker.submit('clean up', clean_up)
+
+        with mock.patch('freight_forwarder.freight_forwarder.STATE_PATH', state_path):
+            self.freight_forwarder._FreightForwarder__write_state_file(address, 'us-east-1', 'production')
+            host_path  = os.path.join(state_path, self.freight_forwarder.team, self.freight_forwarder.project, '10.0.0.1')
+            state_file = os.path.join(host_path, '{0}.yml'.format(os.getpid()))
+            os.utime(state_file, (1000, 1000))
+
+            self.freight_forwarder._FreightForwarder__complete_distribution(
+                mock.Mock(container_ships={'tomcat-test': {address: container_ship}})
+            )
+
+        # threads are stopped before the fork and the work is left to the child.
+        names = [name for name, args, kwargs in calls.mock_calls]
+        self.assertEqual(names[-1], 'fork')
+        self.assertIn('close_log_collector', names[:-1])
+        self.assertFalse(clean_up.called)
+        mock_close.assert_any_call(11)
+
+        # the child holds the host's place in the dispatch queue.
+        self.assertEqual(os.listdir(host_path), ['4321.yml'])
+        self.assertEqual(os.path.getmtime(os.path.join(host_path, '4321.yml')), 1000)
+
+    @mock.patch('freight_forwarder.freight_forwarder.psutil')
+    def test_wait_for_dispatch_reads_the_queue_again(self, mock_psutil):
+        state_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, state_path)
+        address   = 'https://10.0.0.1:2376'
+        host_path = os.path.join(state_path, self.freight_forwarder.team, self.freight_forwarder.project, '10.0.0.1')
+        os.makedirs(host_path)
+
+        def queue(pid, queued_at):
+            with open(os.path.join(host_path, '{0}.yml'.format(pid)), 'w') as f:
+                f.write('pid: {0}\n'.format(pid))
+            os.utime(os.path.join(host_path, '{0}.yml'.format(pid)), (queued_at, queued_at))
+
+        queue(1111, 1000)
+        queue(os.getpid(), 2000)
+
+        # 1111 hands its place to 2222 before it exits.
+        def is_running():
+            if os.path.isfile(os.path.join(host_path, '1111.yml')):
+                os.remove(os.path.join(host_path, '1111.yml'))
+                queue(2222, 1000)
+
+            return False
+
+        mock_psutil.Process.return_value.is_running.side_effect = is_running
+        mock_psutil.pid_exists.return_value = False
+
+        with mock.patch('freight_forwarder.freight_forwarder.STATE_PATH', state_path):
+            with mock.patch('freight_forwarder.freight_forwarder.stdout'):
+                self.assertTrue(self.freight_forwarder._FreightForwarder__wait_for_dispatch(address))
+
+        self.assertEqual([call[0][0] for call in mock_psutil.Process.call_args_list], [1111, 2222])
+        self.assertEqual(os.listdir(host_path), ['{0}.yml'.format(os.getpid())])
+
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__assemble_fleet')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__validate_commercial_invoice')
+    def test_prefetch(self, mock_validate_commercial_invoice, mock_assemble_fleet):
+        container_ships = [mock.Mock(), mock.Mock()]
+        mock_assemble_fleet.return_value = {
+            'https://10.0.0.1:2376': container_ships[0],
+            'https://10.0.0.2:2376': container_ships[1]
+        }
+
+        self.assertTrue(self.freight_forwarder.prefetch(mock_validate_commercial_invoice.return_value))
+        mock_validate_commercial_invoice.assert_called_once_with(mock.ANY, 'deploy')
+        for container_ship in container_ships:
+            self.assertEqual(container_ship.prefetch_service_cargoes.call_count, 1)
+
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__assemble_fleet')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__validate_commercial_invoice')
+    def test_logs(self, mock_validate_commercial_invoice, mock_assemble_fleet):
+        container_ships = [mock.Mock(), mock.Mock()]
+        container_ships[0].service_log_streams.return_value = {
+            'app-01': iter(['2016-04-12T10:00:01Z started', '2016-04-12T10:00:03.5Z failed'])
+        }
+        container_ships[1].service_log_streams.return_value = {
+            'app-01': iter(['2016-04-12T10:00:02.25Z started'])
+        }
+        mock_assemble_fleet.return_value = {
+            'https://10.0.0.1:2376': container_ships[0],
+            'https://10.0.0.2:2376': container_ships[1]
+        }
+
+        lines = list(self.freight_forwarder.logs(mock_validate_commercial_invoice.return_value, since=100, tail=10))
+
+        mock_validate_commercial_invoice.assert_called_once_with(mock.ANY, 'deploy')
+        for container_ship in container_ships:
+            container_ship.service_log_streams.assert_called_once_with(mock.ANY, 100, 10)
+
+        self.assertEqual([(line.source, line.message) for line in lines], [
+            ('https://10.0.0.1:2376 app-01', 'started'),
+            ('https://10.0.0.2:2376 app-01', 'started'),
+            ('https://10.0.0.1:2376 app-01', 'failed')
+        ])
+
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__assemble_fleet')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__validate_commercial_invoice')
+    def test_exec_containers(self, mock_validate_commercial_invoice, mock_assemble_fleet):
+        container_ships = [mock.Mock(), mock.Mock(), mock.Mock()]
+        container_ships[0].exec_service_containers.return_value = {'app-01': 0, 'app-02': 2}
+        container_ships[1].exec_service_containers.return_value = {'app-01': None}
+        container_ships[2].exec_service_containers.side_effect = Exception('connection refused')
+        mock_assemble_fleet.return_value = {
+            'https://10.0.0.1:2376': container_ships[0],
+            'https://10.0.0.2:2376': container_ships[1],
+            'https://10.0.0.3:2376': container_ships[2]
+        }
+
+        exit_codes = self.freight_forwarder.exec_containers(
+            mock_validate_commercial_invoice.return_value, ['nginx', '-s', 'reload'], max_concurrency=2
+        )
+
+        mock_validate_commercial_invoice.assert_called_once_with(mock.ANY, 'deploy')
+        for container_ship in container_ships:
+            container_ship.exec_service_containers.assert_called_once_with(mock.ANY, ['nginx', '-s', 'reload'], 2)
+
+        self.assertEqual(exit_codes, {
+            'https://10.0.0.1:2376 app-01': 0,
+            'https://10.0.0.1:2376 app-02': 2,
+            'https://10.0.0.2:2376 app-01': None
+        })
+
+        with self.assertRaises(TypeError):
+            self.freight_forwarder.exec_containers(mock_validate_commercial_invoice.return_value, ['ls'], 0)
+
+    @mock.patch('freight_forwarder.freight_forwarder.Longshoremen')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__complete_distribution')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__write_state_file')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__assemble_fleet')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__validate_commercial_invoice')
+    def test_run_jobs(self, mock_validate_commercial_invoice, mock_assemble_fleet, mock_write_state_file,
+                      mock_complete_distribution, mock_longshoremen):
+        fleet = {'https://10.0.0.1:2376': mock.Mock(), 'https://10.0.0.2:2376': mock.Mock()}
+        mock_assemble_fleet.return_value = fleet
+        commercial_invoice = mock_validate_commercial_invoice.return_value
+        commercial_invoice.transport_service.alias = 'team-app'
+        jobs = [mock.Mock()]
+
+        results = self.freight_forwarder.run_jobs(commercial_invoice, jobs, capacity=4)
+
+        mock_validate_commercial_invoice.assert_called_once_with(mock.ANY, 'deploy')
+        mock_longshoremen.assert_called_once_with(fleet, 4, 'team-app-job')
+        mock_longshoremen.return_value.run.assert_called_once_with(jobs)
+        self.assertIs(results, mock_longshoremen.return_value.run.return_value)
+        self.assertEqual(mock_write_state_file.call_count, 2)
+        self.assertTrue(mock_complete_distribution.called)
+
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__complete_distribution')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__wait_for_dispatch')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__write_state_file')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__assemble_fleet')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__validate_commercial_invoice')
+    def test_test_records_stats(self, mock_validate_commercial_invoice, mock_assemble_fleet, mock_write_state_file,
+                                mock_wait_for_dispatch, mock_complete_distribution):
+        summary = {
+            'app': {
+                'samples': 4,
+                'cpu_percent': {'p50': 12.5, 'p90': 40.0, 'p99': 55.25, 'max': 55.25},
+                'memory_bytes': {'p50': None, 'p90': None, 'p99': None, 'max': None}
+            }
+        }
+        container_ship = mock.Mock()
+        container_ship.url.geturl.return_value = 'https://10.0.0.1:2376'
+        container_ship.test_service.return_value = True
+        container_ship.stop_sampling_stats.return_value = summary
+        mock_assemble_fleet.return_value = {'https://10.0.0.1:2376': container_ship}
+
+        self.assertTrue(self.freight_forwarder.test(mock_validate_commercial_invoice.return_value, {}, stats_interval=2))
+
+        container_ship.start_sampling_stats.assert_called_once_with(2)
+        self.assertEqual(self.freight_forwarder.bill_of_lading['stats'], {'https://10.0.0.1:2376': summary})
+
+        # stats are recorded when the tests fail too, and not sampled without an interval.
+        container_ship.test_service.return_value = False
+        with self.assertRaises(AssertionError):
+            self.freight_forwarder.test(mock_validate_commercial_invoice.return_value, {})
+
+        container_ship.start_sampling_stats.assert_called_once_with(2)
+        self.assertEqual(container_ship.stop_sampling_stats.call_count, 2)
+
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__benchmark')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__dispatch')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__complete_distribution')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__wait_for_dispatch')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__write_state_file')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__assemble_fleet')
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__validate_commercial_invoice')
+    def test_quality_control_skips_benchmark_after_failures(self, mock_validate_commercial_invoice, mock_assemble_fleet,
+                                                            mock_write_state_file, mock_wait_for_dispatch,
+                                                            mock_complete_distribution, mock_dispatch, mock_benchmark):
+        container_ship = mock.Mock()
+        container_ship.url.geturl.return_value = 'https://10.0.0.1:2376'
+        container_ship.stop_sampling_stats.return_value = None
+        mock_assemble_fleet.return_value = {'https://10.0.0.1:2376': container_ship}
+        commercial_invoice = mock_validate_commercial_invoice.return_value
+
+        def dispatch(*args):
+            self.freight_forwarder._bill_of_lading = {'failures': {'https://10.0.0.1:2376': {}}}
+
+        mock_dispatch.side_effect = dispatch
+        self.assertFalse(self.freight_forwarder.quality_control(commercial_invoice))
+        self.assertFalse(mock_benchmark.called)
+
+        mock_dispatch.side_effect = None
+        self.freight_forwarder._bill_of_lading = {'successful': {}}
+        self.freight_forwarder.quality_control(commercial_invoice)
+        mock_benchmark.assert_called_once_with(container_ship, commercial_invoice.transport_service, None, False)
+
+    def test_benchmark_against_baseline(self):
+        benchmark_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, benchmark_path)
+
+        service = mock.Mock(alias='team-project-app')
+        service.benchmark = Benchmark(image='team/app-bench:1.0', higher_is_better=['requests_per_second'])
+        container_ship = mock.Mock()
+        container_ship.url.geturl.return_value = 'https://10.0.0.1:2376'
+        container_ship.benchmark_service.return_value = {'latency_p99': 100, 'requests_per_second': 2000}
+
+        with mock.patch('freight_forwarder.freight_forwarder.BENCHMARK_PATH', benchmark_path):
+            # the first run records the baseline.
+            self.assertEqual(self.freight_forwarder._FreightForwarder__benchmark(container_ship, service), [])
+            self.assertTrue(os.path.isfile(os.path.join(benchmark_path, 'team-project-app.json')))
+
+            container_ship.benchmark_service.return_value = {'latency_p99': 109, 'requests_per_second': 1700}
+            regressions = self.freight_forwarder._FreightForwarder__benchmark(container_ship, service)
+
+        self.assertEqual([regression.metric for regression in regressions], ['requests_per_second'])
+        self.assertEqual(self.freight_forwarder.bill_of_lading['failures'], {'https://10.0.0.1:2376': [service]})
+        self.assertEqual(
+            self.freight_forwarder.bill_of_lading['benchmarks']['https://10.0.0.1:2376']['team-project-app']['baseline'],
+            {'latency_p99': 100, 'requests_per_second': 2000}
+        )
+
+        # a baseline passed as a file must exist unless it is being recorded.
+        baseline = os.path.join(benchmark_path, 'baseline.json')
+        with self.assertRaises(OSError):
+            self.freight_forwarder._FreightForwarder__benchmark(container_ship, service, baseline)
+
+        self.freight_forwarder._FreightForwarder__benchmark(container_ship, service, baseline, update_baseline=True)
+        self.assertEqual(self.freight_forwarder._FreightForwarder__benchmark(container_ship, service, baseline), [])
+
+    @mock.patch.object(FreightForwarder, '_FreightForwarder__delete_state_file')
+    def test_complete_distribution_throttles_dangling_image_sweep(self, mock_delete_state_file):
+        sweep_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, sweep_path)
+
+        mock_container_ship = mock.Mock()
+        mock_container_ship.clean_up_dangling_images.return_value = {
+            'containers': {'removed': [], 'failed': []},
+            'cargoes': {'removed': ['123'], 'failed': []}
+        }
+        commercial_invoice = mock.Mock(
+            container_ships={'tomcat-test': {'https://192.168.99.100:2376': mock_container_ship}}
+        )
+
+        with mock.patch('freight_forwarder.freight_forwarder.SWEEP_PATH', sweep_path):
+            self.freight_forwarder._FreightForwarder__complete_distribution(commercial_invoice)
+            self.freight_forwarder._FreightForwarder__complete_distribution(commercial_invoice)
+
+            self.assertEqual(mock_container_ship.clean_up_dangling_images.call_count, 1)
+            self.assertEqual(mock_delete_state_file.call_count, 2)
+            self.assertTrue(os.path.isfile(os.path.join(sweep_path, '192.168.99.100.yml')))
+
+            self.freight_forwarder.sweep_interval = 0
+            self.freight_forwarder._FreightForwarder__complete_distribution(commercial_invoice)
+            self.assertEqual(mock_container_ship.clean_up_dangling_images.call_count, 2)
+
+            self.freight_forwarder.sweep_interval = None
+            self.freight_forwarder._FreightForwarder__complete_distribution(commercial_invoice)
+            self.assertEqual(mock_container_ship.clean_up_dangling_images.call_count, 2)
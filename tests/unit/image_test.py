@@ -207,6 +207,10 @@ class ImageTest(unittest.TestCase):
         self.assertIsInstance(image, Image)
         self.assertEqual(image.identifier, '/foo:bar')
 
+        image = Image.pull(client=self.docker_client, registry=mock_registry, repository_tag='foo@sha256:abc')
+        self.assertEqual(image.identifier, '/foo@sha256:abc')
+        mock_docker_image_pull.assert_called_with('/foo', stream=True, tag='sha256:abc')
+
     def test_pull_failure(self):
         mock_registry = mock.Mock(spec=V2(address='https://v2.com'))
         mock_registry.ping.return_value = False
@@ -227,15 +231,71 @@ class ImageTest(unittest.TestCase):
     @mock.patch.object(requests.Session, 'close')
     @mock.patch.object(Image, '_inspect_and_map')
     @mock.patch('freight_forwarder.image.os')
-    def test_build(self, mock_os, mock_image_inspect, mock_request_session_close, mock_docker_build):
+    @mock.patch('freight_forwarder.image.BuildContext')
+    def test_build(self, mock_build_context, mock_os, mock_image_inspect, mock_request_session_close, mock_docker_build):
         mock_os.path.exists.return_value = True
         mock_os.path.isfile.return_value = True
         mock_os.getcwd.return_value = '/'
         mock_os.path.realpath.return_value = '/'
         mock_docker_build.return_value = []
+        build_context = mock_build_context.from_docker_file.return_value
+        build_context.file_count = 1
+        build_context.size = 1024
+        build_context.docker_file = 'abc'
         image = Image.build(client=self.docker_client, repository_tag='foo', docker_file='abc')
         self.assertIsInstance(image, Image)
         self.assertEqual(image.identifier, 'foo:latest')
+        mock_build_context.from_docker_file.assert_called_once_with('abc')
+        build_context.archive.return_value.close.assert_called_once_with()
+        self.assertTrue(mock_docker_build.call_args[1]['custom_context'])
+
+    @mock.patch.object(docker.Client, '_stream_helper')
+    @mock.patch.object(docker.Client, '_raise_for_status')
+    @mock.patch.object(docker.Client, '_post')
+    @mock.patch.object(docker.api.BuildApiMixin, 'build')
+    @mock.patch.object(requests.Session, 'close')
+    @mock.patch.object(Image, '_inspect_and_map')
+    @mock.patch.object(Image, 'supports_cache_from')
+    @mock.patch('freight_forwarder.image.os')
+    @mock.patch('freight_forwarder.image.BuildContext')
+    def test_build_cache_from(self, mock_build_context, mock_os, mock_supports_cache_from, mock_image_inspect,
+                              mock_request_session_close, mock_docker_build, mock_post, mock_raise_for_status,
+                              mock_stream_helper):
+        mock_os.path.exists.return_value = True
+        mock_docker_build.return_value = []
+        mock_stream_helper.return_value = []
+        build_context = mock_build_context.from_docker_file.return_value
+        build_context.file_count = 1
+        build_context.size = 1024
+        build_context.docker_file = 'Dockerfile'
+
+        # docker-py 1.x's build doesn't take cache sources, the build is posted at the api version that does.
+        mock_supports_cache_from.return_value = True
+        Image.build(client=self.docker_client, repository_tag='foo', docker_file='abc', cache_from=['foo:1.0'])
+        self.assertFalse(mock_docker_build.called)
+        self.assertTrue(mock_post.call_args[0][0].endswith('/v1.25/build'))
+        self.assertEqual(mock_post.call_args[1]['data'], build_context.archive.return_value)
+        self.assertEqual(mock_post.call_args[1]['params']['cachefrom'], '["foo:1.0"]')
+        self.assertEqual(mock_post.call_args[1]['params']['t'], 'foo:latest')
+        self.assertEqual(mock_post.call_args[1]['params']['dockerfile'], 'Dockerfile')
+        mock_raise_for_status.assert_called_once_with(mock_post.return_value)
+
+        mock_supports_cache_from.return_value = False
+        Image.build(client=self.docker_client, repository_tag='foo', docker_file='abc', cache_from=['foo:1.0'])
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertTrue(mock_docker_build.call_args[1]['custom_context'])
+
+    @mock.patch.object(docker.Client, 'version')
+    def test_supports_cache_from(self, mock_version):
+        mock_version.return_value = {'ApiVersion': '1.24'}
+        self.assertFalse(Image.supports_cache_from(self.docker_client))
+        mock_version.assert_called_once_with(api_version=False)
+
+        mock_version.return_value = {'ApiVersion': '1.25'}
+        self.assertTrue(Image.supports_cache_from(self.docker_client))
+
+        mock_version.side_effect = requests.exceptions.ConnectionError('refused')
+        self.assertFalse(Image.supports_cache_from(self.docker_client))
 
     @mock.patch('freight_forwarder.image.os')
     def test_build_failure(self, mock_os):
@@ -0,0 +1,83 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals, absolute_import
+
+from tests import unittest, mock
+
+from freight_forwarder.container.log_buffer import CapturedOutput, LogBuffer, iter_lines
+
+
+class LogBufferTest(unittest.TestCase):
+    def test_invalid_limits(self):
+        with self.assertRaises(TypeError):
+            LogBuffer(max_bytes=0)
+
+        with self.assertRaises(TypeError):
+            LogBuffer(max_lines='10')
+
+    def test_lines_across_appends(self):
+        buffer = LogBuffer()
+        buffer.append(b'one\ntw')
+        buffer.append(b'o\nthree')
+
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.drain(), [b'one\n', b'two\n', b'three'])
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(buffer.size, 0)
+
+    def test_max_lines(self):
+        buffer = LogBuffer(max_lines=2)
+        buffer.append(b'1\n2\n3\n4\n')
+
+        self.assertEqual(buffer.dropped, 2)
+        self.assertEqual(buffer.drain(), [b'3\n', b'4\n'])
+
+    def test_max_bytes(self):
+        buffer = LogBuffer(max_bytes=10)
+        buffer.append(b'aaaa\nbbbb\ncccc\n')
+
+        self.assertEqual(buffer.size, 10)
+        self.assertEqual(buffer.drain(), [b'bbbb\n', b'cccc\n'])
+
+    def test_memory_stays_flat(self):
+        buffer = LogBuffer(max_bytes=1024, max_lines=100)
+        trace  = b'\tat com.example.Service.handle(Service.java:42)\n'
+
+        for _ in range(10000):
+            buffer.append(trace * 10)
+
+        self.assertLessEqual(buffer.size, 1024)
+        self.assertLessEqual(len(buffer), 100)
+        self.assertEqual(buffer.drain()[-1], trace)
+
+    def test_long_line_is_split(self):
+        buffer = LogBuffer(max_bytes=8)
+        buffer.append(b'0123456789')
+        buffer.append(b'ab\n')
+
+        self.assertLessEqual(buffer.size, 8)
+        self.assertEqual(buffer.drain(), [b'ab\n'])
+
+
+class CapturedOutputTest(unittest.TestCase):
+    def test_captured_output(self):
+        stream = mock.Mock()
+        output = CapturedOutput(stream, max_lines=2)
+        output.write(b'first\nsec')
+        output.write('ond\r\nthird\n')
+        output.write('fourth')
+        output.close()
+
+        # output is written through and only the last lines are kept.
+        self.assertEqual(stream.write.call_args_list[1], mock.call('ond\r\nthird\n'))
+        stream.close.assert_called_once_with()
+        self.assertEqual(output.lines, ['third', 'fourth'])
+
+
+class IterLinesTest(unittest.TestCase):
+    def test_iter_lines(self):
+        chunks = [b'caf', b'\xc3', b'\xa9\nsecond ', b'line\nno newline']
+
+        self.assertEqual(list(iter_lines(chunks)), ['café', 'second line', 'no newline'])
+
+    def test_iter_lines_strings(self):
+        self.assertEqual(list(iter_lines(['a\nb', '\n'])), ['a', 'b'])
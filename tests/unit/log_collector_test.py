@@ -0,0 +1,142 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals, absolute_import
+import socket
+import struct
+import time
+
+from tests import unittest, mock
+
+from freight_forwarder.container.log_collector import LogCollector
+
+
+def frame(data, stream=1):
+    return struct.pack('>BxxxL', stream, len(data)) + data
+
+
+def create_container(id, tty=False):
+    container = mock.Mock()
+    container.id         = id
+    container.config.tty = tty
+
+    return container
+
+
+class LogCollectorTest(unittest.TestCase):
+    def setUp(self):
+        self.client    = mock.Mock()
+        self.collector = LogCollector(self.client)
+        self.sockets   = []
+
+    def tearDown(self):
+        self.collector.close()
+        for sock in self.sockets:
+            sock.close()
+
+    def attach(self, container):
+        local, remote = socket.socketpair()
+        self.sockets.append(remote)
+        self.client.attach_socket.return_value = local
+        self.collector.collect(container)
+
+        return remote
+
+    def wait_for(self, condition, timeout=5):
+        deadline = time.time() + timeout
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+
+        return condition()
+
+    def test_for_client(self):
+        client    = mock.Mock()
+        collector = LogCollector.for_client(client)
+        self.assertIs(LogCollector.for_client(client), collector)
+
+        collector.close()
+        replacement = LogCollector.for_client(client)
+        self.assertIsNot(replacement, collector)
+        replacement.close()
+
+    def test_collect_multiplexed(self):
+        container = create_container('123')
+        remote    = self.attach(container)
+
+        # frames can arrive split across reads.
+        data = frame(b'hello\n') + frame(b'world\n', stream=2)
+        remote.sendall(data[:10])
+        remote.sendall(data[10:])
+
+        self.assertTrue(self.wait_for(lambda: self.collector._buffer(container).size == 12))
+        self.assertEqual(self.collector.drain(container), [b'hello\n', b'world\n'])
+        self.client.attach_socket.assert_called_once_with('123')
+
+    def test_collect_many_containers_one_thread(self):
+        containers = [create_container('a', tty=True), create_container('b', tty=True)]
+        remotes    = [self.attach(container) for container in containers]
+
+        for container, remote in zip(containers, remotes):
+            remote.sendall(container.id.encode('utf-8'))
+
+        for container in containers:
+            self.assertTrue(self.wait_for(lambda: self.collector._buffer(container)))
+            self.assertEqual(self.collector.drain(container), [container.id.encode('utf-8')])
+
+        self.assertEqual(self.client.attach_socket.call_count, 2)
+
+    def test_collect_twice(self):
+        container = create_container('123')
+        self.attach(container)
+        self.collector.collect(container)
+
+        self.assertEqual(self.client.attach_socket.call_count, 1)
+
+    def test_buffer_is_bounded(self):
+        self.collector.max_lines = 2
+        container = create_container('123', tty=True)
+        remote    = self.attach(container)
+
+        remote.sendall(b'1\n2\n3\n')
+        self.assertTrue(self.wait_for(lambda: self.collector._buffer(container).dropped == 1))
+        self.assertEqual(self.collector.drain(container), [b'2\n', b'3\n'])
+
+    def test_collect_large_frame(self):
+        container = create_container('123')
+        remote    = self.attach(container)
+
+        # a frame larger than a read is handed to the buffer as it arrives.
+        remote.sendall(frame(b'x' * 10000 + b'\n'))
+        self.assertTrue(self.wait_for(lambda: self.collector._buffer(container).size == 10001))
+        self.assertEqual(self.collector.drain(container), [b'x' * 10000 + b'\n'])
+
+    def test_output_kept_after_the_container_exits(self):
+        container = create_container('123')
+        remote = self.attach(container)
+        remote.sendall(frame(b'starting\n') + frame(b'crashed\n', stream=2))
+        self.assertTrue(self.wait_for(lambda: self.collector._buffer(container).size == 17))
+
+        # the container exiting closes its socket, its output stays buffered until it is released.
+        remote.close()
+        self.assertTrue(self.wait_for(lambda: not self.collector._streams))
+        self.assertEqual(self.collector.drain(container), [b'starting\n', b'crashed\n'])
+
+        self.collector.release(container)
+        self.assertEqual(self.collector._buffers, {})
+
+    def test_release(self):
+        container = create_container('123')
+        self.attach(container)
+        self.collector.release(container)
+
+        self.assertEqual(self.collector._streams, {})
+        self.assertEqual(self.collector.drain(container), [])
+
+    def test_close(self):
+        container = create_container('123')
+        self.attach(container)
+        thread = self.collector._thread
+        self.collector.close()
+
+        self.assertTrue(self.collector.closed)
+        self.assertFalse(thread.is_alive())
+        with self.assertRaises(RuntimeError):
+            self.collector.collect(container)
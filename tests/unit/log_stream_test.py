@@ -0,0 +1,77 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals, absolute_import
+import threading
+
+from tests import unittest
+
+from freight_forwarder.log_stream import parse_timestamp, merge_log_streams
+
+
+class ParseTimestampTest(unittest.TestCase):
+    def test_trimmed_nanoseconds(self):
+        # docker trims trailing zeros so .5 is later than .25 even though it sorts first as a string.
+        early = parse_timestamp('2016-04-12T10:00:00.25Z a')
+        late  = parse_timestamp('2016-04-12T10:00:00.5Z b')
+
+        self.assertLess(early[0], late[0])
+        self.assertEqual(late[1:], ('2016-04-12T10:00:00.5Z', 'b'))
+
+    def test_without_fraction(self):
+        self.assertLess(parse_timestamp('2016-04-12T10:00:00Z a')[0], parse_timestamp('2016-04-12T10:00:00.1Z a')[0])
+
+    def test_offset(self):
+        key, stamp, message = parse_timestamp('2016-04-12T12:00:00.000001+02:00 message')
+
+        self.assertEqual(key, ('2016-04-12T10:00:00', 1000))
+        self.assertEqual(message, 'message')
+
+    def test_without_timestamp(self):
+        self.assertEqual(parse_timestamp('plain line'), (('', 0), None, 'plain line'))
+
+
+class MergeLogStreamsTest(unittest.TestCase):
+    def test_merge_orders_by_timestamp(self):
+        streams = {
+            'a': ['2016-04-12T10:00:01Z a1', '2016-04-12T10:00:04Z a2'],
+            'b': ['2016-04-12T10:00:02Z b1', '2016-04-12T10:00:03Z b2', '2016-04-12T10:00:05Z b3'],
+            'c': []
+        }
+
+        lines = list(merge_log_streams(streams))
+
+        self.assertEqual([line.message for line in lines], ['a1', 'b1', 'b2', 'a2', 'b3'])
+        self.assertEqual([line.source for line in lines], ['a', 'b', 'b', 'a', 'b'])
+
+    def test_merge_streams_without_reading_everything(self):
+        produced = []
+        release  = threading.Event()
+
+        def endless():
+            index = 0
+            while True:
+                produced.append(index)
+                yield '2016-04-12T10:01:{0:02d}Z {0}'.format(index % 60)
+                index += 1
+
+        def slow():
+            yield '2016-04-12T10:00:00Z first'
+            release.wait(5)
+
+        merged = merge_log_streams({'endless': endless(), 'slow': slow()}, read_ahead=4)
+        first  = next(merged)
+
+        self.assertEqual(first.message, 'first')
+        # the endless stream is only read ahead a few lines.
+        self.assertLessEqual(len(produced), 6)
+
+        release.set()
+        merged.close()
+
+    def test_failed_stream_ends(self):
+        def failing():
+            yield '2016-04-12T10:00:01Z before'
+            raise IOError('connection reset')
+
+        lines = list(merge_log_streams({'a': failing(), 'b': ['2016-04-12T10:00:02Z other']}))
+
+        self.assertEqual([line.message for line in lines], ['before', 'other'])
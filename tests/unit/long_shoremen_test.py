@@ -0,0 +1,128 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals, absolute_import
+import threading
+import time
+
+from tests import unittest, mock
+
+from freight_forwarder.long_shoremen import Job, Longshoremen
+
+
+class JobTest(unittest.TestCase):
+    def test_job(self):
+        job = Job('reindex', 'team/app:1.0', command=['bin/reindex', '--all'], env={'SHARDS': '4'}, retries=2)
+
+        self.assertEqual(job.name, 'reindex')
+        self.assertIsNone(job.exit_code)
+        self.assertEqual(job.duration, 0)
+        self.assertFalse(job.succeeded)
+        self.assertTrue(job.retryable)
+
+    def test_job_failure(self):
+        with self.assertRaises(TypeError):
+            Job('re index', 'team/app:1.0')
+
+        with self.assertRaises(TypeError):
+            Job('reindex', None)
+
+        with self.assertRaises(TypeError):
+            Job('reindex', 'team/app:1.0', command={'cmd': 'bin/reindex'})
+
+        with self.assertRaises(TypeError):
+            Job('reindex', 'team/app:1.0', env='SHARDS=4')
+
+        with self.assertRaises(TypeError):
+            Job('reindex', 'team/app:1.0', retries=-1)
+
+
+class LongshoremenTest(unittest.TestCase):
+    def setUp(self):
+        self.patch_logger = mock.patch('freight_forwarder.long_shoremen.logger')
+        self.patch_prefixed_stream = mock.patch('freight_forwarder.long_shoremen.PrefixedStream')
+        self.patch_logger.start()
+        self.patch_prefixed_stream.start()
+
+    def tearDown(self):
+        self.patch_logger.stop()
+        self.patch_prefixed_stream.stop()
+
+    def test_init_failure(self):
+        with self.assertRaises(TypeError):
+            Longshoremen({})
+
+        with self.assertRaises(TypeError):
+            Longshoremen({'https://10.0.0.1:2376': mock.Mock()}, capacity=0)
+
+    def test_run(self):
+        exit_codes = {'backfill': [1, 0], 'reindex': [0], 'purge': [2, 2]}
+        lock       = threading.Lock()
+
+        def run_container(alias, image, command, env, output):
+            name = alias.split('-', 2)[-1]
+            output.write("{0} running\n".format(name))
+            if name == 'compact':
+                raise Exception('no such image')
+
+            with lock:
+                return exit_codes[name].pop(0)
+
+        fleet = {'https://10.0.0.1:2376': mock.Mock(), 'https://10.0.0.2:2376': mock.Mock()}
+        for container_ship in fleet.values():
+            container_ship.run_container.side_effect = run_container
+
+        jobs = [
+            Job('reindex', 'team/app:1.0', command='bin/reindex'),
+            Job('backfill', 'team/app:1.0', retries=1),
+            Job('purge', 'team/app:1.0', retries=1),
+            Job('compact', 'team/app:1.0')
+        ]
+
+        results = Longshoremen(fleet, capacity=2, namespace='app-job').run(jobs)
+
+        self.assertEqual([job.exit_code for job in results], [0, 0, 2, None])
+        self.assertEqual([len(job.attempts) for job in results], [1, 2, 2, 1])
+        self.assertEqual([job.succeeded for job in results], [True, True, False, False])
+        self.assertIsNotNone(results[3].error)
+        self.assertEqual(results[0].output, ['reindex running'])
+        self.assertIn(results[1].attempts[0].host, fleet)
+
+        calls = [call for container_ship in fleet.values() for call in container_ship.run_container.call_args_list]
+        self.assertEqual(len(calls), 6)
+        self.assertIn(mock.call('app-job-reindex', 'team/app:1.0', 'bin/reindex', None, mock.ANY), calls)
+
+    def test_run_capacity(self):
+        running = {}
+        peaks   = {}
+        lock    = threading.Lock()
+
+        def worker(address):
+            def run_container(alias, image, command, env, output):
+                with lock:
+                    running[address] = running.get(address, 0) + 1
+                    peaks[address]   = max(peaks.get(address, 0), running[address])
+
+                time.sleep(0.01)
+
+                with lock:
+                    running[address] -= 1
+
+                return 0
+
+            return run_container
+
+        fleet = {}
+        for address in ('https://10.0.0.1:2376', 'https://10.0.0.2:2376'):
+            fleet[address] = mock.Mock()
+            fleet[address].run_container.side_effect = worker(address)
+
+        jobs = Longshoremen(fleet, capacity=3).run([Job('job-{0}'.format(index), 'team/app:1.0') for index in range(20)])
+
+        self.assertTrue(all(job.succeeded for job in jobs))
+        self.assertTrue(all(peak <= 3 for peak in peaks.values()))
+        self.assertEqual(sum(len(job.attempts) for job in jobs), 20)
+
+    def test_run_no_jobs(self):
+        self.assertEqual(Longshoremen({'https://10.0.0.1:2376': mock.Mock()}).run([]), [])
+
+        with self.assertRaises(TypeError):
+            Longshoremen({'https://10.0.0.1:2376': mock.Mock()}).run([{'name': 'reindex'}])
@@ -0,0 +1,138 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals, absolute_import
+
+from tests import unittest, mock
+
+from freight_forwarder.container.readiness_probe import ReadinessProbe
+
+
+def create_container(states, inspect=None, base_url='http://docker.example.com:2375'):
+    container = mock.Mock()
+    container.id                   = '123'
+    container.name                 = 'foo'
+    container.client.base_url      = base_url
+    container.state.side_effect    = states
+    container.inspect.return_value = inspect or {}
+
+    return container
+
+
+class ReadinessProbeTest(unittest.TestCase):
+    def test_invalid_type(self):
+        with self.assertRaises(ValueError):
+            ReadinessProbe('udp', port=53)
+
+    def test_port_required(self):
+        with self.assertRaises(TypeError):
+            ReadinessProbe('http')
+
+    def test_command_required(self):
+        with self.assertRaises(TypeError):
+            ReadinessProbe('exec')
+
+    def test_invalid_settings(self):
+        with self.assertRaises(TypeError):
+            ReadinessProbe('tcp', port=80, interval=0)
+
+        with self.assertRaises(TypeError):
+            ReadinessProbe('tcp', port=80, success_threshold=0)
+
+    @mock.patch('freight_forwarder.container.readiness_probe.time')
+    def test_wait_ready(self, mock_time):
+        mock_time.time.return_value = 0
+        container = create_container([{'running': True}] * 3)
+        probe     = ReadinessProbe('tcp', port=80, success_threshold=2)
+
+        with mock.patch.object(ReadinessProbe, 'check', side_effect=[False, True, True]) as mock_check:
+            self.assertTrue(probe.wait(container))
+
+        self.assertEqual(mock_check.call_count, 3)
+        self.assertEqual(mock_time.sleep.call_count, 2)
+
+    @mock.patch('freight_forwarder.container.readiness_probe.time')
+    def test_wait_exited(self, mock_time):
+        mock_time.time.return_value = 0
+        container = create_container([{'running': True}, {'running': False, 'exit_code': 1}])
+        probe     = ReadinessProbe('tcp', port=80)
+
+        with mock.patch.object(ReadinessProbe, 'check', return_value=False) as mock_check:
+            self.assertFalse(probe.wait(container))
+
+        self.assertEqual(mock_check.call_count, 1)
+
+    @mock.patch('freight_forwarder.container.readiness_probe.time')
+    def test_wait_max_wait(self, mock_time):
+        mock_time.time.side_effect = [0, 1, 2, 3]
+        container = create_container([{'running': True}] * 3)
+        probe     = ReadinessProbe('tcp', port=80, max_wait=3)
+
+        with mock.patch.object(ReadinessProbe, 'check', return_value=False) as mock_check:
+            self.assertFalse(probe.wait(container))
+
+        self.assertEqual(mock_check.call_count, 3)
+
+    @mock.patch('freight_forwarder.container.readiness_probe.requests')
+    def test_check_http_published_port(self, mock_requests):
+        mock_requests.get.return_value.status_code = 204
+        container = create_container(
+            [],
+            inspect={'NetworkSettings': {
+                'IPAddress': '172.17.0.2',
+                'Ports': {'8080/tcp': [{'HostIp': '0.0.0.0', 'HostPort': '32768'}]}
+            }}
+        )
+
+        self.assertTrue(ReadinessProbe('http', port=8080, path='health').check(container))
+        mock_requests.get.assert_called_once_with('http://docker.example.com:32768/health', timeout=1)
+
+        mock_requests.get.return_value.status_code = 503
+        self.assertFalse(ReadinessProbe('http', port=8080).check(container))
+
+    @mock.patch('freight_forwarder.container.readiness_probe.socket')
+    def test_check_tcp_container_address(self, mock_socket):
+        container = create_container(
+            [],
+            inspect={'NetworkSettings': {'IPAddress': '172.17.0.2', 'Ports': {}}},
+            base_url='http+docker://localunixsocket'
+        )
+
+        self.assertTrue(ReadinessProbe('tcp', port=5432, timeout=2).check(container))
+        mock_socket.create_connection.assert_called_once_with(('172.17.0.2', 5432), timeout=2)
+
+        mock_socket.create_connection.side_effect = IOError('connection refused')
+        self.assertFalse(ReadinessProbe('tcp', port=5432).check(container))
+
+    def test_check_exec(self):
+        container = create_container([])
+        container.client.exec_create.return_value  = {'Id': 'abc'}
+        container.client.exec_inspect.return_value = {'ExitCode': 0}
+
+        self.assertTrue(ReadinessProbe('exec', command=['pg_isready']).check(container))
+        container.client.exec_create.assert_called_once_with('123', ['pg_isready'])
+        container.client.exec_start.assert_called_once_with(container.client.exec_create.return_value, detach=True)
+
+        container.client.exec_inspect.return_value = {'ExitCode': 2}
+        self.assertFalse(ReadinessProbe('exec', command='pg_isready').check(container))
+
+    @mock.patch('freight_forwarder.container.readiness_probe.time')
+    def test_check_exec_timeout(self, mock_time):
+        mock_time.time.side_effect = [0, 0.5, 0.9, 1]
+        container = create_container([])
+        container.client.exec_inspect.return_value = {'Running': True, 'ExitCode': 0}
+
+        # a command that doesn't finish within the probe's timeout fails the probe.
+        self.assertFalse(ReadinessProbe('exec', command=['pg_isready'], timeout=1).check(container))
+        self.assertEqual(container.client.exec_inspect.call_count, 3)
+        self.assertEqual(mock_time.sleep.call_count, 2)
+
+        mock_time.time.side_effect = [0, 0.5]
+        container.client.exec_inspect.side_effect = [{'Running': True}, {'Running': False, 'ExitCode': 0}]
+        self.assertTrue(ReadinessProbe('exec', command=['pg_isready'], timeout=1).check(container))
+
+    def test_check_healthcheck(self):
+        container = create_container([{'health': {'status': 'healthy'}}, {'health': {'status': 'starting'}}, {}])
+        probe     = ReadinessProbe('healthcheck')
+
+        self.assertTrue(probe.check(container))
+        self.assertFalse(probe.check(container))
+        self.assertFalse(probe.check(container))
@@ -198,14 +198,47 @@ class RegistryV2Test(unittest.TestCase):
             self.assertIsInstance(tag_output, six.string_types)
             self.assertIn(tag_output, formatted_output)
 
-    def test_blobs(self):
-        self.skipTest("Not implemented")
+    @mock.patch.object(V2, '_validate_response', name='mock_v2_validate_response', return_value=True)
+    @mock.patch.object(V2, '_request_builder', name='mock_v2_request_builder')
+    @mock.patch('freight_forwarder.registry.registry_base.requests', autospec=True)
+    def test_blobs(self, mock_requests, mock_request_builder, mock_validate_response):
+        test_registry = RegistryV2Factory(address='https://v2blobs.registry.docker.com')
+
+        response = test_registry.blobs('appexample/test-app', 'sha256:abc')
+
+        self.assertEqual(response, mock_request_builder.return_value)
+        mock_request_builder.assert_called_once_with('HEAD', 'appexample/test-app/blobs/sha256:abc')
 
     def test_catalog(self, count=None, last=None):
         self.skipTest("Not implemented")
 
-    def test_manifests(self):
-        self.skipTest("Not implemented")
+    @mock.patch.object(V2, '_validate_response', name='mock_v2_validate_response', return_value=True)
+    @mock.patch.object(V2, '_request_builder', name='mock_v2_request_builder')
+    @mock.patch('freight_forwarder.registry.registry_base.requests', autospec=True)
+    def test_manifests(self, mock_requests, mock_request_builder, mock_validate_response):
+        test_registry = RegistryV2Factory(address='https://v2manifests.registry.docker.com')
+
+        response = test_registry.manifests('appexample/test-app', '0.0.15')
+
+        self.assertEqual(response, mock_request_builder.return_value)
+        self.assertEqual(mock_request_builder.call_args[0], ('GET', 'appexample/test-app/manifests/0.0.15'))
+        self.assertIn(
+            'application/vnd.docker.distribution.manifest.v2+json',
+            mock_request_builder.call_args[1]['headers']['Accept']
+        )
+
+        with self.assertRaises(AttributeError):
+            test_registry.manifests('test-app')
+
+    @mock.patch.object(V2, '_validate_response', name='mock_v2_validate_response', return_value=True)
+    @mock.patch.object(V2, '_request_builder', name='mock_v2_request_builder')
+    @mock.patch('freight_forwarder.registry.registry_base.requests', autospec=True)
+    def test_manifest_digest(self, mock_requests, mock_request_builder, mock_validate_response):
+        mock_request_builder.return_value.headers = {'Docker-Content-Digest': 'sha256:abc'}
+        test_registry = RegistryV2Factory(address='https://v2manifests.registry.docker.com')
+
+        self.assertEqual(test_registry.manifest_digest('appexample/test-app', 'latest'), 'sha256:abc')
+        self.assertEqual(mock_request_builder.call_args[0], ('HEAD', 'appexample/test-app/manifests/latest'))
 
 
 class RegistryBaseTests(unittest.TestCase):
@@ -0,0 +1,69 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals, absolute_import
+from datetime import datetime, timedelta
+
+from tests import unittest, mock
+
+from freight_forwarder.commercial_invoice.retention_policy import RetentionPolicy
+
+
+def create_cargo(id, hours_old, repo_tags=()):
+    cargo = mock.Mock()
+    cargo.id         = id
+    cargo.identifier = repo_tags[0] if repo_tags else id
+    cargo.repo_tags  = repo_tags
+    cargo.created_at = datetime.utcnow() - timedelta(hours=hours_old)
+
+    return cargo
+
+
+class RetentionPolicyTest(unittest.TestCase):
+    def setUp(self):
+        self.cargoes = [
+            create_cargo('a', 100, ('team/app:sea1-production-1.0',)),
+            create_cargo('b', 10, ('team/app:sea1-development-1.2',)),
+            create_cargo('c', 1, ('team/app:latest',)),
+            create_cargo('d', 50, ('team/app:sea1-development-1.1',)),
+            create_cargo('e', 200, ('team/app:sea1-development-0.9',)),
+        ]
+
+    def tearDown(self):
+        del self.cargoes
+
+    def test_default_keeps_two_most_recent(self):
+        expired = RetentionPolicy().expired(self.cargoes)
+        self.assertEqual(sorted(cargo.id for cargo in expired), ['a', 'd', 'e'])
+
+    def test_keep(self):
+        expired = RetentionPolicy(keep=4).expired(self.cargoes)
+        self.assertEqual([cargo.id for cargo in expired], ['e'])
+
+    def test_max_age(self):
+        expired = RetentionPolicy(keep=1, max_age=72).expired(self.cargoes)
+        self.assertEqual(sorted(cargo.id for cargo in expired), ['a', 'e'])
+
+    def test_keep_tags(self):
+        expired = RetentionPolicy(keep=0, keep_tags=['*-production-*', 'latest']).expired(self.cargoes)
+        self.assertEqual(sorted(cargo.id for cargo in expired), ['b', 'd', 'e'])
+
+    def test_in_use(self):
+        expired = RetentionPolicy(keep=0).expired(self.cargoes, in_use=['a', 'c'])
+        self.assertEqual(sorted(cargo.id for cargo in expired), ['b', 'd', 'e'])
+
+    def test_invalid_values(self):
+        self.assertEqual(RetentionPolicy(keep=0).keep, 0)
+
+        with self.assertRaises(TypeError):
+            RetentionPolicy(keep='2')
+
+        with self.assertRaises(TypeError):
+            RetentionPolicy(keep=-1)
+
+        with self.assertRaises(TypeError):
+            RetentionPolicy(max_age=-1)
+
+        with self.assertRaises(TypeError):
+            RetentionPolicy(keep_tags='latest')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,6 +8,8 @@ from tests import unittest, mock
 from freight_forwarder.registry.registry import V1
 from freight_forwarder.container.host_config import HostConfig
 from freight_forwarder.container.config import Config as ContainerConfig
+from freight_forwarder.container.readiness_probe import ReadinessProbe
+from freight_forwarder.commercial_invoice.benchmark import Benchmark
 from tests.factories.service_factory import ServiceFactory
 
 
@@ -171,6 +173,58 @@ class ServiceTest(unittest.TestCase):
         with self.assertRaises(TypeError):
             self.service_factory.source_tag = {}
 
+    def test_rollout_property(self):
+        self.assertEquals(self.service_factory.rollout, 'recreate')
+
+        self.service_factory.rollout = 'surge'
+        self.assertEquals(self.service_factory.rollout, 'surge')
+
+        with self.assertRaises(ValueError):
+            self.service_factory.rollout = 'blue-green'
+
+    def test_readiness_probe_property(self):
+        self.assertIsNone(self.service_factory.readiness_probe)
+
+        readiness_probe = ReadinessProbe('http', port=8080)
+        self.service_factory.readiness_probe = readiness_probe
+        self.assertIs(self.service_factory.readiness_probe, readiness_probe)
+
+        with self.assertRaises(TypeError):
+            self.service_factory.readiness_probe = {'type': 'http'}
+
+    def test_benchmark_property(self):
+        self.assertIsNone(self.service_factory.benchmark)
+
+        benchmark = Benchmark(image='team/app-bench:1.0')
+        self.service_factory.benchmark = benchmark
+        self.assertIs(self.service_factory.benchmark, benchmark)
+
+        with self.assertRaises(TypeError):
+            self.service_factory.benchmark = {'image': 'team/app-bench:1.0'}
+
+    def test_replicas_property(self):
+        self.assertEquals(self.service_factory.replicas, 1)
+
+        self.service_factory.replicas = 3
+        self.assertEquals(self.service_factory.replicas, 3)
+
+        for value in (0, -1, '2', True):
+            with self.assertRaises(TypeError):
+                self.service_factory.replicas = value
+
+    def test_source_digest_property(self):
+        self.assertIsNone(self.service_factory.source_digest)
+
+        self.service_factory.source_digest = 'sha256:abc'
+        self.assertEquals(self.service_factory.source_digest, 'sha256:abc')
+
+        # changing the tag drops the digest pinned for the previous tag.
+        self.service_factory.source_tag = 'asxkl9'
+        self.assertIsNone(self.service_factory.source_digest)
+
+        with self.assertRaises(TypeError):
+            self.service_factory.source_digest = 1
+
     @mock.patch('freight_forwarder.commercial_invoice.service.Registry')
     def test_host_config(self, mock_registry_class):
         mock_registry_class.return_value = self.mock_registry_type
@@ -0,0 +1,129 @@
+# -*- coding: utf-8; -*-
+from __future__ import unicode_literals, absolute_import
+import time
+
+from docker.errors import APIError
+
+from tests import unittest, mock
+
+from freight_forwarder.container.stats_collector import StatsCollector, parse_stats, percentile
+
+
+def docker_stats(cpu_usage, system_cpu_usage, memory, blkio=0, network=0):
+    return {
+        'read': '2016-04-12T10:00:00.000000000Z',
+        'cpu_stats': {
+            'cpu_usage': {'total_usage': cpu_usage, 'percpu_usage': [0, 0]},
+            'system_cpu_usage': system_cpu_usage
+        },
+        'memory_stats': {'usage': memory, 'limit': 1024 * 1024 * 1024},
+        'blkio_stats': {'io_service_bytes_recursive': [
+            {'major': 8, 'minor': 0, 'op': 'Read', 'value': blkio},
+            {'major': 8, 'minor': 0, 'op': 'Write', 'value': blkio},
+            {'major': 8, 'minor': 0, 'op': 'Total', 'value': blkio * 2}
+        ]},
+        'networks': {'eth0': {'rx_bytes': network, 'tx_bytes': network}}
+    }
+
+
+class StatsCollectorTest(unittest.TestCase):
+    def test_parse_stats(self):
+        sample = parse_stats(docker_stats(200, 1000, 4096, blkio=10, network=5))
+
+        self.assertEqual(sample.cpu_usage, 200)
+        self.assertEqual(sample.system_cpu_usage, 1000)
+        self.assertEqual(sample.cpus, 2)
+        self.assertEqual(sample.memory_bytes, 4096)
+        self.assertEqual(sample.blkio_bytes, 20)
+        self.assertEqual(sample.network_bytes, 10)
+
+        # api 1.20 reports a single interface.
+        stats = docker_stats(200, 1000, 4096)
+        stats['network'] = stats.pop('networks')['eth0']
+        stats['network']['rx_bytes'] = 7
+        self.assertEqual(parse_stats(stats).network_bytes, 7)
+
+    def test_parse_stats_not_running(self):
+        self.assertIsNone(parse_stats({'read': '0001-01-01T00:00:00Z', 'cpu_stats': {'cpu_usage': {}}}))
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 90), 90)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3], 99), 3)
+        self.assertIsNone(percentile([], 50))
+
+    def test_init_failure(self):
+        with self.assertRaises(TypeError):
+            StatsCollector(mock.Mock(), interval=0)
+
+    def test_summary(self):
+        container = mock.Mock(id='123')
+        container.stats.side_effect = [
+            docker_stats(0, 1000, 100),
+            docker_stats(500, 2000, 300, blkio=50, network=100),
+            docker_stats(750, 3000, 200, blkio=50, network=100)
+        ]
+
+        collector = StatsCollector(mock.Mock(), interval=60)
+
+        # sample without the collector thread so the samples are deterministic.
+        with mock.patch.object(StatsCollector, '_run'):
+            collector.watch(container, 'app')
+
+        watch = collector._watches[container.id]
+        with mock.patch('freight_forwarder.container.stats_collector.time', side_effect=[0, 5, 10]):
+            for sample in range(3):
+                collector._sample(watch)
+
+        summary = collector.summary()['app']
+        self.assertEqual(summary['samples'], 3)
+        self.assertEqual(summary['memory_bytes'], {'p50': 200, 'p90': 300, 'p99': 300, 'max': 300})
+
+        # cpu percent is the share of the host's cpu used times the number of cpus.
+        self.assertEqual(summary['cpu_percent'], {'p50': 50.0, 'p90': 100.0, 'p99': 100.0, 'max': 100.0})
+        self.assertEqual(summary['blkio_bytes_per_second'], {'p50': 0, 'p90': 20.0, 'p99': 20.0, 'max': 20.0})
+        self.assertEqual(summary['network_bytes_per_second']['max'], 40.0)
+
+        collector.close()
+
+    def test_sample_removed_container(self):
+        container = mock.Mock(id='123')
+        container.stats.side_effect = APIError('No such container', mock.Mock(status_code=404))
+
+        collector = StatsCollector(mock.Mock(), interval=60)
+        with mock.patch.object(StatsCollector, '_run'):
+            collector.watch(container, 'app')
+
+        collector._sample(collector._watches[container.id])
+
+        self.assertEqual(collector._watches, {})
+        self.assertEqual(collector.summary()['app']['samples'], 0)
+        self.assertIsNone(collector.summary()['app']['cpu_percent']['max'])
+
+    def test_collect(self):
+        containers = [mock.Mock(id='1'), mock.Mock(id='2'), mock.Mock(id='3')]
+        for container in containers:
+            container.stats.return_value = docker_stats(100, 1000, 512)
+
+        collector = StatsCollector(mock.Mock(), interval=0.01)
+        collector.watch(containers[0], 'app')
+        collector.watch(containers[1], 'app')
+        collector.watch(containers[2], 'db')
+
+        deadline = time.time() + 5
+        while time.time() < deadline and not all(container.stats.call_count >= 2 for container in containers):
+            time.sleep(0.01)
+
+        collector.close()
+        self.assertTrue(collector.closed)
+
+        summary = collector.summary()
+        self.assertEqual(sorted(summary), ['app', 'db'])
+        self.assertGreaterEqual(summary['app']['samples'], 4)
+        self.assertEqual(summary['db']['memory_bytes']['max'], 512)
+
+        with self.assertRaises(RuntimeError):
+            collector.watch(containers[0], 'app')
@@ -118,6 +118,98 @@ class UtilsTest(unittest.TestCase):
 
         self.assertEqual(test_normalize_value, "test_value")
 
+    def test_parallel_map(self):
+        results = parallel_map(lambda value: value * 2, range(20), max_workers=4)
+
+        self.assertEqual(results, [value * 2 for value in range(20)])
+        self.assertEqual(parallel_map(lambda value: value, []), [])
+
+    def test_parallel_map_failure(self):
+        def callback(value):
+            if value == 3:
+                raise ValueError("bad value")
+            return value
+
+        with self.assertRaises(ValueError):
+            parallel_map(callback, range(5), max_workers=2)
+
+        with self.assertRaises(ValueError):
+            parallel_map(callback, range(5), max_workers=0)
+
+
+class BackgroundWorkerTest(unittest.TestCase):
+    def test_submit(self):
+        results = []
+        worker  = BackgroundWorker()
+
+        for value in range(5):
+            worker.submit("append {0}".format(value), results.append, value)
+
+        self.assertEqual(worker.join(), [])
+        self.assertEqual(results, list(range(5)))
+        self.assertEqual(worker.pending, 0)
+
+    def test_failures(self):
+        def fail():
+            raise ValueError("bad value")
+
+        results = []
+        worker  = BackgroundWorker()
+        worker.submit('fail', fail)
+        worker.submit('append', results.append, 1)
+
+        failures = worker.join()
+        self.assertEqual([description for description, e in failures], ['fail'])
+        self.assertIsInstance(failures[0][1], ValueError)
+        self.assertEqual(results, [1])
+
+    def test_not_threaded(self):
+        results = []
+        worker  = BackgroundWorker(threaded=False)
+        worker.submit('append', results.append, 1)
+
+        self.assertEqual(worker.pending, 1)
+        self.assertEqual(results, [])
+
+        worker.run()
+        self.assertEqual(results, [1])
+        self.assertEqual(worker.pending, 0)
+
+    def test_close(self):
+        results = []
+        worker  = BackgroundWorker()
+        worker.submit('append', results.append, 1)
+        thread = worker._thread
+
+        worker.close()
+        self.assertEqual(results, [1])
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(worker.pending, 0)
+
+        # closing again is a no op and new work starts a new thread.
+        worker.close()
+        worker.submit('append', results.append, 2)
+        self.assertEqual(worker.join(), [])
+        self.assertEqual(results, [1, 2])
+
+
+class PrefixedStreamTest(unittest.TestCase):
+    def test_write(self):
+        output = mock.Mock()
+        stream = PrefixedStream('app', output)
+
+        stream.write('Step 1 : FROM scratch\n ---> Running')
+        stream.write(' in 123\n\rDownloading 1%\rDownloading 100%\n')
+        stream.write('done')
+        stream.close()
+
+        self.assertEqual(output.write.call_args_list, [
+            mock.call('[app] Step 1 : FROM scratch\n'),
+            mock.call('[app]  ---> Running in 123\n'),
+            mock.call('[app] Downloading 100%\n'),
+            mock.call('[app] done\n'),
+        ])
+
 
 class UtilsParseStreamTest(unittest.TestCase):
     def setUp(self):